@@ -24,7 +24,7 @@ cfiles = [
     'sincos.C', 'swiglib.C', 'switchboard.C', 'threadstate.C',
     'timestamp.C', 'trace.C', 'pythonlock.C', 'progress.C',
     'direction.C', 'doublevec.C', 'smallmatrix.C',
-    'latticesystem.C', 'burn.C', 'statgroups.C'
+    'latticesystem.C', 'burn.C', 'statgroups.C', 'compactpixelset.C'
 ]
 
 swigfiles = [
@@ -75,7 +75,8 @@ hfiles = [
     'removeitem.h', 'sincos.h', 'swiglib.h', 'switchboard.h',
     'threadstate.h', 'timestamp.h', 'tostring.h', 'trace.h',
     'pythonlock.h', 'direction.h', 'doublevec.h', 'smallmatrix.h',
-    'latticesystem.h', 'burn.h', 'statgroups.h'
+    'latticesystem.h', 'burn.h', 'statgroups.h', 'compactpixelset.h',
+    'phasetimer.h'
 ]
 
 
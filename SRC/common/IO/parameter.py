@@ -40,9 +40,11 @@ from ooflib.common import utils
 from ooflib.common.IO import automatic
 from ooflib.common.IO.typename import typename
 from types import *
+import array
 import math
 import string
 import struct
+import sys
 
 ErrPyProgrammingError = ooferror.ErrPyProgrammingError
 
@@ -654,6 +656,43 @@ class ListOfFloatsParameter(Parameter):
     def valueDesc(self):
         return "A list of floating point numbers."
 
+# Parameters whose values are array.arrays.  In binary data files the
+# array is stored as one big-endian buffer, instead of one value at a
+# time, which makes a big difference for large arrays.
+
+class _ArrayParameter(Parameter):
+    typecode = None                     # defined in subclasses
+    def __init__(self, name, value=None, default=None, tip=None):
+        if default is None:
+            default = array.array(self.typecode)
+        Parameter.__init__(self, name, value, default, tip)
+    def checker(self, x):
+        if not (isinstance(x, array.array) and x.typecode == self.typecode):
+            raiseTypeError(type(x), "array of type '%s'" % self.typecode)
+    def binaryRepr(self, datafile, value):
+        if sys.byteorder == 'little':
+            value = array.array(self.typecode, value)
+            value.byteswap()
+        return struct.pack(structIntFmt, len(value)) + value.tostring()
+    def binaryRead(self, parser):
+        b = parser.getBytes(structIntSize)
+        (length,) = struct.unpack(structIntFmt, b)
+        val = array.array(self.typecode)
+        val.fromstring(parser.getBytes(length*val.itemsize))
+        if sys.byteorder == 'little':
+            val.byteswap()
+        return val
+
+class IntArrayParameter(_ArrayParameter):
+    typecode = 'i'
+    def valueDesc(self):
+        return "An array of integers."
+
+class DoubleArrayParameter(_ArrayParameter):
+    typecode = 'd'
+    def valueDesc(self):
+        return "An array of floating point numbers."
+
 # The SkeletonInfo toolbox requires a tuple of ints parameter for
 # which "None" is also a valid value.  
 class TupleOfIntsParameter(Parameter):
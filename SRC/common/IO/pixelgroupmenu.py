@@ -146,6 +146,10 @@ def autoPixelGroup(menuitem, grouper, delta, gamma, minsize, contiguous,
                                            minsize,
                                            contiguous,
                                            name_template, clear);
+        if not prog.stopped():
+            # statgroups leaves the time taken by each phase in the
+            # progress message.
+            reporter.report(prog.message())
     finally:
         prog.finish()
         grouper.mscontext.end_writing()
@@ -267,7 +271,7 @@ def copyPixelGroup(menuitem, microstructure, group, name):
             oldgroup = ms.findGroup(group)
             if oldgroup is not None:
                 (newgroup, newness) = ms.getGroup(name)
-                newgroup.addWithoutCheck(oldgroup.members())
+                newgroup.addSetWithoutCheck(oldgroup)
             else:
                 raise ooferror.ErrUserError("There is no pixel group named %s!"
                                             % group)
@@ -416,13 +420,14 @@ def addSelection(menuitem, microstructure, group):
     ms.pixelselection.begin_reading()
     try:
         sel = ms.pixelselection.getObject()
-        pxls = sel.members()
+        # A copy of the selection's PixelSet, not a list of pixels.
+        pxls = sel.getPixelGroup().clone()
     finally:
         ms.pixelselection.end_reading()
     mscontext.begin_writing()
     try:
         grp = ms.findGroup(group)
-        grp.add(pxls)
+        grp.addSet(pxls)
     finally:
         mscontext.end_writing()
 
@@ -456,14 +461,14 @@ def removeSelection(menuitem, microstructure, group):
     ms.pixelselection.begin_reading()
     try:
         sel = ms.pixelselection.getObject()
-        pxls = sel.members()
+        pxls = sel.getPixelGroup().clone()
     finally:
         ms.pixelselection.end_reading()
     
     mscontext.begin_writing()
     try:
         grp = ms.findGroup(group)
-        grp.remove(pxls)          # calls ms.recategorize(), which
+        grp.removeSet(pxls)       # calls ms.recategorize(), which
                                   # increments the timestamp of ms AND
                                   # issues "changed pixel group" signal.
     finally:
@@ -122,6 +122,25 @@ private:
   mutable unsigned int ncategories;
   void categorize() const;
 
+  // When only some pixels have changed since the last
+  // categorization, categorize() just recategorizes those pixels,
+  // and only recomputes the boundaries of the categories that they
+  // left or joined.  dirtyPixels lists the changed pixels.  If
+  // fullRecategorize is true, all pixels are recategorized.
+  mutable std::vector<ICoord> dirtyPixels;
+  mutable bool fullRecategorize;
+  void categorizeAll() const;
+  void categorizeDirtyPixels() const;
+
+  // categoryTiles lists the categories present in each square tile
+  // of categoryTileSize x categoryTileSize pixels.  It's used to find
+  // which categories might be under a skeleton element without
+  // examining every category boundary.  It's rebuilt by categorize().
+  static const int categoryTileSize;
+  mutable ICoord nCategoryTiles;
+  mutable std::vector<std::vector<int> > categoryTiles;
+  void findCategoryTiles() const;
+
   // Lock to protect the sometimes-lengthy categorization process, and
   // functions which query the data it produces.  This lock protects
   // the categoryBdys, categorized, ncategories, categorymap, and
@@ -188,12 +207,21 @@ public:
   int category(int x, int y) const;
   int category(const Coord &where) const; // Arbitrary physical-coord point.
   void recategorize();
+  // Use this version if only the attributes of the given pixels have
+  // changed.
+  void recategorize(const std::vector<ICoord>*);
   const ICoord &getRepresentativePixel(int category) const;
   bool is_categorized() const { return categorized; }
 
   const std::vector<PixelSetBoundary*> &getCategoryBdys() const {
     return categoryBdys;
   }
+  // Append to the given vector the categories that may be present in
+  // the given rectangle, which is in pixel coordinates.  The list is
+  // sorted and may include categories that are only near the
+  // rectangle.  Like getCategoryBdys(), this assumes that the
+  // Microstructure has been categorized.
+  void categoriesInRegion(const CRectangle&, std::vector<int>&) const;
 
   std::vector<ICoord> *segmentPixels(const Coord&, const Coord&, bool&) const;
   
@@ -208,6 +236,8 @@ public:
   bool transitionPointClosest(const Coord&, const Coord&, TransitionPointIterator&,
 			      Coord *result) const;
   bool transitionPoint(const Coord&, const Coord&, Coord *result) const;
+  void transitionPoints(const std::vector<Coord>&, std::vector<Coord>&,
+			std::vector<bool>&) const;
   double edgeHomogeneity(const Coord&, const Coord&) const;
 
   double edgeHomogeneityCat(const Coord&, const Coord&, int* cat) const;
@@ -0,0 +1,123 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+// CompactPixelSet stores a set of pixels in a rectangular image,
+// using either a list of runs or a bitmap, whichever is smaller.
+// Pixels are numbered in the order given by ICoord::operator<, so
+// x*height + y, and a run is a half open interval of consecutive
+// pixel numbers.  A sparse or blocky set uses a few bytes per run
+// instead of one ICoord per pixel, and a dense speckled set uses one
+// bit per pixel of the image.  Set operations work on whole runs or
+// 64 bit words, and the representation is rechosen after each one.
+
+#include <oofconfig.h>
+
+#ifndef COMPACTPIXELSET_H
+#define COMPACTPIXELSET_H
+
+#include "common/coord.h"
+#include <stdint.h>
+#include <vector>
+
+class CompactPixelSetIterator;
+
+class CompactPixelSet {
+public:
+  struct Run {
+    unsigned int start, end;	// [start, end)
+    Run(unsigned int s, unsigned int e) : start(s), end(e) {}
+  };
+private:
+  ICoord geometry_;
+  unsigned int npixels;		// size of the image
+  unsigned int count_;		// size of the set
+  bool bitmap_;			// which representation is in use
+  std::vector<Run> runs;	// sorted, disjoint, and not adjacent
+  std::vector<uint64_t> words;
+  mutable unsigned int top;	// no bitmap word above this is nonzero
+
+  unsigned int index(const ICoord&) const;
+  ICoord coord(unsigned int k) const {
+    return ICoord(k/geometry_[1], k%geometry_[1]);
+  }
+  unsigned int nwords() const { return (npixels + 63)/64; }
+  bool getBit(unsigned int k) const {
+    return (words[k/64] >> (k%64)) & 1;
+  }
+  void setRange(unsigned int, unsigned int);
+  void clearRange(unsigned int, unsigned int);
+  unsigned int countRuns() const;
+  void getRuns(std::vector<Run>&) const;
+  void getWords(std::vector<uint64_t>&) const;
+  void setRuns(std::vector<Run>&);
+  void toBitmap();
+  void toRuns();
+  void recount();
+  void chooseRepresentation();
+  unsigned int nextBit(unsigned int) const;
+  friend class CompactPixelSetIterator;
+public:
+  CompactPixelSet(const ICoord &geometry);
+  const ICoord &geometry() const { return geometry_; }
+  int size() const { return count_; }
+  bool empty() const { return count_ == 0; }
+  bool usesBitmap() const { return bitmap_; }
+  unsigned long memoryUse() const;   // bytes used for storage
+  bool contains(const ICoord&) const;
+
+  void insert(const ICoord&);
+  void erase(const ICoord&);
+  // The pixels in the vectors can be in any order, and may be
+  // repeated.
+  void insert(const std::vector<ICoord>&);
+  void erase(const std::vector<ICoord>&);
+  void clear();
+  // Discard pixels outside of the new geometry.
+  void resize(const ICoord&);
+
+  // The last pixel in ICoord order, and its removal.
+  ICoord back() const;
+  void pop_back();
+
+  // Set operations.  The other set must have the same geometry.
+  void unite(const CompactPixelSet&);
+  void intersect(const CompactPixelSet&);
+  void subtract(const CompactPixelSet&);
+
+  // Fill the vector with the pixels in ICoord order.
+  void getMembers(std::vector<ICoord>&) const;
+
+  typedef CompactPixelSetIterator const_iterator;
+  const_iterator begin() const;
+  const_iterator end() const;
+};
+
+// Iterates over the pixels in ICoord order.
+
+class CompactPixelSetIterator {
+private:
+  const CompactPixelSet *set;
+  unsigned int k;		// current pixel number
+  unsigned int r;		// current run, if the set uses runs
+  CompactPixelSetIterator(const CompactPixelSet*, bool);
+  friend class CompactPixelSet;
+public:
+  ICoord operator*() const { return set->coord(k); }
+  void operator++();
+  bool operator!=(const CompactPixelSetIterator &other) const {
+    return k != other.k;
+  }
+  bool operator==(const CompactPixelSetIterator &other) const {
+    return k == other.k;
+  }
+};
+
+#endif // COMPACTPIXELSET_H
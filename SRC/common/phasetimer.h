@@ -0,0 +1,65 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+#include <oofconfig.h>
+
+#ifndef PHASETIMER_H
+#define PHASETIMER_H
+
+// PhaseTimer measures the wall clock time spent in each phase of a
+// long computation.  Calling start() ends the current phase, if any,
+// and begins a new one.  summary() returns a string like
+//   "categorizing pixels 1.23s, creating groups 0.04s"
+// which is suitable for a Progress message.
+
+#include <chrono>
+#include <cstdio>
+#include <string>
+#include <utility>
+#include <vector>
+
+class PhaseTimer {
+private:
+  typedef std::chrono::steady_clock Clock;
+  std::vector<std::pair<std::string, double> > phases;
+  Clock::time_point startTime;
+  bool running;
+public:
+  PhaseTimer() : running(false) {}
+  void start(const std::string &phase) {
+    stop();
+    phases.push_back(std::make_pair(phase, 0.0));
+    startTime = Clock::now();
+    running = true;
+  }
+  void stop() {
+    if(running) {
+      phases.back().second =
+	std::chrono::duration<double>(Clock::now() - startTime).count();
+      running = false;
+    }
+  }
+  std::string summary() const {
+    std::string result;
+    for(std::vector<std::pair<std::string, double> >::size_type i=0;
+	i<phases.size(); i++)
+      {
+	char buf[32];
+	snprintf(buf, sizeof(buf), " %.3gs", phases[i].second);
+	if(i > 0)
+	  result += ", ";
+	result += phases[i].first + buf;
+      }
+    return result;
+  }
+};
+
+#endif // PHASETIMER_H
@@ -16,6 +16,7 @@
 
 #include <Python.h>
 #include "common/boolarray.h"
+#include "common/compactpixelset.h"
 #include "common/coord.h"
 #include "common/lock.h"
 #include "common/pixelattribute.h"
@@ -36,16 +37,23 @@ private:
   const int id_;
   bool defunct_;
 protected:
-  // weed() sorts the list of pixels and removes duplicates.  It's
-  // const because it only acts on mutable data.  The data is mutable
-  // because weeding happens behind the scenes in const functions like
-  // len() and members().
+  // The pixels are stored in a CompactPixelSet.  members_ is a sorted
+  // list of the same pixels, which is only built when it's asked for
+  // and is discarded when the set changes.  It's mutable because it's
+  // built behind the scenes in const functions like members().
   mutable SLock member_lock;
-  void weed() const;
+  CompactPixelSet pixels_;
   mutable std::vector<ICoord> members_;
-  mutable bool weeded;
+  mutable bool membersValid;
+  void changed();
   ICoord geometry;
   CMicrostructure *microstructure;
+  void removeInactive(CompactPixelSet&) const;
+  // addPixels_ and removePixels_ do the work for all the add and
+  // remove methods.  On return, the argument contains only the pixels
+  // that were actually added or removed.
+  void addPixels_(CompactPixelSet&, bool check);
+  void removePixels_(CompactPixelSet&, bool check);
 public:
   PixelSet(const ICoord *geometry, CMicrostructure *microstructure);
   PixelSet(const PixelSet&);
@@ -69,8 +77,16 @@ public:
 
   virtual void setFromBitmap(const BitmapOverlay&);
 
-  const ICoord &operator[](int i) const { return members_[i]; }
+  // Set operations.  Like add() and remove(), these only change
+  // pixels in the active area, except for addSetWithoutCheck().
+  virtual void addSet(const PixelSet*);
+  virtual void addSetWithoutCheck(const PixelSet*);
+  virtual void removeSet(const PixelSet*);
+  virtual void intersectSet(const PixelSet*);
+
+  const ICoord &operator[](int i) const { return (*members())[i]; }
   const std::vector<ICoord> *members() const;
+  const CompactPixelSet &pixels() const { return pixels_; }
 
   void despeckle(int threshold, BoolArray &selected) const;
 #ifndef DIM_3
@@ -83,6 +99,8 @@ public:
 class PixelGroup : public PixelSet {
 private:
   bool meshable_;
+  void addToGroupLists(const CompactPixelSet&);
+  void removeFromGroupLists(const CompactPixelSet&);
 protected:
   std::string name_;
 public:
@@ -100,6 +118,10 @@ public:
   virtual void remove(const std::vector<ICoord> *pixels);
   // virtual ICoord pop();		// removes and returns one pixel
   // virtual void setFromBitmap(const BitmapOverlay&);
+  virtual void addSet(const PixelSet*);
+  virtual void addSetWithoutCheck(const PixelSet*);
+  virtual void removeSet(const PixelSet*);
+  virtual void intersectSet(const PixelSet*);
   virtual void clear();
 
   const std::string &name() const { return name_; }
@@ -9,12 +9,15 @@
 # oof_manager@nist.gov. 
 
 from ooflib.SWIG.common import config
+from ooflib.SWIG.common import ooferror
 from ooflib.common import debug
 from ooflib.common import utils
 from ooflib.common.IO import parameter
 import types
 import struct
 import compiler
+import itertools
+import array
 
 class StrFunction:
     def __init__(self, arglist, funcstr):
@@ -25,9 +28,57 @@ class StrFunction:
                                           (self.arglist, self.funcstr))
         else:
             self.function = None
+        # Vectorized versions of the function, compiled by map(),
+        # keyed by which arguments are lists.
+        self._vectorized = {}
     def __call__(self, *args):
         if self.function:
             return self.function(*args)
+    def map(self, *args):
+        # Evaluate the function at many points in a single call.  Each
+        # argument is either a list (or tuple or array) containing one
+        # value per point, or a single value that's used at all
+        # points.  At least one argument must be a list.  Returns a
+        # list of the function values.  The loop over the points is
+        # compiled together with the function string, so there's no
+        # Python function call per point.
+        lists = tuple(isinstance(arg, _sequenceTypes) for arg in args)
+        if not (self.function and True in lists):
+            raise ooferror.ErrPyProgrammingError(
+                "StrFunction.map needs a function and a list of arguments")
+        try:
+            vfunc = self._vectorized[lists]
+        except KeyError:
+            vfunc = self._vectorized[lists] = self._vectorize(lists)
+        return vfunc(*args)
+    def _vectorize(self, lists):
+        # Build a function that takes the same arguments as
+        # self.function, but with the arguments indicated by 'lists'
+        # replaced by lists of values, and returns a list of results.
+        # If the arguments are x, y, and t, and x and y are lists,
+        # the function is
+        #   lambda _x_, _y_, t: [(funcstr) for (x, y) in _izip(_x_, _y_)]
+        params = []
+        loopvars = []
+        seqs = []
+        for arg, islist in zip(self.arglist.split(','), lists):
+            arg = arg.strip()
+            if islist:
+                params.append('_%s_' % arg)
+                loopvars.append(arg)
+                seqs.append('_%s_' % arg)
+            else:
+                params.append(arg)
+        if len(seqs) == 1:
+            loop = "for %s in %s" % (loopvars[0], seqs[0])
+        else:
+            loop = "for (%s) in _izip(%s)" % (", ".join(loopvars),
+                                             ", ".join(seqs))
+        # The outer lambda provides izip to the inner one, so that the
+        # function string is still evaluated in the main namespace.
+        return utils.OOFeval('lambda _izip: lambda %s: [(%s) %s]' %
+                             (", ".join(params), self.funcstr, loop)
+                             )(itertools.izip)
     def string(self):
         return self.funcstr
     def __repr__(self):
@@ -54,6 +105,8 @@ class StrFunction:
         nodes = compiler.parse(self.funcstr).getChildNodes()
         return name in _findNames(nodes)
 
+_sequenceTypes = (types.ListType, types.TupleType, array.array)
+
 def _findNames(nodes):
     # Return the names of all compiler.ast.Name nodes in the given
     # Abstract Syntax Tree nodes.
@@ -78,6 +131,9 @@ class XYStrFunction(StrFunction):
     def __call__(self, coord):
         if self.function:
             return self.function(*coord) # unpacks Coord into x,y or x,y,z
+    def mapCoords(self, coords):
+        # coords is a tuple of lists, (xs, ys) or (xs, ys, zs).
+        return self.map(*coords)
     def __repr__(self):
         return "'%s'" % self.funcstr    # shorthand notation
 
@@ -91,6 +147,10 @@ class XYTStrFunction(StrFunction):
         if self.function:
             args = tuple(coord) + (t,)
             return self.function(*args) # unpacks Coord into x,y,t or x,y,z,t
+    def mapCoords(self, coords, t):
+        # coords is a tuple of lists, (xs, ys) or (xs, ys, zs).  t may
+        # be a single time or a list of times.
+        return self.map(*(tuple(coords) + (t,)))
     def __repr__(self):
         return "'%s'" % self.funcstr    # shorthand notation
 
@@ -78,6 +78,13 @@ int findThreadNumber();
 ThreadState *findThreadState();
 int nThreadStates();
 
+// setOpenMPThreads sets the number of threads used by the OpenMP
+// parallel regions that ask for it with num_threads(nOpenMPThreads()).
+// n=0 restores the OpenMP default.  Unlike omp_set_num_threads, the
+// setting applies to regions started from any thread.
+void setOpenMPThreads(int n);
+int nOpenMPThreads();
+
 bool mainthread_query();	// returns true on main thread, false on others.
 void mainthread_delete();
 
@@ -19,15 +19,18 @@ if HAVE_PETSC:
     subdirs.append('PETSc')
 
 cfiles = [
-    'angle2color.C', 'bdyanalysis.C', 'boundarycond.C',
-    'cconjugate.C', 'celectricfield.C', 'cnonlinearsolver.C',
+    'amgpreconditioner.C', 'angle2color.C', 'bdyanalysis.C',
+    'boundarycond.C', 'cconjugate.C', 'celectricfield.C',
+    'cfiddlenodes.C', 'cnonlinearsolver.C',
     'compoundsubproblem.C', 'contourcell.C', 'corientation.C',
-    'crystalsymmetry.C', 'cscpatch.C', 'cskeleton.C', 'cstrain.C',
+    'crefine.C', 'crystalsymmetry.C', 'cscpatch.C', 'cskeleton.C',
+    'cstrain.C',
     'csubproblem.C', 'dofmap.C', 'edge.C', 'edgeset.C',
     'eigenvalues.C', 'element.C', 'elementnodeiterator.C',
     'entiremeshsubproblem.C', 'equation.C', 'femesh.C', 'field.C',
     'fieldeqnlist.C', 'fieldindex.C', 'flux.C', 'fluxnormal.C',
-    'freedom.C', 'gausspoint.C', 'invariant.C', 'linearizedsystem.C',
+    'freedom.C', 'gausspoint.C', 'gausspointbatch.C', 'invariant.C',
+    'linearizedsystem.C',
     'mastercoord.C', 'masterelement.C', 'material.C', 'materialset.C',
     'materialsubproblem.C', 'meshdatacache.C', 'meshiterator.C',
     'nodalequation.C', 'nodalfluxes.C', 'nodalscpatches.C', 'node.C',
@@ -35,15 +38,18 @@ cfiles = [
     'pixelgroupsubproblem.C', 'pixelselectioncouriere.C',
     'pointdata.C', 'property.C', 'pypropertywrapper.C',
     'rank3tensor.C', 'recoveredflux.C', 'shapefunction.C',
-    'shapefunctioncache.C', 'smallsystem.C', 'sparsemat.C',
+    'shapefunctioncache.C', 'shapefunctionstore.C', 'smallsystem.C',
+    'sparsemat.C',
     'steperrorscaling.C', 'symeig3.C', 'symmmatrix.C',
 ]
 
 swigfiles = [
     'angle2color.swg', 'bdyanalysis.swg',
-    'boundarycond.swg', 'cconjugate.swg', 'cmatrixmethods.swg',
+    'boundarycond.swg', 'cconjugate.swg', 'cfiddlenodes.swg',
+    'cmatrixmethods.swg',
     'cnonlinearsolver.swg', 'compoundsubproblem.swg',
-    'contourcell.swg', 'corientation.swg', 'crystalsymmetry.swg',
+    'contourcell.swg', 'corientation.swg', 'crefine.swg',
+    'crystalsymmetry.swg',
     'cskeleton.swg', 'cstrain.swg', 'csubproblem.swg', 'dofmap.swg',
     'edge.swg', 'edgeset.swg', 'element.swg',
     'elementnodeiterator.swg', 'entiremeshsubproblem.swg',
@@ -80,7 +86,8 @@ pyfiles = [
     'skeleton.py', 'skeletonboundary.py', 'skeletoncontext.py',
     'skeletondiff.py', 'skeletonelement.py',
     'skeletonfilterparams.py', 'skeletongroups.py',
-    'skeletonmodifier.py', 'skeletonnode.py', 'skeletonsegment.py',
+    'skeletonindex.py', 'skeletonmodifier.py', 'skeletonnode.py',
+    'skeletonsegment.py',
     'skeletonselectable.py', 'skeletonselectionmethod.py',
     'skeletonselectionmod.py', 'skeletonselectionmodes.py',
     'skeletonselmodebase.py', 'snapnode.py', 'snaprefine.py',
@@ -104,15 +111,17 @@ swigpyfiles = [
 ]
 
 hfiles = [
-    'angle2color.h', 'bdyanalysis.h', 'boundarycond.h',
-    'cconjugate.h', 'celectricfield.h', 'cmatrixmethods.h',
+    'amgpreconditioner.h', 'angle2color.h', 'bdyanalysis.h', 'boundarycond.h',
+    'cconjugate.h', 'celectricfield.h', 'cfiddlenodes.h',
+    'cmatrixmethods.h',
     'cnonlinearsolver.h', 'compoundsubproblem.h', 'constraint.h',
-    'contourcell.h', 'corientation.h', 'crystalsymmetry.h',
+    'contourcell.h', 'corientation.h', 'crefine.h', 'crystalsymmetry.h',
     'cscpatch.h', 'cskeleton.h', 'cstrain.h', 'csubproblem.h',
     'dofmap.h', 'edge.h', 'edgeset.h', 'eigenvalues.h', 'element.h',
     'elementnodeiterator.h', 'entiremeshsubproblem.h', 'equation.h',
     'femesh.h', 'field.h', 'fieldeqnlist.h', 'fieldindex.h', 'flux.h',
-    'fluxnormal.h', 'freedom.h', 'gausspoint.h', 'group.h',
+    'fluxnormal.h', 'freedom.h', 'gausspoint.h', 'gausspointbatch.h',
+    'group.h',
     'indextypes.h', 'invariant.h', 'linearizedsystem.h',
     'mastercoord.h', 'masterelement.h', 'material.h', 'materialset.h',
     'materialsubproblem.h', 'meshdatacache.h', 'meshiterator.h',
@@ -122,6 +131,7 @@ hfiles = [
     'planarity.h', 'pointdata.h', 'predicatesubproblem.h',
     'property.h', 'pypropertywrapper.h', 'rank3tensor.h',
     'recoveredflux.h', 'shapefunction.h', 'shapefunctioncache.h',
+    'shapefunctionstore.h',
     'smallsystem.h', 'sparsemat.h', 'steperrorscaling.h', 'symeig3.h',
     'symmmatrix.h',
 ]
@@ -23,7 +23,8 @@ swigfiles = ['contour.swg', 'propertyoutput.swg']
 
 pyfiles = [ 'analyze.py', 'analyzemenu.py', 'anisocijkl.py',
             'boundaryconditionmenu.py', 'boundarymenu.py',
-            'centerfilldisplay.py', 'contourdisplay.py', 'displaymethods.py',
+            'centerfilldisplay.py', 'columnfile.py', 'contourdisplay.py',
+            'displaymethods.py',
             'elementselectdisplay.py', 'interfacemenu.py',
             'interfaceparameters.py', 'isocijkl.py', 'materialmenu.py',
             'materialparameter.py', 'meshIO.py', 'meshbdymenu.py',
@@ -176,4 +176,6 @@ class TextDestinationWidget(parameterwidgets.ParameterWidget):
         else:
             mode = outputdestination.getLatestMode(name,
                                                    filenameparam.WriteMode("w"))
+            if outputdestination.isColumnStream(name):
+                return outputdestination.ColumnOutputStream(name, mode)
             return outputdestination.OutputStream(name, mode)
@@ -88,10 +88,9 @@ class OneLineDataOperation(DataOperation):
 
     def printResults(self, time, results, destination):
         if formatchars.showTime():
-            print >> destination, time, 
-        for x in results:
-            print >> destination, x,
-        print >> destination
+            destination.writeRow([time] + list(results))
+        else:
+            destination.writeRow(results)
 
     def colNames(self, output):
         raise ooferror.ErrPyProgrammingError(
@@ -116,8 +115,10 @@ class DirectOutput(DataOperation):
                                             destination)
             return
 
-        # "olist" is a list of tuples of the form (sample, value).
-        olist = sampling.evaluate(domain, output)
+        # "olist" is an iterator over tuples of the form (sample,
+        # value).  Using an iterator lets the values be written as
+        # they're computed, instead of all being stored first.
+        olist = sampling.evaluateIter(domain, output)
         header = sampling.get_col_names()
 
         if formatchars.showTime():
@@ -126,18 +127,11 @@ class DirectOutput(DataOperation):
         for (s,v) in olist:
             tags = s.columnData(header)
             if len(tags)==1:
-                for t in tags[0]: # tags[0] is a list of strings
-                    print >> destination, t,
-                for x in v.value_list():
-                    print >> destination, x,
-                print >> destination
+                # tags[0] is a list of strings
+                destination.writeRow(list(tags[0]) + list(v.value_list()))
             else: # Multiple values -- do above for each tag-val pair.
                 for (tag, val) in zip(tags, v):
-                    for t in tag:
-                        print >> destination, t,
-                    for x in val.value_list():
-                        print >> destination, x,
-                    print >> destination
+                    destination.writeRow(list(tag) + list(val.value_list()))
 
 # "Direct Output" is special, in that the corresponding auto-generated
 # menu item is used directly in the meshcstoolboxGUI code -- if the
@@ -159,11 +153,11 @@ def _getMoments(sampling, domain, output, exponents):
     moments = []
     for exponent in exponents:
         # If exponent is 0, this call doesn't really evaluate the output.
-        integrals = sampling.integrate(domain, output, power=exponent)
-        # Convert the list to an iterator so that we don't have to
-        # work hard to initialize the sum to the right kind of zero
-        # (eg, 0 or OutputVal.zero()).
-        integraliter = iter(integrals)
+        # Using an iterator means that we don't have to work hard to
+        # initialize the sum to the right kind of zero (eg, 0 or
+        # OutputVal.zero()).
+        integraliter = sampling.integrateIter(domain, output,
+                                              power=exponent)
         sample, sum = integraliter.next()
         for sample, value in integraliter:
             sum += value
@@ -191,11 +185,12 @@ def _arithmeticOutputFilter(output):
 
 class RangeOutput(OneLineDataOperation):
     def __call__(self, time, output, domain, sampling, destination):
-        olist = sampling.evaluate(domain, output)
-        if len(olist) > 0:
-            vmin = vmax = olist[0][1].initRange()
-            for sample, value in olist:
-                vmin, vmax = value.expandRange(vmin, vmax)
+        vmin = vmax = None
+        for sample, value in sampling.evaluateIter(domain, output):
+            if vmin is None:
+                vmin = vmax = value.initRange()
+            vmin, vmax = value.expandRange(vmin, vmax)
+        if vmin is not None:
             self.printResults(time, utils.flatten_all([vmin, vmax]),
                               destination)
         # vmin = None
@@ -121,6 +121,7 @@ def _ops_callback(menuitem, mesh, time, data, domain, sampling, destination,
         t = meshctxt.getTime(time) # converts '<latest>' to time, if needed
         meshctxt.restoreCachedData(t)
         destination.open()
+        destination.setTime(t)
         try:
             if sampling.make_samples(domain):
                 printBulkHeaders(destination, operation, data, domain, sampling)
@@ -0,0 +1,282 @@
+# -*- python -*-
+
+# This software was produced by NIST, an agency of the U.S. government,
+# and by statute is not subject to copyright in the United States.
+# Recipients of this software assume all responsibilities associated
+# with its operation, modification and maintenance. However, to
+# facilitate maintenance we ask that before distributing modified
+# versions of this software, you first contact the authors at
+# oof_manager@nist.gov.
+
+# Binary column files, written by the ColumnOutputStream
+# OutputDestination in outputdestination.py.  The data from each
+# time step is stored in a separate chunk, as a set of typed columns.
+# Each chunk carries its own header comments and column names, so
+# that outputs with different columns can share a file.  An index of
+# chunk times and offsets is written at the end of the file when it's
+# closed, so that a reader can find the data for a given time without
+# reading the whole file.  If the index is missing (because the file
+# wasn't closed properly) the reader scans the chunks instead.
+
+# The file layout is
+#   FILEMAGIC version
+#   CHUNKMAGIC time nrows ncols metalength metadata column column ...
+#   CHUNKMAGIC ...
+#   INDEXMAGIC nchunks (time offset)*nchunks indexoffset ENDMAGIC
+# All numbers are little-endian.  The metadata is a JSON dictionary
+# containing the header comments, the column names, and a string of
+# type codes, one per column.  Columns of type 'd' are doubles, type
+# 'i' are 64 bit integers, and type 's' are null-separated utf-8
+# strings, preceded by their total length.  The time is NaN if it
+# wasn't known when the chunk was written.
+
+import json
+import math
+import os
+import struct
+
+FILEMAGIC = "OOF2COLS"
+CHUNKMAGIC = "CHNK"
+INDEXMAGIC = "TIDX"
+ENDMAGIC = "OOF2CEND"
+VERSION = 1
+
+_fileHeader = struct.Struct("<8sI")
+_chunkHeader = struct.Struct("<4sdIII")
+_indexHeader = struct.Struct("<4sI")
+_indexEntry = struct.Struct("<dQ")
+_trailer = struct.Struct("<Q8s")
+
+class ColumnFileError(Exception):
+    pass
+
+def _isNumber(x):
+    return isinstance(x, (int, long, float)) and not isinstance(x, bool)
+
+def _typeColumn(values):
+    # Choose the narrowest type that can hold all of the values, and
+    # convert them.  Strings that look like numbers are stored as
+    # numbers, so that text written with "print >>" is still typed.
+    if all(isinstance(x, (int, long)) and not isinstance(x, bool)
+           for x in values):
+        return 'i', values
+    if all(_isNumber(x) for x in values):
+        return 'd', [float(x) for x in values]
+    try:
+        return 'i', [int(x) for x in values]
+    except (ValueError, TypeError):
+        pass
+    try:
+        return 'd', [float(x) for x in values]
+    except (ValueError, TypeError):
+        return 's', [unicode(x) for x in values]
+
+def _packColumn(typecode, values):
+    n = len(values)
+    if typecode == 'd':
+        return struct.pack("<%dd" % n, *values)
+    if typecode == 'i':
+        return struct.pack("<%dq" % n, *values)
+    data = "\0".join(x.encode('utf-8') for x in values)
+    return struct.pack("<I", len(data)) + data
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+class ColumnFileWriter(object):
+    # The arguments are the same as the arguments to the built-in
+    # file(), so that this can be used as the 'openfile' function in
+    # a BaseOutputStream.
+    def __init__(self, filename, mode="w"):
+        self.filename = filename
+        self.index = []         # (time, offset) for each chunk
+        if mode == "a" and os.path.exists(filename):
+            self.file = open(filename, "r+b")
+            self.index, end = _readIndex(self.file)
+            # Overwrite the old index.  A new one is written by close().
+            self.file.seek(end)
+            self.file.truncate()
+        else:
+            self.file = open(filename, "wb")
+            self.file.write(_fileHeader.pack(FILEMAGIC, VERSION))
+
+    def writeChunk(self, time, comments, names, rows):
+        # rows is a list of lists, all of the same length.  The
+        # columns may contain ints, floats, or strings.
+        ncols = len(rows[0])
+        nrows = len(rows)
+        names = list(names[:ncols])
+        for i in range(len(names), ncols):
+            names.append("column %d" % (i+1))
+        types = []
+        data = []
+        for col in zip(*rows):
+            typecode, values = _typeColumn(col)
+            types.append(typecode)
+            data.append(_packColumn(typecode, values))
+        meta = json.dumps(dict(comments=comments, names=names,
+                               types="".join(types)))
+        if time is None:
+            time = float('nan')
+        self.index.append((time, self.file.tell()))
+        self.file.write(_chunkHeader.pack(CHUNKMAGIC, time, nrows, ncols,
+                                          len(meta)))
+        self.file.write(meta)
+        for d in data:
+            self.file.write(d)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            indexoffset = self.file.tell()
+            self.file.write(_indexHeader.pack(INDEXMAGIC, len(self.index)))
+            for entry in self.index:
+                self.file.write(_indexEntry.pack(*entry))
+            self.file.write(_trailer.pack(indexoffset, ENDMAGIC))
+            self.file.close()
+            self.file = None
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+def _readIndex(phile):
+    # Return the chunk index of an open file and the offset of the end
+    # of the chunk data.
+    phile.seek(0)
+    magic, version = _fileHeader.unpack(phile.read(_fileHeader.size))
+    if magic != FILEMAGIC:
+        raise ColumnFileError("%s is not a column file" % phile.name)
+    if version > VERSION:
+        raise ColumnFileError("%s was written by a newer version of OOF2"
+                              % phile.name)
+    phile.seek(0, os.SEEK_END)
+    size = phile.tell()
+    if size >= _fileHeader.size + _trailer.size:
+        phile.seek(size - _trailer.size)
+        indexoffset, endmagic = _trailer.unpack(phile.read(_trailer.size))
+        if endmagic == ENDMAGIC:
+            phile.seek(indexoffset)
+            magic, n = _indexHeader.unpack(phile.read(_indexHeader.size))
+            if magic == INDEXMAGIC:
+                data = phile.read(n*_indexEntry.size)
+                return ([_indexEntry.unpack_from(data, i*_indexEntry.size)
+                         for i in xrange(n)],
+                        indexoffset)
+    return _scanChunks(phile, size)
+
+def _scanChunks(phile, size):
+    # Rebuild the index of a file that wasn't closed properly.  An
+    # incomplete chunk at the end is ignored.
+    index = []
+    offset = _fileHeader.size
+    while offset + _chunkHeader.size <= size:
+        phile.seek(offset)
+        magic, time, nrows, ncols, metalen = _chunkHeader.unpack(
+            phile.read(_chunkHeader.size))
+        if magic != CHUNKMAGIC:
+            break
+        try:
+            meta = json.loads(phile.read(metalen))
+            for typecode in meta['types']:
+                if typecode == 's':
+                    (nbytes,) = struct.unpack("<I", phile.read(4))
+                    phile.seek(nbytes, os.SEEK_CUR)
+                else:
+                    phile.seek(8*nrows, os.SEEK_CUR)
+        except (ValueError, KeyError, struct.error):
+            break
+        end = phile.tell()
+        if end > size:
+            break
+        index.append((time, offset))
+        offset = end
+    return index, offset
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# Reader API.  ColumnFile(filename).times() lists the times in the
+# file, and ColumnFile(filename).chunks(time) returns the Chunks
+# written at that time.
+
+class Chunk(object):
+    def __init__(self, time, comments, names, columns):
+        self.time = time
+        self.comments = comments # header comments, as strings
+        self.names = names       # column names
+        self.columns = columns   # list of lists of values
+    def nrows(self):
+        if self.columns:
+            return len(self.columns[0])
+        return 0
+    def column(self, name):
+        return self.columns[self.names.index(name)]
+    def rows(self):
+        return zip(*self.columns)
+    def __repr__(self):
+        return "Chunk(time=%s, names=%s, nrows=%d)" % (self.time, self.names,
+                                                       self.nrows())
+
+class ColumnFile(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, "rb")
+        self.index, end = _readIndex(self.file)
+
+    def close(self):
+        self.file.close()
+
+    def times(self):
+        # Return the distinct times in the file, in the order in which
+        # they were written.  Chunks written without a time have time
+        # None.
+        result = []
+        for time, offset in self.index:
+            t = _timeOrNone(time)
+            if t not in result:
+                result.append(t)
+        return result
+
+    def chunks(self, time=None):
+        # Return all chunks, or just the ones written at the given
+        # time.
+        return [self._readChunk(offset) for t, offset in self.index
+                if time is None or _timeOrNone(t) == time]
+
+    def __iter__(self):
+        for t, offset in self.index:
+            yield self._readChunk(offset)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _readChunk(self, offset):
+        self.file.seek(offset)
+        magic, time, nrows, ncols, metalen = _chunkHeader.unpack(
+            self.file.read(_chunkHeader.size))
+        if magic != CHUNKMAGIC:
+            raise ColumnFileError("Bad chunk at offset %d in %s"
+                                  % (offset, self.filename))
+        meta = json.loads(self.file.read(metalen))
+        columns = []
+        for typecode in meta['types']:
+            if typecode == 'd':
+                columns.append(list(struct.unpack(
+                    "<%dd" % nrows, self.file.read(8*nrows))))
+            elif typecode == 'i':
+                columns.append(list(struct.unpack(
+                    "<%dq" % nrows, self.file.read(8*nrows))))
+            else:
+                (nbytes,) = struct.unpack("<I", self.file.read(4))
+                data = self.file.read(nbytes)
+                if nrows == 0:
+                    columns.append([])
+                else:
+                    columns.append([x.decode('utf-8')
+                                    for x in data.split("\0")])
+        return Chunk(_timeOrNone(time), meta['comments'], meta['names'],
+                     columns)
+
+def _timeOrNone(time):
+    if math.isnan(time):
+        return None
+    return time
@@ -22,6 +22,7 @@ from ooflib.common import enum
 from ooflib.common import labeltree
 from ooflib.common import registeredclass
 from ooflib.common import utils
+from ooflib.common.IO import binarydata
 from ooflib.common.IO import datafile
 from ooflib.common.IO import filenameparam
 from ooflib.common.IO import mainmenu
@@ -50,6 +51,7 @@ from ooflib.engine.IO import scheduledoutput
 from ooflib.engine.IO.skeletonIO import rearrangeEdges
 import ooflib.SWIG.engine.equation
 import ooflib.SWIG.engine.field
+import array
 import ooflib.engine.mesh
 import ooflib.engine.subproblemcontext
 
@@ -68,21 +70,6 @@ meshmenu = OOF.LoadData.addItem(OOFMenuItem(
 subpmenu = OOF.LoadData.addItem(OOFMenuItem(
         'Subproblem', help="Load a Subproblem from a data file."))
 
-def getNodeSets(femesh):
-    nodesets = {}               # lists of nodes keyed by fieldSetID.
-    for node in femesh.funcnode_iterator():
-        fieldsetid = node.fieldSetID()
-        try:
-            nodesets[fieldsetid].append(node)
-        except KeyError:
-            nodesets[fieldsetid] = [node]
-    # Make sure that Fields are always listed in the same order, to
-    # facilitate testing.  Since fieldSetIDs are integers, we just
-    # sort the set of IDs.
-    ids = nodesets.keys()
-    ids.sort()
-    return ids, nodesets
-
 def writeFields(dfile, meshcontext):
     # Field values
     # fields = ["Displacement", "Temperature"] : ListOfStrings
@@ -113,34 +100,40 @@ def writeFields(dfile, meshcontext):
     # each set of Nodes.  The Fields defined on a Node are determined
     # by the Node's FieldSet, so we can use the fieldSetID.
 
+    # The values for each set of Nodes are extracted from the FEMesh
+    # in one call, as a buffer of doubles.  Binary data files store
+    # the buffer directly.  Ascii files store it as a list of tuples,
+    # one per Node.
+
     femesh = meshcontext.getObject()
-    ids, nodesets = getNodeSets(femesh)
-    for fieldsetID in ids:
-        nodelist= nodesets[fieldsetID]
+    binary = isinstance(dfile, binarydata.BinaryDataFile)
+    # Since fieldSetIDs are integers, getFieldSetIDs just sorts them,
+    # so that Fields are always listed in the same order.  This
+    # facilitates testing.
+    for fieldsetID in femesh.getFieldSetIDs():
         fieldnames = femesh.getFieldSetByID(fieldsetID)
         fieldnames.sort()
-        fields = [getFieldObj(name) for name in fieldnames]
-        values = []
-        for node in nodelist:
-            fv = [node.index()]
-            for field in fields:
-                for i in range(field.ndof()):
-                    fv.append(field.value(femesh, node, i))
-            values.append(tuple(fv))
-## TODO: figure out what's wrong with this version, and if it's faster
-## when fixed:
-#             values = [
-#                 tuple(
-#                     [node.index()] + [field.value(femesh, node, i)
-#                                       for i in range(field.ndof())
-#                                       for field in fields]
-#                     )
-#                 for node in nodelist]
-        dfile.startCmd(meshmenu.Load_Field)
-        dfile.argument('mesh', meshcontext.path())
-        dfile.argument('fields', fieldnames)
-        dfile.argument('field_values', values)
-        dfile.endCmd()
+        nodes = array.array('i')
+        nodes.fromstring(femesh.getFieldSetNodes(fieldsetID))
+        values = array.array('d')
+        values.fromstring(femesh.getFieldValues(fieldsetID, fieldnames))
+        if binary:
+            dfile.startCmd(meshmenu.Load_Field_Array)
+            dfile.argument('mesh', meshcontext.path())
+            dfile.argument('fields', fieldnames)
+            dfile.argument('nodes', nodes)
+            dfile.argument('field_values', values)
+            dfile.endCmd()
+        else:
+            nvals = len(values)/max(len(nodes), 1)
+            vlist = values.tolist()
+            dfile.startCmd(meshmenu.Load_Field)
+            dfile.argument('mesh', meshcontext.path())
+            dfile.argument('fields', fieldnames)
+            dfile.argument('field_values',
+                           [tuple([index] + vlist[k*nvals:(k+1)*nvals])
+                            for k, index in enumerate(nodes)])
+            dfile.endCmd()
 
 def writeAndCacheFields(dfile, meshcontext, time):
     writeFields(dfile, meshcontext)
@@ -444,17 +437,17 @@ subpmenu.addItem(OOFMenuItem(
     ))
 
 def _loadFieldValues(menuitem, mesh, fields, field_values):
+    # Convert the tuples to the arrays used by Load_Field_Array.
+    nodes = array.array('i', [fv[0] for fv in field_values])
+    values = array.array('d')
+    for fv in field_values:
+        values.extend(fv[1:])
+    _loadFieldArray(menuitem, mesh, fields, nodes, values)
+
+def _loadFieldArray(menuitem, mesh, fields, nodes, field_values):
     meshctxt = ooflib.engine.mesh.meshes[mesh]
     femesh = meshctxt.getObject()
-    fieldlist = [getFieldObj(fld) for fld in fields] # get objects from names
-    for fv in field_values:
-        index = fv[0]
-        node = femesh.getNode(index)
-        pointer = 1
-        for field in fieldlist:
-            for i in range(field.ndof()):
-                field.setvalue(femesh, node, i, fv[pointer])
-                pointer += 1
+    femesh.setFieldValues(fields, nodes.tostring(), field_values.tostring())
 
     # Field values can change the appearance of a newly-loaded mesh.
     switchboard.notify("mesh data changed", meshctxt)
@@ -482,6 +475,28 @@ meshmenu.addItem(OOFMenuItem(
     </para>"""
     ))
 
+meshmenu.addItem(OOFMenuItem(
+    'Load_Field_Array',
+    callback = _loadFieldArray,
+    params=[whoville.WhoParameter('mesh', ooflib.engine.mesh.meshes,
+                                  tip=parameter.emptyTipString),
+            parameter.ListOfStringsParameter('fields',
+                                             tip="Names of Fields."),
+            parameter.IntArrayParameter('nodes', tip="Node indices."),
+            parameter.DoubleArrayParameter('field_values',
+                                           tip="Values of Fields.")],
+    help="Load Field values.  Used internally in binary Mesh data files.",
+    discussion="""<para>
+    Load values for a &field; at the &nodes; of a saved &mesh;.  This
+    is the same as <link
+    linkend='MenuItem-OOF.LoadData.Mesh.Load_Field'>Load_Field</link>,
+    but the data is stored more compactly.  <varname>nodes</varname>
+    is an array of node numbers, and <varname>field_values</varname>
+    is an array containing the components of the listed fields at
+    each node, in the listed order.
+    </para>"""
+    ))
+
 def _loadTime(menuitem, mesh, time):
     meshctxt = ooflib.engine.mesh.meshes[mesh]
     meshctxt.setCurrentTime(time)
@@ -64,6 +64,7 @@ def _meshBdyAnalyze(menuitem, mesh, time, boundary, analyzer, destination):
         meshctxt.restoreCachedData(t)
         try:
             destination.open()
+            destination.setTime(t)
             destination.printHeadersIfNeeded(analyzer, boundary)
             analyzer.analyze(meshctxt, t, boundary, destination)
             destination.close()
@@ -1460,6 +1460,63 @@ settingsmenu.addItem(oofmenu.OOFMenuItem(
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+from ooflib.SWIG.engine import csubproblem
+
+def _coloredAssembly(menuitem, colored):
+    csubproblem.cvar.colored_assembly = colored
+
+if config.enable_openmp():
+    settingsmenu.addItem(oofmenu.OOFMenuItem(
+            "Parallel_Assembly",
+            callback=_coloredAssembly,
+            params=[
+                parameter.BooleanParameter(
+                    "colored",
+                    csubproblem.cvar.colored_assembly,
+                    tip="Color the elements instead of giving each thread its own copy of the matrices.")],
+            help="Choose how the matrices are built when OOF2 uses multiple threads.",
+            discussion="""<para>
+    When <varname>colored</varname> is <constant>true</constant>, the
+    elements are divided into colors such that no two elements of the
+    same color share a node.  The threads build the elements of each
+    color in parallel, writing directly into a single copy of the
+    matrices.  This uses less memory than the default method, in which
+    each thread builds its own copy of the matrices and the copies are
+    combined afterwards, and it avoids the serial combination step.
+    Interface elements are colored in the same way.
+    </para>"""
+            ))
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+from ooflib.SWIG.engine import femesh
+
+def _shapeFunctionStore(menuitem, budget):
+    femesh.cvar.shapefunction_store_budget = budget
+
+settingsmenu.addItem(oofmenu.OOFMenuItem(
+        "Shape_Function_Storage",
+        callback=_shapeFunctionStore,
+        params=[
+            parameter.FloatParameter(
+                "budget",
+                femesh.cvar.shapefunction_store_budget,
+                tip="Memory to use for each Mesh, in megabytes.  0 disables storage.")],
+        help="Keep the shape function derivatives of all elements, instead of recomputing them on each pass over a Mesh.",
+        discussion="""<para>
+    OOF2 normally remembers the real-space shape function derivatives
+    and jacobians only for the element that it's currently working
+    on.  When the <varname>budget</varname> is positive, each Mesh
+    stores them for all of its elements, so that they aren't
+    recomputed when the matrices are rebuilt, during every iteration
+    of a nonlinear solver, or when outputs are evaluated.  If the
+    stored data exceeds the budget, the data for the least recently
+    used groups of elements is discarded and recomputed when needed.
+    </para>"""
+        ))
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 def _removeAllSolvers(menuitem, mesh):
     meshctxt = ooflib.engine.mesh.meshes[mesh]
     for subprob in meshctxt.subproblems():
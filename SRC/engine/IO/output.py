@@ -17,6 +17,7 @@ from ooflib.common import primitives
 from ooflib.common import utils
 from ooflib.common.IO import parameter
 from ooflib.common.IO import xmlmenudump
+import itertools
 import string
 import struct
 import types
@@ -36,6 +37,11 @@ class OutputType(enum.EnumClass('Scalar', 'Aggregate')):
 ## run-time by assembling predefined Outputs into new Output chains.
 
 class Output(object):
+    # The number of elements or samples evaluated at once by the
+    # iterators evaluateChunks() and iterate(), and by
+    # PointSampleSet.integrateIter().
+    chunksize = 1000
+
     def __init__(self, name, otype, callback, inputs=[], params=[],
                  tip=parameter.emptyTipString,
                  discussion=parameter.emptyTipString,
@@ -484,7 +490,11 @@ class Output(object):
         return False
 
     def evaluate(self, mesh, elements, coords):
-        ## TODO OPT: Use generators instead of lists!
+        # evaluate() computes the values of all of the Output's inputs
+        # at all of the given points before calling the callback, so
+        # the memory it uses is proportional to the number of points.
+        # Use evaluateChunks() or iterate() when there are many
+        # points and the values are only needed one at a time.
         argdict = {}
         for inputname, input in self.inputs.items():
             argdict[inputname] = input.evaluate(mesh, elements, coords)
@@ -492,6 +502,30 @@ class Output(object):
             argdict[paramname] = param.value
         return self.callback(mesh, elements, coords, **argdict)
 
+    def evaluateChunks(self, mesh, elements, coords, size=None):
+        # A generator that evaluates the Output on 'size' elements at
+        # a time, yielding a list of values for each group.  The whole
+        # Output tree is evaluated for each group before the next one
+        # is started, so only one group's worth of intermediate values
+        # exists at any time.  'elements' and 'coords' can be any
+        # iterables, such as mesh.element_iterator().
+        if size is None:
+            size = self.chunksize
+        pairs = itertools.izip(elements, coords)
+        while True:
+            chunk = list(itertools.islice(pairs, size))
+            if not chunk:
+                return
+            yield self.evaluate(mesh, [el for el, c in chunk],
+                                [c for el, c in chunk])
+
+    def iterate(self, mesh, elements, coords, size=None):
+        # Like evaluate(), but returns an iterator over the values
+        # instead of a list.
+        for values in self.evaluateChunks(mesh, elements, coords, size):
+            for value in values:
+                yield value
+
     def __eq__(self, other):
         return (self.name == other.name and
                 self.callback == other.callback and
@@ -34,10 +34,11 @@ import sys
 
 # See comments in output.py.
 
-## TODO: Output.evaluate() should return an iterator instead of a list
-## of outputvals.  Some code that uses outputs tries to index a list
-## (eg MeshDataGUI.updateData), and some code needs to make multiple
-## passes (eg, contour), so those bits will have to be changed. 
+## Output.evaluate() returns a list of outputvals.  Output.iterate()
+## and Output.evaluateChunks() evaluate the Output a few elements at a
+## time.  Some code that uses outputs tries to index a list (eg
+## MeshDataGUI.updateData), and some code needs to make multiple
+## passes (eg, contour), so those bits still use evaluate().
 
 ## TODO: Add progress bars to more outputs?
 
@@ -9,6 +9,7 @@
 # oof_manager@nist.gov. 
 
 from ooflib.SWIG.common import lock
+from ooflib.SWIG.common import ooferror
 from ooflib.SWIG.common import switchboard
 from ooflib.common import debug
 from ooflib.common import enum
@@ -20,6 +21,7 @@ from ooflib.common.IO import filenameparam
 from ooflib.common.IO import parameter
 from ooflib.common.IO import reporter
 from ooflib.common.IO import xmlmenudump
+from ooflib.engine.IO import columnfile
 import os
 import weakref
 
@@ -37,6 +39,9 @@ class OutputDestination(registeredclass.RegisteredClass):
         pass
     def close(self):
         pass
+    def setTime(self, time):
+        # Called before the output for each time step is written.
+        pass
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
@@ -181,6 +186,115 @@ class BaseOutputStream(object):
                                  [x for x in args] ))
         self.file.write("\n")
         self.seplast = False
+    def writeRow(self, values):
+        # Equivalent to "print >> self, x," for each value, followed
+        # by "print >> self".
+        for i, x in enumerate(values):
+            if i > 0:
+                self.write(" ")
+            self.write(str(x))
+        self.write("\n")
+    def setTime(self, time):
+        pass
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# BaseColumnStream does the work for ColumnOutputStream, which writes
+# Output data to a binary column file (see columnfile.py).  It
+# collects the values written by the Outputs into rows, and writes the
+# rows as a chunk when the time changes, when a new header is started,
+# or when the stream is flushed or closed.  Values passed to writeRow
+# are stored at full precision.  Text written with "print >>" is
+# split into rows and converted to numbers where possible.
+
+class BaseColumnStream(BaseOutputStream):
+    def __init__(self, filename, mode):
+        BaseOutputStream.__init__(self, filename, mode,
+                                  columnfile.ColumnFileWriter)
+        self.time = None
+        self.comments = []      # header comments for the current chunk
+        self.names = []         # column names for the current chunk
+        self.inHeader = False   # was the last thing written a comment?
+        self.inColumns = False  # are the comments listing column names?
+        self.row = []           # tokens in the current row
+        self.rows = []          # rows in the current chunk
+    def _endRow(self):
+        row = self.row
+        self.row = []
+        self._addRow(row)
+    def _addRow(self, row):
+        if self.rows and len(row) != len(self.rows[0]):
+            self._endChunk()
+        if row:
+            self.rows.append(row)
+        self.inHeader = False
+    def _endChunk(self):
+        if self.row:
+            self._endRow()
+        if self.rows and self.file is not None:
+            self.file.writeChunk(self.time, self.comments, self.names,
+                                 self.rows)
+        self.rows = []
+    def setTime(self, time):
+        self.lock.acquire()
+        try:
+            if time != self.time:
+                self._endChunk()
+                self.time = time
+        finally:
+            self.lock.release()
+    def printHeadersIfNeeded(self, output, *args, **kwargs):
+        if self.lastOutput != output or self.lastargs != (args, kwargs):
+            output.printHeaders(self, *args, **kwargs)
+            self.lastOutput = output
+            self.lastargs = (args, kwargs)
+    def write(self, text):
+        if text == "\n":
+            self._endRow()
+        elif text != " ":
+            self.row.append(text)
+    def writeRow(self, values):
+        if self.row:
+            self._endRow()
+        self._addRow(list(values))
+    def comment(self, *args):
+        if args and args[0] == "time:":
+            # DirectOutput writes the time as a comment.
+            self.setTime(float(args[1]))
+            return
+        if not self.inHeader:
+            # Starting a new header.
+            self._endChunk()
+            self.comments = []
+            self.names = []
+            self.inHeader = True
+            self.inColumns = False
+        self.comments.append(" ".join(args))
+        if self.inColumns and args and args[0].endswith("."):
+            self.names.append(" ".join(args[1:]))
+        elif args and args[0] == "Columns:":
+            self.inColumns = True
+    def flush(self):
+        self.lock.acquire()
+        try:
+            self._endChunk()
+        finally:
+            self.lock.release()
+        BaseOutputStream.flush(self)
+    def close(self):
+        self.lock.acquire()
+        try:
+            if self.nOpen == 1:
+                self._endChunk()
+                self.time = None
+        finally:
+            self.lock.release()
+        BaseOutputStream.close(self)
+    def rewind(self):
+        self.row = []
+        self.rows = []
+        self.time = None
+        BaseOutputStream.rewind(self)
 
 def rewindStream(filename):
     stream = _allStreams[filename]
@@ -211,6 +325,10 @@ class TextOutputDestination(OutputDestination):
         self.basestream.write(text)
     def comment(self, *args):
         self.basestream.comment(*args)
+    def writeRow(self, values):
+        self.basestream.writeRow(values)
+    def setTime(self, time):
+        self.basestream.setTime(time)
     def close(self):
         self.basestream.close()
 
@@ -231,6 +349,10 @@ class OutputStream(TextOutputDestination):
             except KeyError:
                 basestream = BaseOutputStream(filename, mode, file)
             else:
+                if isinstance(basestream, BaseColumnStream):
+                    raise ooferror.ErrUserError(
+                        "%s is already being used as a column file."
+                        % filename)
                 basestream.mode = mode
         finally:
             _streamsLock.release()
@@ -258,6 +380,51 @@ newreg = registeredclass.Registration(
     
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+# ColumnOutputStream is like OutputStream, but writes a binary column
+# file instead of text.  Use columnfile.ColumnFile to read it.
+
+class ColumnOutputStream(TextOutputDestination):
+    def __init__(self, filename, mode):
+        self.filename = filename
+        self.mode = mode
+        try:
+            _streamsLock.acquire()
+            try:
+                basestream = _allStreams[filename]
+            except KeyError:
+                basestream = BaseColumnStream(filename, mode)
+            else:
+                if not isinstance(basestream, BaseColumnStream):
+                    raise ooferror.ErrUserError(
+                        "%s is already being used as a text file." % filename)
+                basestream.mode = mode
+        finally:
+            _streamsLock.release()
+        TextOutputDestination.__init__(self, basestream)
+        switchboard.notify("output destinations changed")
+    def flush(self):
+        self.basestream.flush()
+    def shortrepr(self):
+        return "%s (columns)" % self.filename
+
+registeredclass.Registration(
+    'Column File',
+    OutputDestination,
+    ColumnOutputStream,
+    ordering=2,
+    rewindable=True,
+    params=[
+        filenameparam.WriteFileNameParameter(
+            'filename', tip=parameter.emptyTipString),
+        filenameparam.WriteModeParameter(
+            'mode', tip="Whether to write or append to the file.")
+        ],
+    tip="Send output to a binary file, with one chunk of typed columns for each time.",
+    discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/columnstream.xml')
+)
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 msgWindowName = "<Message Window>"
     
 class MessageWindowStream(TextOutputDestination):
@@ -298,6 +465,9 @@ def forgetTextOutputStreams():
         _streamsLock.release()
     switchboard.notify("output destinations changed")
 
+def isColumnStream(filename):
+    return isinstance(_allStreams.get(filename), BaseColumnStream)
+
 def getLatestMode(filename, default):
     try:
         return _allStreams[filename].mode
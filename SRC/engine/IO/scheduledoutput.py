@@ -286,8 +286,9 @@ class StepStatistics(ScheduledOutput):
             if dev2 < 0.0:      # roundoff
                 dev2 = 0.0
             self.destination.printHeadersIfNeeded(self)
-            print >> self.destination, avgstep, math.sqrt(dev2), \
-                self.minstep, self.maxstep, self.nsteps
+            self.destination.writeRow([avgstep, math.sqrt(dev2),
+                                       self.minstep, self.maxstep,
+                                       self.nsteps])
         ScheduledOutput.finish(self, meshcontext)
     def printHeaders(self, destination):
         destination.comment(
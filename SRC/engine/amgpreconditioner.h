@@ -0,0 +1,153 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+// Smoothed aggregation algebraic multigrid, written as a
+// preconditioner that can be used in Eigen's iterative solvers.  See
+// cmatrixmethods.h.
+//
+// The setup phase builds a hierarchy of coarser matrices.  On each
+// level, the unknowns are grouped into aggregates of strongly
+// connected blocks of unknowns.  The tentative prolongator maps the
+// near nullspace of the operator (see NearNullspace, below) on each
+// aggregate to a set of coarse unknowns, and is smoothed with one
+// step of damped Jacobi.  The coarse matrix is the Galerkin product P^T A P.  The
+// coarsest matrix is factored directly.
+//
+// Applying the preconditioner does one V-cycle with damped Jacobi
+// smoothing.  The cycle is symmetric, so it can be used with
+// ConjugateGradient as well as BiCGStab.
+
+#ifndef AMGPRECONDITIONER_H
+#define AMGPRECONDITIONER_H
+
+#include <oofconfig.h>
+#include "Eigen/Dense"
+#include "Eigen/SparseCore"
+#include "Eigen/SparseLU"
+#include <vector>
+
+// NearNullspace describes the vectors that the coarse levels must be
+// able to represent exactly, such as the rigid body modes of an
+// elastic body.  The unknowns are grouped into blocks, which are the
+// components of one Field at one Node.  Blocks are only aggregated
+// with other blocks of the same kind, which is the Field.  Block
+// numbers must run from 0 to the number of blocks minus one.  See
+// LinearizedSystem::near_nullspace_MCK().
+
+class NearNullspace {
+public:
+  NearNullspace(int n=0, int nmodes=0);
+  int size() const { return block.size(); }
+  int nmodes() const { return modes.cols(); }
+  int nblocks() const;
+  std::vector<int> block;	// block containing each unknown
+  std::vector<int> kind;	// kind of the block containing each unknown
+  Eigen::MatrixXd modes;	// one column for each mode
+};
+
+class AMGPreconditioner {
+private:
+  typedef Eigen::SparseMatrix<double, Eigen::ColMajor> Matrix;
+  typedef Eigen::VectorXd Vector;
+
+  struct Level {
+    Matrix A;			// operator on this level
+    Matrix P;			// prolongator from the next coarser level
+    Matrix R;			// restrictor to the next coarser level
+    Vector smoother;		// damping factor / diagonal
+  };
+  std::vector<Level> levels_;
+  Eigen::SparseLU<Matrix> coarseSolver_;
+  bool coarseFactored_;
+  bool isInitialized_;
+  Eigen::ComputationInfo info_;
+
+  double theta_;		// strength of connection threshold
+  int maxLevels_;
+  int coarseSize_;		// solve directly when this small
+  int nSmooth_;			// smoothing steps before and after
+
+  // The near nullspace of the fine level, if one has been provided.
+  // Without one, each unknown is its own block and the only mode is
+  // constant.
+  NearNullspace nullspace_;
+  bool haveNullspace_;
+
+  void setup(const Matrix&);
+  void vcycle(int, const Vector&, Vector&) const;
+  void smooth(int, const Vector&, Vector&) const;
+
+public:
+  typedef Vector::StorageIndex StorageIndex;
+  // This typedef is only used to export the scalar type and
+  // compile-time dimensions to Eigen's Solve class.
+  typedef Eigen::Matrix<double, Eigen::Dynamic, Eigen::Dynamic> MatrixType;
+
+  AMGPreconditioner();
+
+  template<typename MatType>
+  explicit AMGPreconditioner(const MatType &mat) : AMGPreconditioner() {
+    compute(mat);
+  }
+
+  Eigen::Index rows() const {
+    return levels_.empty() ? 0 : levels_[0].A.rows();
+  }
+  Eigen::Index cols() const {
+    return levels_.empty() ? 0 : levels_[0].A.cols();
+  }
+
+  template<typename MatType>
+  AMGPreconditioner &analyzePattern(const MatType&) {
+    return *this;
+  }
+
+  template<typename MatType>
+  AMGPreconditioner &factorize(const MatType &mat) {
+    Matrix A(mat);
+    A.makeCompressed();
+    setup(A);
+    return *this;
+  }
+
+  template<typename MatType>
+  AMGPreconditioner &compute(const MatType &mat) {
+    return factorize(mat);
+  }
+
+  template<typename Rhs, typename Dest>
+  void _solve_impl(const Rhs &b, Dest &x) const {
+    Vector bb(b);
+    Vector xx(bb.size());
+    vcycle(0, bb, xx);
+    x = xx;
+  }
+
+  template<typename Rhs>
+  inline const Eigen::Solve<AMGPreconditioner, Rhs>
+  solve(const Eigen::MatrixBase<Rhs> &b) const {
+    eigen_assert(isInitialized_ && "AMGPreconditioner is not initialized.");
+    return Eigen::Solve<AMGPreconditioner, Rhs>(*this, b.derived());
+  }
+
+  Eigen::ComputationInfo info() { return info_; }
+
+  int nlevels() const { return levels_.size(); }
+  void set_strength_threshold(double theta) { theta_ = theta; }
+  void set_max_levels(int n) { maxLevels_ = n; }
+  void set_coarse_size(int n) { coarseSize_ = n; }
+  void set_smoothing_steps(int n) { nSmooth_ = n; }
+  // The near nullspace is ignored if its size doesn't match the
+  // matrix.  A null pointer clears it.
+  void set_near_nullspace(const NearNullspace*);
+};
+
+#endif // AMGPRECONDITIONER_H
@@ -116,21 +116,26 @@ class ElementSample(Sample):
     #     return self.index
     def integrate(self, domain, output, order, power=1):
         femesh = domain.meshctxt.getObject()
-        gauss_pts = self.element.integration_points(order)
-        pts = [x.mastercoord() for x in gauss_pts]
-        wgts = [x.weight() for x in gauss_pts]
+        pts, wgts = self.gaussPoints(order)
         if power==0:
             val = output.instancefn(output)
             return reduce(lambda x,y: x+y, wgts)*val.one()
-        else:                           # power > 0
-            vals = output.evaluate(femesh, [self.element], [pts])
-            if power == 1:
-                return reduce(lambda x,y: x+y[0]*y[1], zip(wgts, vals),
-                              vals[0].zero())
-            if power > 1:
-                return reduce(lambda x,y: x+y[0]*(y[1]**power),
-                              zip(wgts, vals),
-                              vals[0].zero())
+        vals = output.evaluate(femesh, [self.element], [pts])
+        return self.weightedSum(wgts, vals, power)
+    def gaussPoints(self, order):
+        # Returns the master coordinates and weights of the
+        # integration points.
+        gauss_pts = self.element.integration_points(order)
+        return ([x.mastercoord() for x in gauss_pts],
+                [x.weight() for x in gauss_pts])
+    def weightedSum(self, wgts, vals, power):
+        if power == 1:
+            return reduce(lambda x,y: x+y[0]*y[1], zip(wgts, vals),
+                          vals[0].zero())
+        if power > 1:
+            return reduce(lambda x,y: x+y[0]*(y[1]**power),
+                          zip(wgts, vals),
+                          vals[0].zero())
         raise ooferror.ErrPyProgrammingError("Impossible situation arose")
 
     # The ElementSample is actually not used for direct output, but
@@ -186,6 +191,9 @@ class ElementLineSample(Sample):
     # evaluate routine.  Returns a tuple of length n_points>2,
     # of evenly-spaced points.  
     def evaluate(self, femesh, output):
+        return output.evaluate( femesh, [self.element],
+                                [self.masterPoints()] )
+    def masterPoints(self):
         start = self.segment.start()
         end = self.segment.end()
         if self.n_points > 1:
@@ -196,8 +204,7 @@ class ElementLineSample(Sample):
         for i in range(self.n_points):
             lab_point = start+i*dx
             master_point_set.append(self.element.to_master(lab_point))
-        return output.evaluate( femesh, [self.element],
-                                [master_point_set] )
+        return master_point_set
     # This class has multiple data sets, and so overrides the
     # base-class columnData routine.
     def columnData(self, header):
@@ -269,8 +276,8 @@ class PixelSample(Sample):
 # Each SampleSet subclass must have a class-level "containedClass"
 # attribute which is set to the Sample subclass that it contains.
 
-## TODO: Have SampleSet.make_samples and SampleSet.integrate return
-## generators instead of lists.  See _getMoments in analyze.py.
+## TODO: Have SampleSet.make_samples return a generator instead of a
+## list.
 
 class SampleSet(registeredclass.RegisteredClass):
     registry = []
@@ -283,6 +290,26 @@ class SampleSet(registeredclass.RegisteredClass):
         return len(self.sample_list)
     def __getitem__(self, idx):
         return self.sample_list[idx]
+    # Iterator versions of evaluate() and integrate(), for callers
+    # that only need to look at each (sample, value) pair once.
+    # Subclasses compute their values output.chunksize samples at a
+    # time, so that all of the values don't have to be in memory at
+    # once.  evaluate() and integrate() return lists.
+    def evaluate(self, domain, output):
+        return list(self.evaluateIter(domain, output))
+    def integrate(self, domain, output, power=1):
+        return list(self.integrateIter(domain, output, power))
+    def evaluateIter(self, domain, output):
+        raise ooferror.ErrPyProgrammingError(
+            "evaluateIter isn't defined for " + self.__class__.__name__)
+    def integrateIter(self, domain, output, power=1):
+        raise ooferror.ErrPyProgrammingError(
+            "integrateIter isn't defined for " + self.__class__.__name__)
+    def chunks(self, output):
+        # Generates successive lists of samples, each with at most
+        # output.chunksize samples.
+        for start in xrange(0, len(self.sample_list), output.chunksize):
+            yield self.sample_list[start:start+output.chunksize]
     def get_col_names(self):
         # This version of get_col_names only applies to "direct"
         # subclasses.  The function is redefined in the
@@ -327,14 +354,27 @@ class ElementSampleSet(SampleSet):
         for e in els:
             self.sample_list.append(ElementSample(e))
         return len(els) > 0
-    def integrate(self, domain, output, power=1):
+    def integrateIter(self, domain, output, power=1):
         if self.order==automatic.automatic:
             order=2            # TODO: Do something cleverer here.
         else:
             order = self.order
-        vals = [x.integrate(domain, output, order, power)
-                for x in self.sample_list]
-        return zip(self.sample_list, vals)
+        femesh = domain.meshctxt.getObject()
+        for chunk in self.chunks(output):
+            quadrature = [x.gaussPoints(order) for x in chunk]
+            if power == 0:
+                one = output.instancefn(output).one()
+                for x, (pts, wgts) in zip(chunk, quadrature):
+                    yield (x, reduce(lambda a,b: a+b, wgts)*one)
+                continue
+            # Evaluate the Output at the integration points of all of
+            # the elements in the chunk at once.
+            vals = output.evaluate(femesh, [x.element for x in chunk],
+                                   [pts for pts, wgts in quadrature])
+            k = 0
+            for x, (pts, wgts) in zip(chunk, quadrature):
+                yield (x, x.weightedSum(wgts, vals[k:k+len(pts)], power))
+                k += len(pts)
     def get_col_names(self):    # see comment in SampleSet.
         return []
 
@@ -416,34 +456,55 @@ def DirectSampleSetRegistration(name, subclass, ordering, params=[],
 
 # PointSampleSet is the base class for SampleSets that consist of a
 # bunch of points, as opposed to a bunch of other things, like
-# elements or pixels.  All point sample sets share an "evaluate"
-# routine.  It returns a vector of tuples, each of the form
-# (point-sample, value-at-point).
+# elements or line segments.  All point sample sets share an
+# "evaluate" routine.  It returns a vector of tuples, each of the form
+# (point-sample, value-at-point).  PixelSampleSet is also derived from
+# PointSampleSet, because pixels are evaluated at their centers.
 
 class PointSampleSet(SampleSet):
-    def evaluate(self, domain, output):
-        return self.integrate(domain, output, power=1)
-    def integrate(self, domain, output, power=1):
+    def evaluateIter(self, domain, output):
+        return self.integrateIter(domain, output, power=1)
+    def integrateIter(self, domain, output, power=1):
+        # The samples are processed output.chunksize at a time.
+        for chunk in self.chunks(output):
+            for res in self._integrateChunk(domain, output, power, chunk):
+                yield res
+
+    def _integrateChunk(self, domain, output, power, sample_list):
         femesh = domain.femesh
         skeleton = domain.skeleton
-        res = []
-        count = 0
         # At this point, p's have to be PointSample objects.
-        for p in self.sample_list:
-            count += 1
-            real_el = femesh.enclosingElement(skeleton, p.point)
-            mcoord = real_el.to_master(p.point)
-            if power==0:
-                val = output.instancefn(output).one()
-                res.append((p, val))
-            else:
-                val = output.evaluate(femesh, [real_el], [[mcoord]])[0]
-                # "val" is a list, known to be of length 1.
-                if power == 1:
-                    res.append( (p, val) )
-                else:
+        if power == 0:
+            return [(p, output.instancefn(output).one())
+                    for p in sample_list]
+        # Group the samples by element, so that the Output is
+        # evaluated once for all of the points in each element,
+        # instead of once for each point.
+        points = [p.point for p in sample_list]
+        elements = femesh.enclosingElements(skeleton, points)
+        groups = {}                     # element index -> group
+        grouped_els = []
+        for i, (pt, el) in enumerate(zip(points, elements)):
+            try:
+                samples, mcoords = groups[el.get_index()]
+            except KeyError:
+                samples, mcoords = groups[el.get_index()] = ([], [])
+                grouped_els.append(el)
+            samples.append(i)
+            mcoords.append(el.to_master(pt))
+        vals = output.evaluate(
+            femesh, grouped_els,
+            [groups[el.get_index()][1] for el in grouped_els])
+        # Put the values back in the order of the samples.
+        res = [None]*len(points)
+        k = 0
+        for el in grouped_els:
+            for i in groups[el.get_index()][0]:
+                val = vals[k]
+                k += 1
+                if power != 1:
                     val.component_pow(power)
-                    res.append( (p, val) )
+                res[i] = (sample_list[i], val)
         return res
     
 #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#
@@ -625,35 +686,38 @@ class ElementSegmentSampleSet(SampleSet):
                               (dist1, dist2), self.n_points)
             for seg, el, dist1, dist2 in tempdata]
         return 1
-    def evaluate(self, domain, output):
-        res = []
-        femesh = domain.femesh
-        for s in self.sample_list:
-            res.append( (s, s.evaluate(femesh, output)) )
-        return res
-
-    def integrate(self, domain, output, power=1):
-        result = []
+    def evaluateIter(self, domain, output):
+        # Yields (sample, values) pairs, where values is a list of
+        # the values at the sample's n_points points.
+        for chunk in self.chunks(output):
+            # Evaluate the Output at the points of all of the samples
+            # in the chunk at once.
+            vals = output.evaluate(domain.femesh,
+                                   [s.element for s in chunk],
+                                   [s.masterPoints() for s in chunk])
+            for i, s in enumerate(chunk):
+                yield (s, vals[i*self.n_points:(i+1)*self.n_points])
+
+    def integrateIter(self, domain, output, power=1):
         if power==0:            # OutputVal.one might not be defined
             one = output.instancefn(output).one()
-        for s in self.sample_list:
-            start = s.segment.start()
-            end = s.segment.end()
-            lgth = math.sqrt( (end-start)**2 )
-            if power==0:
-                result.append(lgth*one)
-            else:
-                dx = lgth/float(self.n_points-1)
-                vals = s.evaluate(domain.femesh, output)
-                if power!=1:
-                    for x in vals:
-                        x.component_pow(power)
-                rval = (vals[0] + vals[1])*dx/2.0
-                for i in range(1, len(vals)-1):
-                    rval += (vals[i]+vals[i+1])*dx/2.0
-                result.append(rval)
-
-        return zip(self.sample_list, result)
+            for s in self.sample_list:
+                yield (s, self._length(s)*one)
+            return
+        for s, vals in self.evaluateIter(domain, output):
+            dx = self._length(s)/float(self.n_points-1)
+            if power!=1:
+                for x in vals:
+                    x.component_pow(power)
+            rval = (vals[0] + vals[1])*dx/2.0
+            for i in range(1, len(vals)-1):
+                rval += (vals[i]+vals[i+1])*dx/2.0
+            yield (s, rval)
+
+    def _length(self, sample):
+        start = sample.segment.start()
+        end = sample.segment.end()
+        return math.sqrt( (end-start)**2 )
 
             
 DirectSampleSetRegistration(
@@ -673,25 +737,18 @@ DirectSampleSetRegistration(
 
 #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#
 
-class PixelSampleSet(SampleSet):
+# PixelSamples are treated as points at the pixel centers, so
+# PixelSampleSet uses PointSampleSet's evaluation routines.
+
+class PixelSampleSet(PointSampleSet):
     containedClass = PixelSample
     def __init__(self, **kwargs):
-        SampleSet.__init__(self, **kwargs)
+        PointSampleSet.__init__(self, **kwargs)
     def make_samples(self, domain):
         size = domain.ms.sizeOfPixels()
         self.sample_list = [PixelSample(x, size) for x in domain.get_pixels()]
         return len(self.sample_list) > 0
-    def evaluate(self, domain, output):
-        res = []
-        for s in self.sample_list:
-            res.append( (s, s.evaluate(domain, output)) )
-        return res
-        
-    def integrate(self, domain, output, power=1):
-        vals = [x.integrate(domain, output, power) 
-                for x in self.sample_list]
-        return zip(self.sample_list, vals)
-    
+
 
 DirectSampleSetRegistration(
     "Pixels",
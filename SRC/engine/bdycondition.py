@@ -337,11 +337,28 @@ class DirichletBC(BC):
                 self.equation == other.equation and
                 self.eqn_component == other.eqn_component)
         
+    # profileValues and profileDerivatives evaluate the profile at
+    # all of the given Locations at once.  The Boundary classes in
+    # boundary.py use them to compute the values that they pass to
+    # applyBC, reapply, and setDerivatives.  If the condition is
+    # disabled, the profile isn't evaluated.
+    def profileValues(self, subproblem, locations):
+        if self.is_disabled(subproblem):
+            return [None]*len(locations)
+        return self.profile.values(locations)
+
+    def profileDerivatives(self, subproblem, locations):
+        if self.is_disabled(subproblem):
+            return [None]*len(locations), [None]*len(locations)
+        return (self.profile.evalTimeDerivativeValues(locations),
+                self.profile.evalTimeDerivative2Values(locations))
+
     # BC is applied through its "applyBC" method, which just sets the
     # value of the appropriate DoF to the passed-in value, and marks
     # the corresponding equation as dependent.  This is called by the
     # invokeFixed() methods of the Boundary classes in boundary.py.
-    def applyBC(self, subproblem, linsys, node, location):
+    # If the value of the profile isn't given, it's computed here.
+    def applyBC(self, subproblem, linsys, node, location, value=None):
         if self.is_disabled(subproblem):
             return
         fldcomp = self.field.getIndex(self.field_component).integer()
@@ -354,7 +371,8 @@ class DirichletBC(BC):
         except ooferror2.ErrNoSuchField:
             return
 
-        value = self.profile(location)
+        if value is None:
+            value = self.profile(location)
 
         # checkFixedVal returns True if the DoF is already fixed, and
         # False if it's not.  It raises an exception if the DoF is
@@ -373,7 +391,7 @@ class DirichletBC(BC):
             linsys.fixdof(self.field.dof(node, fldcomp))
             linsys.fixeqn(nodalEqn)
 
-    def reapply(self, subproblem, node, location):
+    def reapply(self, subproblem, node, location, value=None):
         if self.is_disabled(subproblem):
             return
         fldcomp = self.field.getIndex(self.field_component).integer()
@@ -381,15 +399,19 @@ class DirichletBC(BC):
             dof = self.field.dof(node, fldcomp)
         except ooferror2.ErrNoSuchField:
             return
-        value = self.profile(location)
+        if value is None:
+            value = self.profile(location)
         self.field.setvalue(subproblem.mesh, node, fldcomp, value)
 
-    def setDerivatives(self, subproblem, linsys, node, location):
+    def setDerivatives(self, subproblem, linsys, node, location,
+                       tdvalue=None, tdvalue2=None):
         if self.is_disabled(subproblem):
             return
         fldcomp = self.field.getIndex(self.field_component).integer()
-        tdvalue = self.profile.evalTimeDerivative(location)
-        tdvalue2 = self.profile.evalTimeDerivative2(location)
+        if tdvalue is None:
+            tdvalue = self.profile.evalTimeDerivative(location)
+        if tdvalue2 is None:
+            tdvalue2 = self.profile.evalTimeDerivative2(location)
         linsys.setDirichletDerivatives(node, self.field, fldcomp,
                                        tdvalue, tdvalue2)
 
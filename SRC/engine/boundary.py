@@ -123,38 +123,59 @@ class Boundary:
         for bc in allconds:
             bc.remove_auxiliary_BCs()
 
+    def subproblemLocations(self, subproblem, time):
+        # Return lists of the nodes in the subproblem and their
+        # Locations, with the time set.
+        nodes = []
+        locations = []
+        for (node, location) in self.locations():
+            if subproblem.containsNode(node):
+                location.set_time(time)
+                nodes.append(node)
+                locations.append(location)
+        return nodes, locations
+
+    # The fixed conditions' profiles are evaluated at all of the
+    # nodes at once, before the conditions are applied, so that
+    # profiles defined by functions don't have to be called from
+    # Python once per node.
+
     def invokeFixed(self, subproblem, linearsystem, time):
         if self.fixedConditions:
-            for (node, location) in self.locations():
-                if subproblem.containsNode(node):
-                    location.set_time(time)
-                    for bc in self.fixedConditions:
-                        # bc is a BC subclass (DirichletBC, probably)
-                        # instance from bdycondition.py.
-                        # DirichletBC.applyBC sets the Field value and
-                        # the fixed and dependent flags for the DoF
-                        # and nodal eqn in the linearsystem object.
-                        bc.applyBC(subproblem, linearsystem, node, location)
+            nodes, locations = self.subproblemLocations(subproblem, time)
+            values = [bc.profileValues(subproblem, locations)
+                      for bc in self.fixedConditions]
+            for k in xrange(len(nodes)):
+                for bc, vals in zip(self.fixedConditions, values):
+                    # bc is a BC subclass (DirichletBC, probably)
+                    # instance from bdycondition.py.
+                    # DirichletBC.applyBC sets the Field value and
+                    # the fixed and dependent flags for the DoF
+                    # and nodal eqn in the linearsystem object.
+                    bc.applyBC(subproblem, linearsystem, nodes[k],
+                               locations[k], vals[k])
 
     def reinvokeFixed(self, subproblem, time):
         if self.fixedConditions:
-            for (node, location) in self.locations():
-                if subproblem.containsNode(node):
-                    location.set_time(time)
-                    for bc in self.fixedConditions:
-                        bc.reapply(subproblem, node, location)
+            nodes, locations = self.subproblemLocations(subproblem, time)
+            values = [bc.profileValues(subproblem, locations)
+                      for bc in self.fixedConditions]
+            for k in xrange(len(nodes)):
+                for bc, vals in zip(self.fixedConditions, values):
+                    bc.reapply(subproblem, nodes[k], locations[k], vals[k])
 
     def setDirichletDerivatives(self, subproblem, linearsystem, time):
         # Evaluate the time derivatives of the fixed (Dirichlet) bcs
         # and store them in the linearsystem.
-        if self.fixedConditions:
-            for (node,location) in self.locations():
-                if subproblem.containsNode(node):
-                    location.set_time(time)
-                    for bc in self.fixedConditions:
-                        if bc.isTimeDependent():
-                            bc.setDerivatives(subproblem, linearsystem,
-                                              node, location)
+        bcs = [bc for bc in self.fixedConditions if bc.isTimeDependent()]
+        if bcs:
+            nodes, locations = self.subproblemLocations(subproblem, time)
+            derivs = [bc.profileDerivatives(subproblem, locations)
+                      for bc in bcs]
+            for k in xrange(len(nodes)):
+                for bc, (td, td2) in zip(bcs, derivs):
+                    bc.setDerivatives(subproblem, linearsystem,
+                                      nodes[k], locations[k], td[k], td2[k])
 
     def invokeFloat(self, subproblem, linearsystem, time, bc):
         for (node, location) in self.locations():
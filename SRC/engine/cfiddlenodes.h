@@ -0,0 +1,110 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+#include <oofconfig.h>
+
+#ifndef CFIDDLENODES_H
+#define CFIDDLENODES_H
+
+// CFiddleNodes evaluates trial node moves for the FiddleNodes
+// skeleton modifiers (Anneal, Smooth, etc) in fiddlenodesbase.py.
+// Moving a node doesn't change the energy or legality of a move of
+// any node that doesn't share an element with it, so the moves of
+// such independent nodes can be tried at once, on different threads.
+// The targets are processed in the order in which they were added,
+// and the results have to be the same as if they were moved one at a
+// time.  There are two ways of grouping them:
+//
+// * makeSets() divides them into independent sets such that every
+//   target comes after all of the earlier targets that it depends on.
+//   Processing the sets in order gives each move the same starting
+//   point as it has when the targets are moved one at a time.
+//
+// * independentRun() finds runs of consecutive independent targets.
+//   This is needed when the Python code draws random numbers that
+//   depend on the outcome of earlier moves, and so has to process the
+//   targets strictly in order.
+//
+// Each node can be given more than one candidate position.  The
+// Python code chooses the positions and decides which moves to
+// accept.
+
+#include "common/coord.h"
+#include "engine/cskeleton.h"
+#include <vector>
+
+class CMicrostructure;
+
+class CFiddleNodes {
+private:
+  // The result of moving a node to one candidate position.
+  struct Trial {
+    bool illegal;
+    bool withinLimits;
+    double deltaE;
+    std::vector<HomogeneityData> newHomogeneity;
+  };
+  struct Target {
+    CSkeletonNode *node;
+    std::vector<CSkeletonNode*> partners; // periodic partners
+    // Elements whose energies change when the node and its partners
+    // move.  Also used to find the independent sets.
+    std::vector<CSkeletonElement*> elements;
+    std::vector<Trial> trials;	// from the last call to evaluate()
+  };
+  const CMicrostructure *ms;
+  std::vector<Target> targets;
+  std::vector<std::vector<int> > sets;
+  void evaluateTargets(const std::vector<int>&, const std::vector<Coord>*,
+		       const std::vector<int>*, double, double, double);
+  void tryMoves(Target&, const Coord*, int ncandidates, double alpha,
+		bool limited, double minHomogeneity, double maxShapeEnergy)
+    const;
+public:
+  CFiddleNodes(const CMicrostructure*);
+  // Targets must be added in the order in which they'll be processed.
+  void addNode(CSkeletonNode*, const std::vector<CSkeletonNode*>*,
+	       const std::vector<CSkeletonElement*>*);
+  int size() const { return targets.size(); }
+  // Divide the targets into independent sets.  Each target is put
+  // in the set after the last set containing an earlier target that
+  // shares an element with it.  Returns the number of sets.
+  int makeSets();
+  std::vector<int> *getSet(int) const;
+  // Return the end of the longest run of independent targets
+  // beginning with target start.
+  int independentRun(int start) const;
+  // Try moving the nodes in the given set to each of their candidate
+  // positions, and compute the change in energy for each move.
+  // ncandidates[k] is the number of positions for the k-th node of
+  // the set, and the positions for all of the nodes are concatenated.
+  // If minHomogeneity and maxShapeEnergy are both non-negative, also
+  // check the limits used by the LimitedSkelModCriterion classes in
+  // skeletonmodifier.py.  All the nodes are moved back afterwards.
+  void evaluate(int set, const std::vector<Coord>*,
+		const std::vector<int> *ncandidates, double alpha,
+		double minHomogeneity, double maxShapeEnergy);
+  // Same as evaluate(), but for the targets from start up to end.
+  void evaluateRun(int start, int end, const std::vector<Coord>*,
+		   const std::vector<int> *ncandidates, double alpha,
+		   double minHomogeneity, double maxShapeEnergy);
+  // Results for candidate position c of target i.
+  bool illegal(int i, int c) const { return targets[i].trials[c].illegal; }
+  bool withinLimits(int i, int c) const {
+    return targets[i].trials[c].withinLimits;
+  }
+  double deltaE(int i, int c) const { return targets[i].trials[c].deltaE; }
+  // Called after the Python code has moved node i to its candidate
+  // position c, to set the homogeneities computed by evaluate().
+  void accept(int i, int c);
+};
+
+#endif // CFIDDLENODES_H
@@ -13,16 +13,20 @@
 #define CMATRIXMETHODS_H
 
 #include <oofconfig.h>
+#include <algorithm>
+#include <cmath>
+#include <limits>
 #include "Eigen/IterativeLinearSolvers"
 #include "Eigen/SparseCholesky"
 #include "Eigen/SparseLU"
 #include "Eigen/SparseQR"
 #include "Eigen/OrderingMethods"
+#include "engine/amgpreconditioner.h"
 #include "engine/sparsemat.h"
 
 // TODO: Add progress bars for Eigen solvers, somehow.
 
-enum class Precond {Uncond=1, Diag=2, ILUT=3};
+enum class Precond {Uncond=1, Diag=2, ILUT=3, AMG=4};
 
 enum Info {
   SUCCESS = Eigen::Success,
@@ -31,6 +35,18 @@ enum Info {
   INVALID_INPUT = Eigen::InvalidInput
 };
 
+// Starting points for the iterative solvers.  ZERO_GUESS starts from
+// zero, GIVEN_GUESS starts from the contents of the solution vector,
+// PREVIOUS_GUESS starts from the previous solution, and
+// EXTRAPOLATED_GUESS extrapolates linearly from the previous two
+// solutions.
+enum InitialGuess {
+  ZERO_GUESS = 0,
+  GIVEN_GUESS = 1,
+  PREVIOUS_GUESS = 2,
+  EXTRAPOLATED_GUESS = 3
+};
+
 template<Precond P> class CG;
 template<Precond P> class BiCGStab;
 class SimplicialLLT;
@@ -43,6 +59,35 @@ namespace internal {
 
 template<typename Derived> struct IterSolverTrait;
 
+// Do two compressed matrices have the same sparsity pattern?
+inline bool same_pattern(const ESMat &a, const ESMat &b) {
+  if(!a.isCompressed() || !b.isCompressed() ||
+     a.rows() != b.rows() || a.cols() != b.cols() ||
+     a.nonZeros() != b.nonZeros())
+    return false;
+  return (std::equal(a.outerIndexPtr(), a.outerIndexPtr() + a.outerSize()+1,
+		     b.outerIndexPtr()) &&
+	  std::equal(a.innerIndexPtr(), a.innerIndexPtr() + a.nonZeros(),
+		     b.innerIndexPtr()));
+}
+
+// The relative difference |a-b|/|b| of two matrices with the same
+// sparsity pattern.
+inline double relative_change(const ESMat &a, const ESMat &b) {
+  double diff2 = 0.0;
+  double norm2 = 0.0;
+  const double *av = a.valuePtr();
+  const double *bv = b.valuePtr();
+  for(int k=0; k<a.nonZeros(); k++) {
+    double d = av[k] - bv[k];
+    diff2 += d*d;
+    norm2 += bv[k]*bv[k];
+  }
+  if(norm2 == 0.0)
+    return diff2 == 0.0 ? 0.0 : std::numeric_limits<double>::max();
+  return sqrt(diff2/norm2);
+}
+
 template<> struct IterSolverTrait<CG<Precond::Uncond>> {
   typedef Eigen::ConjugateGradient< ESMat,
     Eigen::Lower | Eigen::Upper,
@@ -61,6 +106,12 @@ template<> struct IterSolverTrait<CG<Precond::ILUT>> {
     Eigen::IncompleteLUT<double> > Type;
 };
 
+template<> struct IterSolverTrait<CG<Precond::AMG>> {
+  typedef Eigen::ConjugateGradient< ESMat,
+    Eigen::Lower | Eigen::Upper,
+    AMGPreconditioner > Type;
+};
+
 template<> struct IterSolverTrait<BiCGStab<Precond::Uncond>> {
   typedef Eigen::BiCGSTAB< ESMat, Eigen::IdentityPreconditioner > Type;
 };
@@ -73,6 +124,20 @@ template<> struct IterSolverTrait<BiCGStab<Precond::ILUT>> {
   typedef Eigen::BiCGSTAB< ESMat, Eigen::IncompleteLUT<double> > Type;
 };
 
+template<> struct IterSolverTrait<BiCGStab<Precond::AMG>> {
+  typedef Eigen::BiCGSTAB< ESMat, AMGPreconditioner > Type;
+};
+
+// Only the multigrid preconditioner uses the near nullspace.  The
+// others ignore it.
+template<typename Preconditioner>
+inline void set_near_nullspace(Preconditioner&, const NearNullspace*) {}
+
+inline void set_near_nullspace(AMGPreconditioner &p, const NearNullspace *ns)
+{
+  p.set_near_nullspace(ns);
+}
+
 // Direct sovler traits
 
 template<typename Derived> struct DirectSolverTrait;
@@ -96,21 +161,102 @@ template<> struct DirectSolverTrait<SparseQR> {
 
 // Iterative solvers
 
+// The iterative solvers can optionally reuse their preconditioners.
+// The preconditioner is kept until the matrix has a different sparsity
+// pattern, the relative change in the matrix exceeds the reuse
+// tolerance, or the number of iterations grows by more than the
+// iteration growth factor compared to the first solution with the
+// preconditioner.  The starting point of the iteration is chosen
+// according to an InitialGuess policy.
+
 template<typename Derived>
 class IterativeSolver {
 private:
-  typename internal::IterSolverTrait<Derived>::Type solver_;
+  typedef typename internal::IterSolverTrait<Derived>::Type EigenSolver;
+  // The Eigen solvers don't provide a way to change the matrix
+  // without recomputing the preconditioner, but the protected grab()
+  // method does just that.
+  class Solver : public EigenSolver {
+  public:
+    void set_matrix(const ESMat &m) { this->grab(m); }
+  };
+  Solver solver_;
+
+  InitialGuess guess_;
+  Eigen::VectorXd prev1_, prev2_; // last two solutions, most recent first
+
+  bool reusePrecond_;
+  double reuseTolerance_;
+  double iterationGrowth_;
+  ESMat precondMatrix_;		// matrix used to build the preconditioner
+  bool precondValid_;		// can the preconditioner be reused?
+  int baseIterations_;		// iterations with a fresh preconditioner
+  int nprecond_;		// number of preconditioners built
+
+  // Compute the preconditioner for m, or reuse the old one.  Returns
+  // true if the old one was reused.
+  bool update_preconditioner(const ESMat &m) {
+    if(reusePrecond_ && precondValid_ &&
+       internal::same_pattern(m, precondMatrix_) &&
+       internal::relative_change(m, precondMatrix_) <= reuseTolerance_)
+      {
+	solver_.set_matrix(m);
+	return true;
+      }
+    solver_.compute(m);
+    ++nprecond_;
+    precondValid_ = (reusePrecond_ && m.isCompressed() &&
+		     solver_.info() == Eigen::Success);
+    // Only keep a copy of the matrix if it's going to be used.
+    precondMatrix_ = precondValid_ ? m : ESMat();
+    return false;
+  }
+
+  void solve_from_guess(const DoubleVec &rhs, DoubleVec &x) {
+    const int n = rhs.size();
+    if(guess_ == GIVEN_GUESS && x.size() == n) {
+      Eigen::VectorXd x0 = x.data;
+      x.data = solver_.solveWithGuess(rhs.data, x0);
+    }
+    else if(guess_ == EXTRAPOLATED_GUESS && prev1_.size() == n &&
+	    prev2_.size() == n)
+      {
+	Eigen::VectorXd x0 = 2.0*prev1_ - prev2_;
+	x.data = solver_.solveWithGuess(rhs.data, x0);
+      }
+    else if((guess_ == PREVIOUS_GUESS || guess_ == EXTRAPOLATED_GUESS) &&
+	    prev1_.size() == n)
+      {
+	x.data = solver_.solveWithGuess(rhs.data, prev1_);
+      }
+    else
+      x.data = solver_.solve(rhs.data);
+  }
+
 public:
+  IterativeSolver()
+    : guess_(ZERO_GUESS),
+      reusePrecond_(false),
+      reuseTolerance_(0.0),
+      iterationGrowth_(1.5),
+      precondValid_(false),
+      baseIterations_(0),
+      nprecond_(0)
+  {}
+
   void analyze_pattern(const SparseMat& m) {
     solver_.analyzePattern(m.data);
+    precondValid_ = false;
   }
 
   void factorize(const SparseMat& m) {
     solver_.factorize(m.data);
+    precondValid_ = false;
   }
 
   void compute(const SparseMat& m) {
     solver_.compute(m.data);
+    precondValid_ = false;
   }
 
   DoubleVec solve(const DoubleVec& rhs) {
@@ -121,14 +267,35 @@ public:
 
   DoubleVec solve(const SparseMat& m, const DoubleVec& rhs) {
     DoubleVec x;
-    solver_.compute(m.data);
-    x.data = solver_.solve(rhs.data);
+    solve(m, rhs, x);
     return x;
   }
 
   int solve(const SparseMat& m, const DoubleVec& rhs, DoubleVec& x) {
-    solver_.compute(m.data);
-    x.data = solver_.solve(rhs.data);
+    bool reused = update_preconditioner(m.data);
+    solve_from_guess(rhs, x);
+    if(reused) {
+      if(solver_.info() != Eigen::Success) {
+	// The old preconditioner wasn't good enough.  Try again with
+	// a new one.
+	precondValid_ = false;
+	update_preconditioner(m.data);
+	solve_from_guess(rhs, x);
+	baseIterations_ = solver_.iterations();
+      }
+      else if(solver_.iterations() >
+	      iterationGrowth_*std::max(baseIterations_, 1)) {
+	// Build a new preconditioner next time.
+	precondValid_ = false;
+      }
+    }
+    else
+      baseIterations_ = solver_.iterations();
+
+    if(guess_ == PREVIOUS_GUESS || guess_ == EXTRAPOLATED_GUESS) {
+      prev2_.swap(prev1_);
+      prev1_ = x.data;
+    }
     return solver_.info();
   }
 
@@ -139,6 +306,31 @@ public:
   int iterations() const { return solver_.iterations(); }
   double error() const { return solver_.error(); }
   int info() const { return solver_.info(); }
+
+  void set_initial_guess(InitialGuess g) { guess_ = g; }
+  InitialGuess initial_guess() const { return guess_; }
+  void set_reuse_preconditioner(bool reuse, double tolerance) {
+    reusePrecond_ = reuse;
+    reuseTolerance_ = tolerance;
+    if(!reuse) {
+      precondValid_ = false;
+      precondMatrix_ = ESMat();
+    }
+  }
+  void set_iteration_growth(double g) { iterationGrowth_ = g; }
+  int preconditioners_built() const { return nprecond_; }
+  // Describe the near nullspace of the matrices that will be solved.
+  // It's used the next time the preconditioner is built.
+  void set_near_nullspace(const NearNullspace *ns) {
+    internal::set_near_nullspace(solver_.preconditioner(), ns);
+  }
+  // Forget the saved solutions and preconditioner.
+  void reset() {
+    prev1_.resize(0);
+    prev2_.resize(0);
+    precondValid_ = false;
+    precondMatrix_ = ESMat();
+  }
 };
 
 template<Precond P>
@@ -148,6 +340,7 @@ class CG : public IterativeSolver<CG<P>> {
 template class CG<Precond::Uncond>;
 template class CG<Precond::Diag>;
 template class CG<Precond::ILUT>;
+template class CG<Precond::AMG>;
 
 template <Precond P>
 class BiCGStab : public IterativeSolver<BiCGStab<P>> {
@@ -156,23 +349,89 @@ class BiCGStab : public IterativeSolver<BiCGStab<P>> {
 template class BiCGStab<Precond::Uncond>;
 template class BiCGStab<Precond::Diag>;
 template class BiCGStab<Precond::ILUT>;
+template class BiCGStab<Precond::AMG>;
 
 // Direct solvers
 
+// DirectSolver keeps a copy of the most recently factored matrix.  If
+// the next matrix has the same sparsity pattern, the symbolic
+// analysis is reused and only the numeric factorization is redone.
+// If the values are the same too, the factorization is reused and
+// only the back substitution is done.  This is the usual situation
+// for linear time dependent problems with a fixed time step.
+
 template <typename Derived> class DirectSolver {
 protected:
   typename internal::DirectSolverTrait<Derived>::Type solver_;
+  ESMat factored_;		// copy of the last factored matrix
+  bool analyzed_;		// is the symbolic analysis of factored_ valid?
+  bool factorized_;		// is the numeric factorization valid?
+  int nanalyses_;
+  int nfactorizations_;
+  int nsolves_;
+
+  bool same_pattern(const ESMat &m) const {
+    return analyzed_ && internal::same_pattern(m, factored_);
+  }
+
+  bool same_values(const ESMat &m) const {
+    return std::equal(m.valuePtr(), m.valuePtr() + m.nonZeros(),
+		      factored_.valuePtr());
+  }
+
+  // Make sure that solver_ contains the factorization of m, doing as
+  // little work as possible.
+  void prepare(const ESMat &m) {
+    ++nsolves_;
+    if(!m.isCompressed()) {
+      // The pattern can't be compared cheaply, so don't save it.
+      solver_.compute(m);
+      ++nanalyses_;
+      ++nfactorizations_;
+      analyzed_ = false;
+      factorized_ = false;
+      return;
+    }
+    if(same_pattern(m)) {
+      if(factorized_ && same_values(m))
+	return;
+    }
+    else {
+      solver_.analyzePattern(m);
+      ++nanalyses_;
+    }
+    solver_.factorize(m);
+    ++nfactorizations_;
+    factorized_ = solver_.info() == Eigen::Success;
+    factored_ = m;
+    // If the factorization failed, the next matrix must be analyzed
+    // again from scratch.
+    analyzed_ = factorized_;
+  }
+
 public:
+  DirectSolver()
+    : analyzed_(false),
+      factorized_(false),
+      nanalyses_(0),
+      nfactorizations_(0),
+      nsolves_(0)
+  {}
+
   void analyze_pattern(const SparseMat& m) {
     solver_.analyzePattern(m.data);
+    analyzed_ = false;
+    factorized_ = false;
   }
 
   void factorize(const SparseMat& m) { 
     solver_.factorize(m.data);
+    analyzed_ = false;
+    factorized_ = false;
   }
 
   void compute(const SparseMat& m) {
-    solver_.compute(m.data);
+    prepare(m.data);
   }
 
   DoubleVec solve(const DoubleVec& rhs) {
@@ -183,20 +442,35 @@ public:
 
   DoubleVec solve(const SparseMat& m, const DoubleVec& rhs) {
     DoubleVec x;
-    solver_.compute(m.data);
+    prepare(m.data);
     x.data = solver_.solve(rhs.data);
     return x;
   }
 
   int solve(const SparseMat& m, const DoubleVec& rhs, DoubleVec& x) {
-    solver_.compute(m.data);
+    prepare(m.data);
+    if(solver_.info() != Eigen::Success)
+      return solver_.info();
     x.data = solver_.solve(rhs.data);
     return solver_.info();
   }
 
+  // Forget the saved factorization, forcing the next solve to start
+  // from scratch.
+  void reset() {
+    analyzed_ = false;
+    factorized_ = false;
+    factored_ = ESMat();
+  }
+
   int info() {
     return solver_.info();
   }
+
+  // Statistics
+  int analyses() const { return nanalyses_; }
+  int factorizations() const { return nfactorizations_; }
+  int solves() const { return nsolves_; }
 };
 
 class SimplicialLLT : public DirectSolver<SimplicialLLT> {
@@ -0,0 +1,151 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+#include <oofconfig.h>
+
+#ifndef CREFINE_H
+#define CREFINE_H
+
+// Support for the Refine skeleton modifier in refine.py.
+//
+// CRefinement does the parts of a 2D refinement that don't depend on
+// the refinement rules in refinemethod.py, for all of the elements of
+// the old Skeleton at once.  Given the old elements and nodes and the
+// marked edges, it finds each element's signature and rotation,
+// computes the positions of the new nodes on the marked edges (and
+// their periodic partners), and lists the new nodes on each edge of
+// each element.  After the rules have been applied, it finds the
+// parent of each new segment in the old Skeleton, which is what the
+// boundaries need in order to be mapped to the refined Skeleton.
+//
+// The SkeletonNodes and SkeletonElements themselves are Python
+// objects, so they're still created in Python, but only from the
+// data computed here.
+//
+// The refinement rules often have to choose between two or more
+// candidate refinements of an element by comparing the average
+// energies of the provisional elements in each candidate.  Refine
+// collects the candidates for many elements and evaluates them all at
+// once with candidateEnergies, on as many threads as are available.
+
+#include <map>
+#include <set>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+class CMicrostructure;
+class CSkeletonElement;
+class CSkeletonNode;
+
+class CRefinement {
+private:
+  typedef std::pair<int, int> EdgeKey; // old node indices, smaller first
+  struct Edge {
+    Edge() : ndivs(0), partner0(-1), partner1(-1), start(-1) {}
+    int ndivs;
+    // The periodic partners of key.first and key.second, or -1.
+    int partner0, partner1;
+    // The new nodes on the edge, in order starting from old node
+    // "start".  start is -1 until the nodes have been created.
+    int start;
+    std::vector<int> newnodes;
+  };
+  std::vector<CSkeletonNode*> oldNodes;
+  std::unordered_map<const CSkeletonNode*, int> oldIndex;
+  // The nodes of element e are elNodes[elOffset[e]:elOffset[e+1]].
+  // The same offsets are used for the element edges.
+  std::vector<int> elOffset;
+  std::vector<int> elNodes;
+  std::map<EdgeKey, Edge> edges;
+  std::set<EdgeKey> oldSegments;
+
+  std::vector<int> rotation_;
+  std::vector<int> sigIndex_;
+  std::vector<std::vector<int> > signatures_;
+  std::vector<double> newX_, newY_;
+  std::vector<int> newPartner_;
+  std::vector<int> nodeOffset_;
+  std::vector<int> edgeNodes_;
+  std::vector<int> edgeNodeOffset_;
+
+  static EdgeKey edgeKey(int n0, int n1) {
+    return n0 < n1 ? EdgeKey(n0, n1) : EdgeKey(n1, n0);
+  }
+  int index(const CSkeletonNode*) const;
+  void createEdgeNodes(Edge&, int n0, int n1, int ndivs, int partner);
+public:
+  CRefinement(const std::vector<CSkeletonElement*>*,
+	      const std::vector<CSkeletonNode*>*);
+  // Set the number of new nodes on the edges joining n0[i] and
+  // n1[i].  Unlisted edges aren't divided.
+  void markEdges(const std::vector<CSkeletonNode*> *n0,
+		 const std::vector<CSkeletonNode*> *n1,
+		 const std::vector<int> *ndivs);
+  // p0[i] and p1[i] are the periodic partners of n0[i] and n1[i].
+  void setPartners(const std::vector<CSkeletonNode*> *n0,
+		   const std::vector<CSkeletonNode*> *n1,
+		   const std::vector<CSkeletonNode*> *p0,
+		   const std::vector<CSkeletonNode*> *p1);
+  // Find the signatures and the new edge nodes.  factor is
+  // refine.arbitrary_factor.  See findSignature() in refine.py.
+  void refineEdges(int factor);
+
+  // Results of refineEdges.  These are all concatenated over the old
+  // elements, in order.
+  std::vector<int> *rotations() const;
+  std::vector<int> *signatureIndices() const;
+  int nsignatures() const { return signatures_.size(); }
+  std::vector<int> *signature(int i) const;
+  // Positions of the new edge nodes, in the order in which they
+  // should be created.  The nodes for old element e are
+  // newNodeOffsets[e] through newNodeOffsets[e+1]-1.  If
+  // newNodePartners[k] isn't -1, it's the index of a node created
+  // earlier that is a periodic partner of node k.
+  std::vector<double> *newNodeX() const;
+  std::vector<double> *newNodeY() const;
+  std::vector<int> *newNodeOffsets() const;
+  std::vector<int> *newNodePartners() const;
+  // The indices of the new nodes on each edge of each old element,
+  // in order along the edge.  The nodes on edge j of element e are
+  // edgeNodes[edgeNodeOffsets[i]:edgeNodeOffsets[i+1]], where i is j
+  // plus the total number of edges of the elements before e.
+  std::vector<int> *edgeNodes() const;
+  std::vector<int> *edgeNodeOffsets() const;
+
+  // Find the parents of the new segments, as findParentSegment() in
+  // refine.py does.  oldElements[k] is the index of the old element
+  // that newElements[k] was created from.  newNodes contains the
+  // copies of the old nodes, in order, followed by the new edge nodes
+  // in the order in which they were created.  Other new nodes have no
+  // parents.  For each segment that has a parent, four ints are
+  // returned: the index k of the first new element containing it, the
+  // index i of the segment's second node in that element (the first
+  // node is i-1), and the indices of the old nodes at the ends of the
+  // parent segment.
+  std::vector<int> *parentSegments(
+		   const std::vector<CSkeletonElement*> *newElements,
+		   const std::vector<int> *oldElements,
+		   const std::vector<CSkeletonNode*> *newNodes) const;
+};
+
+// The provisional elements for all of the candidates are
+// concatenated in the given list, and nelements[i] is the number of
+// elements in candidate i.  Returns the average of
+// CSkeletonElement::energyTotal for each candidate.  The elements'
+// homogeneities are cached as a side effect, so they don't have to be
+// recomputed when a provisional element is accepted.
+std::vector<double> *candidateEnergies(const CMicrostructure*,
+				       const std::vector<CSkeletonElement*>*,
+				       const std::vector<int> *nelements,
+				       double alpha);
+
+#endif // CREFINE_H
@@ -112,6 +112,7 @@ public:
   CSkeletonElement(int n);
   virtual ~CSkeletonElement();
   int nnodes() const { return nodes.size(); }
+  CSkeletonNode *getNode(int i) const { return nodes[i]; }
   void replaceNode(int which, CSkeletonNode *replacement);
   std::vector<Coord> *perimeter() const; // list of node positions
   double perimeterLength() const;
@@ -166,6 +167,9 @@ public:
 
   bool transitionPoint(CMicrostructure&, int, Coord*) const;
   virtual double energyShape() const = 0;
+  // energyTotal must agree with SkeletonElementBase.energyTotal in
+  // skeletonelement.py.
+  double energyTotal(const CMicrostructure&, double alpha) const;
 
   friend long get_globalElementCount();
 };
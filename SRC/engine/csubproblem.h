@@ -23,6 +23,7 @@
 class CSubProblem;
 #include "common/identification.h"
 #include "common/lock.h"
+#include "common/timestamp.h"
 #include "engine/dofmap.h"
 #include "engine/femesh.h"
 #include "engine/materialset.h"
@@ -44,10 +45,12 @@ class Element;
 class ElementIterator;
 class Equation;
 class FEMesh;
+class DefiniteProgress;
 class Field;
 class Flux;
 class FuncNode;
 class FuncNodeIterator;
+class InterfaceElement;
 class LinearizedSystem;
 class Lock;
 class Material;
@@ -69,6 +72,10 @@ private:
   static long globalCSubProblemCount;
   DoFMap mesh2subpDoFMap;
   DoFMap mesh2subpEqnMap;
+  // mapsChanged is incremented whenever mesh2subpDoFMap and
+  // mesh2subpEqnMap are rebuilt.  LinearizedSystem uses it to decide
+  // if it can reuse its matrices' sparsity patterns.
+  TimeStamp mapsChanged;
   int nNodes_;
   std::set<int> slaveDoFs;
 public:
@@ -188,6 +195,21 @@ public:
   // by the thread for current element. At the end of
   // each element's make_linear_system, the dirty zone is cleaned up.
   mutable std::vector<std::unordered_map<int, double>> dirty_dof_zone;
+
+private:
+  // Element colorings for lock-free parallel assembly.  No two
+  // elements of the same color share a Node, so the elements of one
+  // color can all write into the shared LinearizedSystem at once.
+  // The colorings are recomputed when the dof and equation maps
+  // change.
+  mutable std::vector<std::vector<Element*>> elementColors;
+  mutable std::vector<std::vector<InterfaceElement*>> interfaceColors;
+  mutable TimeStamp coloringComputed;
+  void compute_colorings() const;
+  void colored_linear_system(LinearizedSystem*, const CNonlinearSolver*,
+			     DefiniteProgress*) const;
+public:
+  int ncolors() const;
 #endif
 
 //   void dump_dof() const;	// for debugging
@@ -371,4 +393,9 @@ private:
 
 long get_globalCSubProblemCount();
 
+// If colored_assembly is true, make_linear_system uses element
+// colorings instead of per-thread copies of the matrices when running
+// with OpenMP.
+extern bool colored_assembly;
+
 #endif // SUBPROBLEM_H
@@ -30,6 +30,16 @@
 # point the sheriff skeleton is also destroyed.  Deputies never
 # actually really become sheriffs.
 
+# A deputy made from another deputy (its "base") only stores the
+# positions of the nodes that it moved itself.  The positions of the
+# other nodes are found by looking in the base, and in the base's
+# base, and so on, ending at the sheriff.  A series of node moving
+# modifications therefore uses memory in proportion to the number of
+# nodes moved by each one, and switching between adjacent deputies
+# (which is what undo and redo do) only moves the nodes that differ
+# between them.  The sheriff keeps the original positions of all
+# nodes that have been moved by any of its deputies.
+
 from ooflib.SWIG.common import config
 from ooflib.SWIG.common import timestamp
 from ooflib.SWIG.engine import cskeleton
@@ -50,11 +60,21 @@ class DeputySkeleton(skeleton.SkeletonBase):
         self.skeleton = skel.sheriffSkeleton()
         self.skeleton.addDeputy(self)
         self._illegal = skel._illegal
-        # When the DeputySkeleton is active, the positions of its nodes
-        # are stored in the actual nodes, and the positions of the
-        # reference Skeleton's nodes are stored in the nodePositions
-        # dictionary.  When it's inactive, it's the other way around.
-        self.nodePositions = skel.getMovedNodes()
+        # The deputy that this one was copied from, or None if it was
+        # copied from the sheriff, and the deputies copied from this
+        # one.
+        if skel.isDeputy():
+            self.base = skel
+            skel.derived.append(self)
+        else:
+            self.base = None
+        self.derived = []
+        # movedNodes contains the nodes whose positions differ from
+        # their positions in the base.  When the DeputySkeleton is
+        # inactive, the values are the positions.  When it's active,
+        # the positions are stored in the actual nodes, and the values
+        # are out of date.
+        self.movedNodes = {}
         self.active = 0
         self.timestamp = timestamp.TimeStamp()
         self.meshes = []
@@ -77,51 +97,64 @@ class DeputySkeleton(skeleton.SkeletonBase):
     def deputyCopy(self):
         return DeputySkeleton(self)
 
-    def getMovedNodes(self):
-        nodedict = {}
-        if self.active:                 # copy positions from Skeleton
-            for node in self.nodePositions:
-                nodedict[node] = node.position()
-        else:                           # copy positions from self
-            nodedict.update(self.nodePositions)
-        return nodedict
-
     def nodePosition(self, node):
         # Get the position of the node in this skeleton even if a
         # deputy is active.
-        if self.active:
-            return node.position()
-        try:
-            return self.nodePositions[node]
-        except KeyError:
-            return self.skeleton.nodePosition(node)
-
-    def originalPosition(self, node):
-        try:
-            return self.nodePositions[node]
-        except KeyError:
-            return node.position()
+        deputy = self
+        while deputy is not None:
+            if deputy.active:
+                # The active deputy's positions are in the nodes,
+                # including the ones it inherited.
+                return node.position()
+            try:
+                return deputy.movedNodes[node]
+            except KeyError:
+                deputy = deputy.base
+        return self.skeleton.nodePosition(node)
+
+    def basePosition(self, node):
+        # The position of the node in the skeleton that this one was
+        # copied from.
+        if self.base is not None:
+            return self.base.nodePosition(node)
+        return self.skeleton.nodePosition(node)
+
+    def chain(self):
+        # This deputy and its bases.
+        deputies = []
+        deputy = self
+        while deputy is not None:
+            deputies.append(deputy)
+            deputy = deputy.base
+        return deputies
 
     def sheriffSkeleton(self):
         return self.skeleton
 
     def activate(self):
         if not self.active:
-            self.active = 1
             self.skeleton.deputize(self)
-            self.swapPositions()
 
     def deactivate(self):
-        # called when the master Skeleton or another Deputy is activated
+        # Called by switchPositions.  Store the current positions of
+        # the moved nodes.
         if self.active:
+            for node in self.movedNodes:
+                self.movedNodes[node] = node.position()
             self.active = 0
-            self.swapPositions()
-    def swapPositions(self):
-        for node, position in self.nodePositions.items():
-            self.nodePositions[node] = node.position()
-            node.unconstrainedMoveTo(position)
-        self.skeleton.needsHash()
-        
+
+    def _moving(self, node):
+        # Called before moving a node in this deputy.
+        if node not in self.movedNodes:
+            self.skeleton.saveOriginalPosition(node)
+            self.movedNodes[node] = None
+
+    def _movedBack(self, node):
+        # Called after moving a node back.
+        if node in self.movedNodes and \
+               node.position() == self.basePosition(node):
+            del self.movedNodes[node]
+
     # Any attributes not defined here are obtained from the underlying
     # skeleton.  This is *not* a derived class, though, because the
     # point is that objects of this class require very little
@@ -133,38 +166,45 @@ class DeputySkeleton(skeleton.SkeletonBase):
         pass
 
     def moveNodeTo(self, node, position):
-        if node not in self.nodePositions:
-            # Storing old position
-            self.nodePositions[node] = node.position()
+        self._moving(node)
         node.moveTo(position)
         for partner in node.getPartners():
-            if partner not in self.nodePositions:
-                self.nodePositions[partner] = partner.position()
+            self._moving(partner)
             partner.moveTo(position)
 
     def moveNodeBy(self, node, delta):
-        if node not in self.nodePositions:
-            self.nodePositions[node] = node.position()
+        self._moving(node)
         node.moveBy(delta)
         for partner in node.getPartners():
-            if partner not in self.nodePositions:
-                self.nodePositions[partner] = partner.position()
+            self._moving(partner)
             partner.moveBy(delta)
 
     def moveNodeBack(self, node):
         node.moveBack()
-        if node.position() == self.nodePositions[node]:
-            del self.nodePositions[node]
+        self._movedBack(node)
         for partner in node.getPartners():
             partner.moveBack()
-            if partner.position() == self.nodePositions[partner]:
-                del self.nodePositions[partner]
+            self._movedBack(partner)
 
     def destroy(self, context):
         skeleton.SkeletonBase.destroy(self)
+        # Deputies derived from this one inherit its node positions.
+        for deputy in self.derived:
+            for node, position in self.movedNodes.items():
+                if node not in deputy.movedNodes:
+                    if self.active:
+                        position = node.position()
+                    deputy.movedNodes[node] = position
+            deputy.base = self.base
+            if self.base is not None:
+                self.base.derived.append(deputy)
+        if self.base is not None:
+            self.base.derived.remove(self)
+        self.derived = []
+        self.base = None
         self.skeleton.removeDeputy(self, context)
         del self.skeleton
-        del self.nodePositions
+        del self.movedNodes
         meshes = self.meshes[:]
         for mesh in meshes:
             mesh.destroy()
@@ -197,6 +237,35 @@ class DeputySkeleton(skeleton.SkeletonBase):
     def __repr__(self):
         return "DeputySkeleton(%d, %d)" % (id(self), id(self.skeleton))
 
+def switchPositions(sheriff, old, new):
+    # Called by Skeleton.deputize and Skeleton.activate when the
+    # active deputy of the given sheriff changes from old to new.
+    # Either may be None, meaning the sheriff itself.  Only the nodes
+    # moved by deputies in the two chains below their closest common
+    # base have to be moved.
+    if old is new:
+        return
+    oldchain = old is not None and old.chain() or []
+    newchain = new is not None and new.chain() or []
+    common = set(map(id, oldchain)) & set(map(id, newchain))
+    nodes = set()
+    for deputy in oldchain + newchain:
+        if id(deputy) not in common:
+            nodes.update(deputy.movedNodes)
+    if old is not None:
+        old.deactivate()
+    if new is not None:
+        for node in nodes:
+            node.unconstrainedMoveTo(new.nodePosition(node))
+        new.active = 1
+    else:
+        for node in nodes:
+            node.unconstrainedMoveTo(sheriff.nodePosition(node))
+    if nodes:
+        sheriff.needsHash()
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 # It will only take care of node move changes.
 class DeputyProvisionalChanges:
     def __init__(self):
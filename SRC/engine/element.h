@@ -14,6 +14,7 @@
 
 class Element;
 class MasterElement;
+class ShapeFunctionStore;
 #include <Python.h>
 
 #include "common/coord.h"
@@ -98,6 +99,10 @@ private:
   // to getEdge.  Space is allocated in "add_b_edge".
   std::vector<BoundaryEdge*> edgeset;
 
+  // The Mesh's store of precomputed shape function derivatives, or
+  // null if the Element doesn't use one.  See shapefunctionstore.h.
+  ShapeFunctionStore *sfstore;
+
   //   ShapeFunction *shapefunction() const;
   //   ShapeFunction *mapfunction() const;
 
@@ -135,6 +140,9 @@ public:
   void set_index(int);
   const int &get_index() const;
 
+  void set_shapefunction_store(ShapeFunctionStore *s) { sfstore = s; }
+  ShapeFunctionStore *shapefunction_store() const { return sfstore; }
+
   int nnodes() const;
   int nmapnodes() const;
   int nfuncnodes() const;
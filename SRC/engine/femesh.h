@@ -19,6 +19,7 @@ class FEMesh;
 
 #include <Python.h>
 
+#include "common/timestamp.h"
 #include "engine/equation.h"
 #include "engine/field.h"
 #include "engine/fieldeqnlist.h"
@@ -49,6 +50,7 @@ class NodalEquation;
 class Node;
 class NodeIterator;
 class RWLock;
+class ShapeFunctionStore;
 class InterfaceElement;
 
 //=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//=\\=//
@@ -109,6 +111,9 @@ private:
   std::vector<double> *dofvalues;
   double time;		       // max time attained by all subproblems
   CSubProblem *currentSubProblem_;
+  TimeStamp geometryChanged_;	// when Nodes last moved
+  ShapeFunctionStore *sfstore_;
+  void nodes_moved() { ++geometryChanged_; }
 public:
   FEMesh(CMicrostructure *);
   virtual ~FEMesh();
@@ -153,6 +158,48 @@ public:
   void addElement(Element*);
   void reserveElements(int n);
 
+  // buildElements creates the corner nodes, the elements, and the
+  // elements' edge and interior nodes in one call.  It's used by
+  // Skeleton.femesh() in skeleton.py, which describes the mesh with
+  // these arrays:
+  //   cornerPositions: the positions of the corner nodes, which are
+  //     created first, in this order.
+  //   skelels: the SkeletonElements, in mesh order.
+  //   masters: the MasterElements.  The one with the right number of
+  //     corners is used for each element.
+  //   corners: for each element, the indices into cornerPositions of
+  //     its corner nodes, concatenated.
+  //   edges: for each edge of each element, in the same order as
+  //     corners, an integer identifying the edge.  Edges with the
+  //     same id share nodes.  Edges with id -1 don't share nodes.
+  //   materials: the Materials (or None), and materialIndex: the
+  //     index into materials for each element.
+  //   exteriorEdges: pairs of (element, local edge) numbers for the
+  //     edges on the exterior of the Skeleton, sorted by element.
+  // Each element's node list contains its first corner node, the
+  // nodes on its first edge, its second corner node, and so on,
+  // followed by its interior nodes.  Returns false if the "New Mesh"
+  // Progress was stopped.
+  bool buildElements(const std::vector<Coord> *cornerPositions,
+		     const std::vector<PyObject*> *skelels,
+		     const std::vector<PyObject*> *masters,
+		     const std::vector<int> *corners,
+		     const std::vector<int> *edges,
+		     const std::vector<PyObject*> *materials,
+		     const std::vector<int> *materialIndex,
+		     const std::vector<int> *exteriorEdges);
+  // After buildElements, these return the nodes that it created on
+  // the shared edges, concatenated in order of edge id, and the
+  // interior nodes of the elements, concatenated in element order.
+  // Each shared edge's nodes are in the order used by the last
+  // element that traversed it.  The offset vectors give the position
+  // of the first node of each edge or element, followed by the total
+  // number of nodes.
+  std::vector<Node*> *builtEdgeNodes() const;
+  std::vector<int> *builtEdgeNodeOffsets() const;
+  std::vector<Node*> *builtInteriorNodes() const;
+  std::vector<int> *builtInteriorNodeOffsets() const;
+
   void addInterfaceElement(InterfaceElement*);
   std::vector<InterfaceElement*> edgement;
   int nedgements() const;
@@ -203,18 +250,42 @@ public:
   void set_in_plane(const Field &field, bool);
   std::vector<std::string> *getFieldSetByID(int) const;	// returns new obj
 
+  // Bulk access to Field values, used when saving and loading Meshes.
+  // getFieldSetIDs returns the sorted fieldSetIDs of all the
+  // FuncNodes.  getFieldSetNodes returns the indices of the FuncNodes
+  // with the given fieldSetID, and getFieldValues returns the values
+  // of the given Fields at those nodes, node by node.  Both return a
+  // Python string containing a contiguous array of ints or doubles,
+  // in native byte order.  setFieldValues does the reverse of
+  // getFieldValues, for arbitrary nodes.
+  std::vector<int> *getFieldSetIDs() const; // returns new obj
+  PyObject *getFieldSetNodes(int) const;
+  PyObject *getFieldValues(int, const std::vector<std::string>*) const;
+  void setFieldValues(const std::vector<std::string>*, PyObject*, PyObject*);
+
   // API for setting/referring to the read-write lock.  Set_rwlock
   // should be called exactly once when the femesh is inserted into a
   // mesh context object.
   void set_rwlock(RWLock *rw) { rwlock = rw; };
   inline RWLock *get_rwlock() { return rwlock;};
 
+  // Node positions must only be changed with move_node(), so that
+  // stored geometric data is recomputed.
+  void move_node(Node*, const Coord&);
+  const TimeStamp &geometryChanged() const { return geometryChanged_; }
+  ShapeFunctionStore *shapefunction_store() const { return sfstore_; }
+
 private:
   // These lists can be accessed through the MeshIterators.
   std::vector<FuncNode*> funcnode; // nodes at which dofs are defined
   std::vector<Node*> mapnode;	// nodes only used for geometry mapping
   std::vector<Element*> element;
   int ncount;			// node counter, for assigning ids
+  // Edge and interior nodes, recorded by buildElements.
+  std::vector<Node*> builtEdgeNodes_;
+  std::vector<int> builtEdgeNodeOffsets_;
+  std::vector<Node*> builtInteriorNodes_;
+  std::vector<int> builtInteriorNodeOffsets_;
 
   // Master lists of degrees of freedom and nodal equations
   std::vector<DegreeOfFreedom*> dof;
@@ -281,6 +352,7 @@ private:
   friend class MeshDataCache;
   friend class MemoryDataCache;
   friend class DiskDataCache;
+  friend class MappedDataCache;
 
   //AMR, moved to csubproblem
 // Adaptive Mesh Refinement stuff.
@@ -9,6 +9,7 @@
 # oof_manager@nist.gov. 
 
 from ooflib.SWIG.common import switchboard
+from ooflib.SWIG.engine import cfiddlenodes
 from ooflib.SWIG.common import progress
 from ooflib.common import debug
 from ooflib.common import parallel_enable
@@ -548,6 +549,23 @@ class FiddleNodes:
         self.targets.cleanUp()
         prog.finish()
 
+    # If useTemperature is true, moves that don't meet the criterion
+    # are accepted with probability exp(-deltaE/T).
+    useTemperature = True
+
+    # randomDraws returns the random numbers needed to compute a
+    # node's candidate positions, in any form.  It's called for each
+    # node in the shuffled order, but not necessarily right before
+    # candidatePositions is called for the node, so
+    # candidatePositions must not use random numbers itself.
+    def randomDraws(self, skeleton, node):
+        return None
+
+    def candidatePositions(self, skeleton, node, draws):
+        # Return a list of the positions to try for the node.  The
+        # criterion chooses at most one of them.
+        return [self.movedPosition(skeleton, node)]
+
     def coreProcess(self, context):
         ## NOTE FOR DEVELOPERS:
         #### if a change is made to this function,
@@ -563,44 +581,119 @@ class FiddleNodes:
         # are both active, only one of them should be in activenodes.
         activenodes = self.targets(context)
         random.shuffle(activenodes)
-        j = 0
+        # The moves of nodes that don't share an element are evaluated
+        # simultaneously in C++, but the results are the same as if
+        # the nodes were moved one at a time in the shuffled order.
+        fiddler = cfiddlenodes.CFiddleNodes(skeleton.MS)
+        for node in activenodes:
+            fiddler.addNode(node, list(node.getPartners()),
+                            list(node.neighborElements()))
+        # The energy change of each accepted move, in the shuffled
+        # order.  They're summed in that order at the end so that
+        # self.deltaE doesn't depend on the evaluation order.
+        self.acceptedE = [None]*len(activenodes)
         context.begin_writing()
         try:
-#             start_time = time.time()
-            for node in activenodes:
-                change = deputy.DeputyProvisionalChanges()
-                change.moveNode(node, self.movedPosition(skeleton, node),
-                                skeleton)
-                bestchange = self.criterion([change], skeleton)
-
-                if bestchange is not None:
-                    self.nok += 1
-                    self.deltaE += bestchange.deltaE(skeleton,
-                                                     self.criterion.alpha)
-                    bestchange.accept(skeleton)
-                # Failed to meet the specified criterion ... but
-                elif (self.T>0.0 and 
-                      not change.illegal(skeleton) and 
-                      not self.criterion.hopeless()):
-                    diffE = change.deltaE(skeleton, self.criterion.alpha)
-                    if math.exp(-diffE/self.T) > random.random():
-                        self.nok += 1
-                        self.deltaE += diffE
-                        change.accept(skeleton)
-                    else:
-                        self.nbad += 1
-                else:
-                    self.nbad += 1
-                        
-                if prog.stopped():
-                    return
-
-            skeleton.timestamp.increment()
+            if self.useTemperature and self.T > 0.0:
+                self.processInOrder(skeleton, fiddler, activenodes, prog)
+            else:
+                self.processInSets(skeleton, fiddler, activenodes, prog)
+            if not prog.stopped():
+                skeleton.timestamp.increment()
         finally:
+            for diffE in self.acceptedE:
+                if diffE is not None:
+                    self.deltaE += diffE
+            self.acceptedE = None
             prog.finish()
             context.end_writing()
             switchboard.notify("redraw")
 
+    def processInSets(self, skeleton, fiddler, activenodes, prog):
+        # Without the temperature, random numbers are only used to
+        # choose the candidate positions.  Each of fiddler's sets
+        # contains nodes that depend only on nodes in earlier sets, so
+        # processing the sets in order is the same as processing the
+        # nodes in order.
+        minHomog, maxShape = self.criterion.nodeMoveLimits()
+        draws = [self.randomDraws(skeleton, node) for node in activenodes]
+        for s in range(fiddler.makeSets()):
+            nodeset = fiddler.getSet(s)
+            candidates = [self.candidatePositions(skeleton, activenodes[i],
+                                                  draws[i])
+                          for i in nodeset]
+            fiddler.evaluate(s, [pt for c in candidates for pt in c],
+                             [len(c) for c in candidates],
+                             self.criterion.alpha, minHomog, maxShape)
+            for i, positions in zip(nodeset, candidates):
+                moves = self.evaluatedMoves(fiddler, i, len(positions))
+                self.acceptMove(skeleton, fiddler, i, activenodes[i],
+                                positions, moves,
+                                self.criterion.chooseNodeMove(moves))
+            if prog.stopped():
+                return
+
+    def processInOrder(self, skeleton, fiddler, activenodes, prog):
+        # With the temperature, whether or not a random number is
+        # drawn to accept a move depends on the moves of the previous
+        # nodes, so the nodes are processed in runs of consecutive
+        # independent nodes.  The candidates for a run are computed
+        # assuming that no temperature test is needed.  If one is
+        # needed, the random number generator is put back into the
+        # state it was in after computing that node's candidates, and
+        # the rest of the run is processed again later.
+        minHomog, maxShape = self.criterion.nodeMoveLimits()
+        start = 0
+        while start < len(activenodes):
+            end = fiddler.independentRun(start)
+            candidates = []
+            states = []
+            for i in range(start, end):
+                node = activenodes[i]
+                candidates.append(self.candidatePositions(
+                    skeleton, node, self.randomDraws(skeleton, node)))
+                states.append(random.getstate())
+            fiddler.evaluateRun(start, end,
+                                [pt for c in candidates for pt in c],
+                                [len(c) for c in candidates],
+                                self.criterion.alpha, minHomog, maxShape)
+            for i in range(start, end):
+                positions = candidates[i-start]
+                moves = self.evaluatedMoves(fiddler, i, len(positions))
+                best = self.criterion.chooseNodeMove(moves)
+                rewound = False
+                # Failed to meet the specified criterion ... but
+                if (best is None and len(moves) == 1 and not moves[0][0]
+                    and not self.criterion.hopeless()):
+                    random.setstate(states[i-start])
+                    rewound = True
+                    if math.exp(-moves[0][1]/self.T) > random.random():
+                        best = 0
+                self.acceptMove(skeleton, fiddler, i, activenodes[i],
+                                positions, moves, best)
+                if rewound:
+                    end = i + 1
+                    break
+            start = end
+            if prog.stopped():
+                return
+
+    def evaluatedMoves(self, fiddler, i, ncandidates):
+        # The (illegal, deltaE, withinLimits) tuples for node i's
+        # candidates, as evaluated by the CFiddleNodes object.
+        return [(fiddler.illegal(i, c), fiddler.deltaE(i, c),
+                 fiddler.withinLimits(i, c))
+                for c in range(ncandidates)]
+
+    def acceptMove(self, skeleton, fiddler, i, node, positions, moves, best):
+        if best is None:
+            self.nbad += 1
+        else:
+            self.nok += 1
+            self.acceptedE[i] = moves[best][1]
+            skeleton.moveNodeTo(node, positions[best])
+            fiddler.accept(i, best)
+
     # Parallel function
     if parallel_enable.enabled():
         def apply_parallel(self, oldskeleton, context):
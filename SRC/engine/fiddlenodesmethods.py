@@ -35,21 +35,29 @@ class AnnealMovePosition(fiddlenodesbase.FiddleNodesMovePosition):
         self.delta = delta
 
     def __call__(self, skeleton, node):
+        return self.displace(node, self.displacement(skeleton))
+
+    def displacement(self, skeleton):
         if config.dimension() == 2:
             px, py = skeleton.MS.sizeOfPixels()
             dx = random.gauss(0.0, self.delta*px)
             dy = random.gauss(0.0, self.delta*py)
-            return primitives.Point(node.position()[0]+dx,
-                                    node.position()[1]+dy)
+            return (dx, dy)
         elif config.dimension() == 3:
             px, py, pz = skeleton.MS.sizeOfPixels()
             dx = random.gauss(0.0, self.delta*px)
             dy = random.gauss(0.0, self.delta*py)
             dz = random.gauss(0.0, self.delta*pz)
-           
-            return primitives.Point(node.position()[0]+dx,
-                                    node.position()[1]+dy,
-                                    node.position()[2]+dz)
+            return (dx, dy, dz)
+
+    def displace(self, node, d):
+        if config.dimension() == 2:
+            return primitives.Point(node.position()[0]+d[0],
+                                    node.position()[1]+d[1])
+        elif config.dimension() == 3:
+            return primitives.Point(node.position()[0]+d[0],
+                                    node.position()[1]+d[1],
+                                    node.position()[2]+d[2])
         
     
 registeredclass.Registration(
@@ -73,6 +81,13 @@ class Anneal(FiddleNodes, skeletonmodifier.SkeletonModifier):
         self.outro = "Annealing done: "
         self.movedPosition = AnnealMovePosition(self.delta)
 
+    # The random displacements are drawn in the shuffled order, but
+    # are added to the node positions only when the nodes are moved.
+    def randomDraws(self, skeleton, node):
+        return self.movedPosition.displacement(skeleton)
+    def candidatePositions(self, skeleton, node, displacement):
+        return [self.movedPosition.displace(node, displacement)]
+
 if parallel_enable.enabled():
     from ooflib.engine import fiddlenodesbaseParallel
     Anneal.coreProcess_parallel = fiddlenodesbaseParallel._annealCoreProcess
@@ -283,43 +298,12 @@ class SnapAnneal(FiddleNodes, skeletonmodifier.SkeletonModifier):
         self.outro = "Snapping done: "
         self.movedPosition = SnapMovePosition()
 
+    # SnapAnneal chooses the best of the transition points, and
+    # doesn't use T to accept the moves that don't meet the criterion.
+    useTemperature = False
 
-    def coreProcess(self, context):
-        skeleton = context.getObject()
-        prog = self.makeProgress()
-        self.totalEnergy = skeleton.energyTotal(self.criterion.alpha)
-        self.nok = self.nbad = 0
-        self.deltaE = 0.
-        activenodes = self.targets(context)
-        random.shuffle(activenodes)
-        j = 0
-        context.begin_writing()
-        try:
-            for node in activenodes:
-                # obtain transition points
-                tps = self.movedPosition(skeleton, node)
-                changes = []
-                for tp in tps:
-                    if tp:
-                        change = deputy.DeputyProvisionalChanges()
-                        change.moveNode(node, tp, skeleton)
-                        changes.append(change)
-                    
-                bestchange = self.criterion(changes, skeleton)
-                if bestchange is not None:
-                    self.nok += 1
-                    self.deltaE += bestchange.deltaE(skeleton,
-                                                     self.criterion.alpha)
-                    bestchange.accept(skeleton)
-                else:
-                    self.nbad += 1
-                        
-                if prog.stopped():
-                    return
-            skeleton.timestamp.increment()
-        finally:
-            context.end_writing()
-            switchboard.notify("redraw")
+    def candidatePositions(self, skeleton, node, draws):
+        return [tp for tp in self.movedPosition(skeleton, node) if tp]
 
 if parallel_enable.enabled():
     from ooflib.engine import fiddlenodesbaseParallel
@@ -18,6 +18,7 @@ from ooflib.common.IO import whoville
 from ooflib.common.IO import xmlmenudump
 from ooflib.common.IO import placeholder
 import ooflib.engine.mesh
+import array
 import string
 import struct
 import types
@@ -27,31 +28,46 @@ import types
 
 class FieldInit:
     def apply(self, femesh, field, time=None, singleFieldDef=False):
-        if singleFieldDef:
-            # The purpose of calling node.fieldDefCount is to ensure
-            # that we don't set the value of a field that is defined
-            # in more than one subproblem when that field gets defined
-            # on the second subproblem.  Doing so would wipe out a
-            # value that might have been set by the first subproblem.
-            fniter = femesh.funcnode_iterator()
-            while not fniter.end():
-                node = fniter.node()
-                if node.fieldDefCount(field)==1:
-                    position = node.position()
-                    for i in range(field.ndof()): # field component
-                        field.setvalue(femesh, node, i,
-                                       self.func(position, time, i))
-                fniter.next()
-        else:
-            fniter = femesh.funcnode_iterator()
-            while not fniter.end():
-                node = fniter.node()
-                if node.hasField(field):
-                    position = node.position()
-                    for i in range(field.ndof()): # field component
-                        field.setvalue(femesh, node, i,
-                                       self.func(position, time, i))
-                fniter.next()
+        # Find the nodes to initialize and their positions, compute
+        # the values of each Field component at all of them at once,
+        # and set them all at once.
+        nodes = array.array('i')
+        coords = tuple([] for d in range(config.dimension()))
+        fniter = femesh.funcnode_iterator()
+        while not fniter.end():
+            node = fniter.node()
+            if singleFieldDef:
+                # The purpose of calling node.fieldDefCount is to
+                # ensure that we don't set the value of a field that
+                # is defined in more than one subproblem when that
+                # field gets defined on the second subproblem.  Doing
+                # so would wipe out a value that might have been set
+                # by the first subproblem.
+                ok = node.fieldDefCount(field) == 1
+            else:
+                ok = node.hasField(field)
+            if ok:
+                nodes.append(node.index())
+                position = node.position()
+                for d in range(len(coords)):
+                    coords[d].append(position[d])
+            fniter.next()
+        if not nodes:
+            return
+        ndof = field.ndof()
+        values = array.array('d', [0.0])*(len(nodes)*ndof)
+        for i in range(ndof):           # field component
+            values[i::ndof] = array.array('d', self.values(coords, time, i))
+        femesh.setFieldValues([field.name()], nodes.tostring(),
+                              values.tostring())
+
+    # Return a list of the values of a Field component at many
+    # positions.  coords is a tuple of lists of the x, y (and z)
+    # coordinates of the positions.  Subclasses can redefine this so
+    # that they don't have to call func() once per position.
+    def values(self, coords, time, component):
+        return [self.func(position, time, component)
+                for position in zip(*coords)]
 
 # The FieldInitParameter is not a simple RegisteredParameter because
 # it has to handle more than one RegisteredClass, for different
@@ -70,17 +86,21 @@ class FieldInitParameter(parameter.Parameter):
         return registration(**argdict)
     def valueDesc(self):
         return """A field initializer from one of the <link
-        linkend='RegisteredClass-ScalarFieldInit'><classname>ScalarFieldInit</classname></link>
+        linkend='RegisteredClass-ScalarFieldInit'>
+        <classname>ScalarFieldInit</classname></link>
         or <link
-        linkend='RegisteredClass-TwoVectorFieldInit'><classname>TwoVectorFieldInit</classname></link>
+        linkend='RegisteredClass-TwoVectorFieldInit'>
+        <classname>TwoVectorFieldInit</classname></link>
         classes."""
 
 #############################
 
 # Derived classes of FieldInit must provide func(position, time,
 # component) that returns the value of a Field component at the given
-# position and time.  They must also indicate what type of field they
-# work for by inserting themselves into the fieldInitDict dictionary.
+# position and time.  They may also provide values(coords, time,
+# component), which does the same thing for a list of positions.
+# They must also indicate what type of field they work for by
+# inserting themselves into the fieldInitDict dictionary.
 
 ## We could get rid of fieldInitDict and make FieldInit a normal
 ## RegisteredClass by using the RegisteredClassFactory's
@@ -144,6 +164,8 @@ class ConstScalarFieldInit(ScalarFieldInit):
         self.value = value
     def func(self, position, time, component):
         return self.value
+    def values(self, coords, time, component):
+        return [self.value]*len(coords[0])
     def shortrepr(self):
         return str(self.value)
 
@@ -169,6 +191,8 @@ class ConstTwoVectorFieldInit(TwoVectorFieldInit):
         if component == 0:
             return self.cx
         return self.cy
+    def values(self, coords, time, component):
+        return [self.func(None, time, component)]*len(coords[0])
     def shortrepr(self):
         return "cx=%s, cy=%s" % (str(self.cx), str(self.cy))
 
@@ -206,6 +230,8 @@ class ConstThreeVectorFieldInit(ThreeVectorFieldInit):
                 return self.cy
             else:
                 return self.cz
+    def values(self, coords, time, component):
+        return [self.func(None, time, component)]*len(coords[0])
     def shortrepr(self):
         return "cx=%s, cy=%s, cz=%s" % (self.cx, self.cy, self.cz)
 
@@ -288,6 +314,8 @@ class FuncScalarFieldInit(ScalarFieldInit):
         self.function = function
     def func(self, position, time, component):
         return self.function(position, time)
+    def values(self, coords, time, component):
+        return self.function.mapCoords(coords, time)
     def shortrepr(self):
         return str(self.function)
 
@@ -315,6 +343,10 @@ class FuncTwoVectorFieldInit(TwoVectorFieldInit):
         if  component == 0:
             return self.fx(position, time)
         return self.fy(position, time)
+    def values(self, coords, time, component):
+        if component == 0:
+            return self.fx.mapCoords(coords, time)
+        return self.fy.mapCoords(coords, time)
     def shortrepr(self):
         return "fx=%s, fy=%s" % (str(self.fx), str(self.fy))
 
@@ -392,6 +424,9 @@ class FuncSymmetricTensorFieldInit(SymmetricTensorFieldInit):
     def func(self, position, time, component):
         func = getattr(self, FuncSymmetricTensorFieldInit.mapping[component])
         return func(position)
+    def values(self, coords, time, component):
+        func = getattr(self, FuncSymmetricTensorFieldInit.mapping[component])
+        return func.mapCoords(coords)
     def shortrepr(self):
         return "fxx=%s, fyy=%s, fzz=%s, fyz=%s, fxz=%s, fxy=%s" % \
                (str(self.fxx), str(self.fyy), str(self.fzz),
@@ -524,3 +559,5 @@ xmlmenudump.addRegisteredClass(SymmetricTensorFieldInit)
 class ResetFieldInit(FieldInit):
     def func(self, position, time, index):
         return 0
+    def values(self, coords, time, index):
+        return [0.0]*len(coords[0])
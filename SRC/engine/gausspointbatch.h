@@ -0,0 +1,52 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+#ifndef GAUSSPOINTBATCH_H
+#define GAUSSPOINTBATCH_H
+
+#include <oofconfig.h>
+#include "engine/gausspoint.h"
+#include <vector>
+
+class Element;
+
+// A GaussPointBatch holds all of the gauss points of an Element,
+// along with the values and real-space derivatives of the shape
+// functions of all of the Element's function nodes at those points.
+// The values are stored in contiguous arrays, so that Properties
+// that provide FluxProperty::flux_matrix_batch() can compute their
+// contributions at all points without a virtual function call per
+// node per point.
+
+// Function nodes are numbered in the order in which
+// Element::funcnode_iterator() visits them.
+
+class GaussPointBatch {
+private:
+  std::vector<GaussPoint> points_;
+  int nfuncnodes_;
+  std::vector<double> sf_;	// sf_[p*nfuncnodes_ + n]
+  std::vector<double> dsf_;	// dsf_[(p*nfuncnodes_ + n)*DIM + i]
+public:
+  GaussPointBatch(const Element*, int order);
+  int npoints() const { return points_.size(); }
+  int nfuncnodes() const { return nfuncnodes_; }
+  const GaussPoint &gausspoint(int p) const { return points_[p]; }
+  double shapefunction(int p, int n) const {
+    return sf_[p*nfuncnodes_ + n];
+  }
+  // Pointer to the DIM derivatives of shape function n at point p.
+  const double *dshapefunction(int p, int n) const {
+    return &dsf_[(p*nfuncnodes_ + n)*DIM];
+  }
+};
+
+#endif // GAUSSPOINTBATCH_H
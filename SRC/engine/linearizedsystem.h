@@ -18,9 +18,11 @@ class Equation;
 class Field;
 class FloatBCApp;
 class FuncNode;
+class NearNullspace;
 class NodalEquation;
 
 #include "common/doublevec.h"
+#include "common/timestamp.h"
 #include "engine/dofmap.h"
 #include "engine/sparsemat.h"
 #include <vector>
@@ -49,6 +51,21 @@ class NodalEquation;
 //  * The vectors body_rhs, force_bndy_rhs, and fix_bndy_rhs contain
 //    various contributions to the rhs.  See below for details.
 
+// AssemblyPattern keeps track of the refilling of one of the K, C, M,
+// or J matrices.  When the sparsity pattern of a matrix is known to
+// be valid, LinearizedSystem::clearMatrices() just zeroes the stored
+// values, and insertK(), etc., add directly to them instead of
+// creating triplets.  'touched' records which entries have received
+// contributions, so that consolidate() can tell if the old pattern
+// was bigger than the new one.
+
+class AssemblyPattern {
+public:
+  bool refill;
+  std::vector<char> touched;
+  AssemblyPattern() : refill(false) {}
+};
+
 class LinearizedSystem {
 public:
   CSubProblem *subproblem;
@@ -98,6 +115,26 @@ private:
   // system).
   std::vector<Triplet> KTri_, CTri_, MTri_, JTri_;
 
+  // The sparsity patterns of K_, C_, M_, and J_ are reused when the
+  // matrices are rebuilt, as long as the subproblem's DoF and
+  // equation maps haven't changed since patternStamp_.  If an
+  // element inserts a value outside of the pattern, or if some
+  // pattern entries don't get any contributions, the matrix is
+  // rebuilt from triplets as usual.  See clearMatrices() and
+  // consolidate().
+  AssemblyPattern Kpat_, Cpat_, Mpat_, Jpat_;
+  TimeStamp patternStamp_;
+  bool reusePattern_;
+  bool patternReused_;		// was the pattern reused last time?
+  int patternHits_;
+  int patternRebuilds_;
+  bool pattern_valid(const SparseMat&) const;
+  void start_refill(SparseMat&, AssemblyPattern&);
+  void insert_value(SparseMat&, AssemblyPattern&, std::vector<Triplet>&,
+		    int, int, double);
+  void spill_pattern(SparseMat&, AssemblyPattern&, std::vector<Triplet>&);
+  bool finish_matrix(SparseMat&, AssemblyPattern&, std::vector<Triplet>&);
+
   // Each map level operates on the output from the previous level.
   // The domain of level x is the range of level x-1.
 
@@ -203,6 +240,15 @@ private:
   // A flag indicates if make_linear_system is running in parallel
   bool mkl_parallel; 
 
+  // A flag indicating that the elements are being processed in
+  // colors, so that no two threads touch the same matrix row at the
+  // same time.  In that case the threads refill the shared matrix
+  // patterns and add directly to the shared vectors, and only use
+  // their own triplet lists for entries that aren't in the patterns.
+  bool colored_parallel;
+  void insert_shared(SparseMat&, AssemblyPattern&, std::vector<Triplet>&,
+		     int, int, double);
+
   // Flags used to decide if copies of residual and J matrix
   // need to be created for thraeds.
   bool need_residual;
@@ -308,6 +354,15 @@ public:
 
   void consolidate();
 
+  // Statistics and control for the reuse of sparsity patterns.
+  // patternReused() is true if the last call to consolidate() only
+  // refilled the existing matrices.
+  void set_reuse_pattern(bool);
+  bool reuse_pattern() const { return reusePattern_; }
+  bool patternReused() const { return patternReused_; }
+  int patternHits() const { return patternHits_; }
+  int patternRebuilds() const { return patternRebuilds_; }
+
   void insertK(int, int, double);
   void insertC(int, int, double);
   void insertM(int, int, double);
@@ -365,6 +420,12 @@ public:
 
   DoubleVec *error_estimation_dofs_MCKd(const DoubleVec*) const;
 
+  // near_nullspace_MCK() returns a new'd description of the
+  // approximate nullspace of K_MCK, for multigrid preconditioners.
+  // The in-plane displacement has rigid body modes, and each
+  // component of every other Field has a constant mode.
+  NearNullspace *near_nullspace_MCK() const;
+
   // FloatBC support functions.
   int getSubproblemDoFIndex(const FuncNode*, const Field*, int) const;
   int getSubproblemEqnIndex(const FuncNode*, const Equation*, int) const;
@@ -375,8 +436,11 @@ public:
 #ifdef _OPENMP
   // Make copies of matrices and vectors for each thread.
   // It is called at the beginning of make_linear_system
-  // (CSubProblem::make_linear_system).
-  void init_parallel_env(bool needJacobian, bool needResidual);
+  // (CSubProblem::make_linear_system).  If colored is true, the
+  // vectors aren't copied, and the threads write directly into the
+  // matrices where possible.  See colored_parallel, above.
+  void init_parallel_env(bool needJacobian, bool needResidual,
+			 bool colored=false);
 
   // Merge the copies of each thread to the orignals and
   // delete the copies. It is called at the end of 
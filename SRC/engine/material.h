@@ -42,6 +42,7 @@ class Field;
 class Flux;
 class FluxProperty;
 class Equation;
+class GaussPointBatch;
 class LinearizedSystem;
 class MasterPosition;
 class PixelSet;
@@ -133,6 +134,16 @@ private:
   TimeStamp timestamp;
   bool self_consistent_;
 
+  // Equation contributions at a single point, given the flux data
+  // computed at that point.  Used by both versions of
+  // make_linear_system.
+  void make_equation_contributions(
+			   const CSubProblem*, const Element*,
+			   const GaussPoint&, const std::vector<int>&,
+			   std::map<Flux*, SmallSystem*, ltidobject<Flux>>&,
+			   double time, const CNonlinearSolver*,
+			   LinearizedSystem&) const;
+
   Material(const Material&);	// forbidden
 public:
   Material();
@@ -195,6 +206,16 @@ public:
 			  double time,
 			  const CNonlinearSolver*,
 			  LinearizedSystem&) const;
+  // Make_linear_system for all the gauss points of an Element at
+  // once.  Properties that define FluxProperty::flux_matrix_batch
+  // compute all of their flux matrices in one call.
+  void make_linear_system(const CSubProblem*,
+			  const Element*,
+			  const GaussPointBatch&,
+			  const std::vector<int>&,
+			  double time,
+			  const CNonlinearSolver*,
+			  LinearizedSystem&) const;
 //   void set_time_derivatives(CSubProblem*,
 // 			    const Element*,
 // 			    LinearizedSystem&) const;
@@ -12,7 +12,9 @@ from ooflib.SWIG.engine import cmatrixmethods
 from ooflib.SWIG.engine import ooferror2
 from ooflib.engine import preconditioner
 from ooflib.common import debug
+from ooflib.common import enum
 from ooflib.common import registeredclass
+from ooflib.common import utils
 from ooflib.common.IO import mainmenu
 from ooflib.common.IO import oofmenu
 from ooflib.common.IO import parameter
@@ -28,15 +30,18 @@ import math
 # and returns a tuple containing the number of iterations taken and
 # the final residual.
 
-## TODO OPT MAYBE: Cache the preconditioners in the LinearizedSystem
-## so they can be re-used if the matrix hasn't changed.
-
 class MatrixMethod(registeredclass.RegisteredClass):
     registry = []
     def shortrepr(self):
         return self.__class__.__name__
     def solve(self, matrix, rhs, solution):
         return self.solveMatrix(matrix, rhs, solution)
+    def setNearNullspace(self, nullspace):
+        # nullspace is a NearNullspace object describing the matrices
+        # that will be solved (see
+        # LinearizedSystem::near_nullspace_MCK), or None.  Only
+        # multigrid preconditioners use it.
+        pass
     tip="Ways to solve a matrix equation."
     discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/matrixmethod.xml')
             
@@ -45,6 +50,66 @@ class PreconditionedMatrixMethod(MatrixMethod):
     def shortrepr(self):
         return "%s(%s)" % (self.__class__.__name__, 
                            self.preconditioner.shortrepr())
+    def setSolverOptions(self):
+        self.solver.set_max_iterations(self.max_iterations)
+        self.solver.set_tolerance(self.tolerance)
+        self.solver.set_initial_guess(_guessmap[self.initial_guess.name])
+        self.solver.set_reuse_preconditioner(self.reuse_preconditioner,
+                                             self.reuse_tolerance)
+    def setNearNullspace(self, nullspace):
+        if self.preconditioner.usesNearNullspace:
+            self.solver.set_near_nullspace(nullspace)
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# Iterative solvers can start from zero, from the values already in
+# the solution vector, or from previous solutions.  When the solver is
+# used for time stepping, the previous solutions are the solutions
+# from the previous steps.
+
+class InitialGuess(enum.EnumClass(
+        ('Zero', 'Start the iterations from zero.'),
+        ('Given', 'Start from the values already in the solution vector.'),
+        ('Previous', 'Start from the previous solution.'),
+        ('Extrapolated',
+         'Extrapolate linearly from the previous two solutions.'))):
+    pass
+utils.OOFdefine('InitialGuess', InitialGuess)
+
+InitialGuess.tip = "Starting points for iterative matrix solvers."
+InitialGuess.discussion = """<para>
+The starting point for an iterative matrix solution.  When a matrix
+equation is solved repeatedly with slowly changing matrices and
+right hand sides, as in a time dependent problem with small time
+steps, starting from the previous solution or from an extrapolation
+of the previous two solutions can greatly reduce the number of
+iterations.
+</para>"""
+
+_guessmap = {
+    'Zero' : cmatrixmethods.ZERO_GUESS,
+    'Given' : cmatrixmethods.GIVEN_GUESS,
+    'Previous' : cmatrixmethods.PREVIOUS_GUESS,
+    'Extrapolated' : cmatrixmethods.EXTRAPOLATED_GUESS
+    }
+
+# Parameters shared by the preconditioned iterative methods, after
+# the preconditioner, tolerance, and max_iterations.
+
+def _iterativeParams():
+    return [
+        enum.EnumParameter(
+            "initial_guess", InitialGuess, InitialGuess('Zero'),
+            tip="Starting point for the iterations."),
+        parameter.BooleanParameter(
+            "reuse_preconditioner", False,
+            tip="Keep the preconditioner from one solution to the next,"
+            " as long as the matrix doesn't change too much."),
+        parameter.FloatParameter(
+            "reuse_tolerance", 0.01,
+            tip="Rebuild the preconditioner if the relative change in"
+            " the matrix exceeds this.")
+        ]
 
 class SymmetricMatrixMethodParam(parameter.RegisteredParameter):
     def __init__(self, name, value=None, default=None, tip=None):
@@ -62,11 +127,13 @@ solver_map["CG"]["Un"] = cmatrixmethods.CG_Unpre
 solver_map["CG"]["Diag"] = cmatrixmethods.CG_Diag
 solver_map["CG"]["ILUT"] = cmatrixmethods.CG_ILUT
 solver_map["CG"]["ILU"] = cmatrixmethods.CG_ILUT
+solver_map["CG"]["AMG"] = cmatrixmethods.CG_AMG
 solver_map["BiCGStab"] = {}
 solver_map["BiCGStab"]["Un"] = cmatrixmethods.BiCGStab_Unpre
 solver_map["BiCGStab"]["Diag"] = cmatrixmethods.BiCGStab_Diag
 solver_map["BiCGStab"]["ILUT"] = cmatrixmethods.BiCGStab_ILUT
 solver_map["BiCGStab"]["ILU"] = cmatrixmethods.BiCGStab_ILUT
+solver_map["BiCGStab"]["AMG"] = cmatrixmethods.BiCGStab_AMG
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
@@ -76,13 +143,17 @@ _check_symmetry = False #debug.debug()
 ## the residual. 
 
 class ConjugateGradient(PreconditionedMatrixMethod):
-    def __init__(self, preconditioner, tolerance, max_iterations):
+    def __init__(self, preconditioner, tolerance, max_iterations,
+                 initial_guess=InitialGuess('Zero'),
+                 reuse_preconditioner=False, reuse_tolerance=0.01):
         self.preconditioner = preconditioner
         self.tolerance = tolerance
         self.max_iterations = max_iterations
+        self.initial_guess = initial_guess
+        self.reuse_preconditioner = reuse_preconditioner
+        self.reuse_tolerance = reuse_tolerance
         self.solver = solver_map["CG"][preconditioner.name]()
-        self.solver.set_max_iterations(max_iterations)
-        self.solver.set_tolerance(tolerance)
+        self.setSolverOptions()
     def solveMatrix(self, matrix, rhs, solution):
         if _check_symmetry:
             import sys
@@ -114,7 +185,8 @@ registeredclass.Registration(
             tip="Largest acceptable relative error in the matrix solution."),
         parameter.IntParameter(
             "max_iterations", 1000,
-            tip="Maximum number of iterations to perform.")],
+            tip="Maximum number of iterations to perform.")
+        ] + _iterativeParams(),
     tip="Conjugate Gradient method for iteratively solving symmetric matrices.",
     discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/cg.xml')
     )
@@ -135,13 +207,17 @@ mainmenu.debugmenu.addItem(
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
 class StabilizedBiConjugateGradient(PreconditionedMatrixMethod):
-    def __init__(self, preconditioner, tolerance, max_iterations):
+    def __init__(self, preconditioner, tolerance, max_iterations,
+                 initial_guess=InitialGuess('Zero'),
+                 reuse_preconditioner=False, reuse_tolerance=0.01):
         self.preconditioner = preconditioner
         self.tolerance = tolerance
         self.max_iterations = max_iterations
+        self.initial_guess = initial_guess
+        self.reuse_preconditioner = reuse_preconditioner
+        self.reuse_tolerance = reuse_tolerance
         self.solver = solver_map["BiCGStab"][preconditioner.name]()
-        self.solver.set_max_iterations(max_iterations)
-        self.solver.set_tolerance(tolerance)
+        self.setSolverOptions()
     def solveMatrix(self, matrix, rhs, solution):
         succ = self.solver.solve(matrix, rhs, solution)
         if succ != cmatrixmethods.SUCCESS: 
@@ -166,7 +242,8 @@ registeredclass.Registration(
             tip="Largest acceptable relative error in the matrix solution."),
         parameter.IntParameter(
             "max_iterations", 1000,
-            tip="Maximum number of iterations to perform.")],
+            tip="Maximum number of iterations to perform.")
+        ] + _iterativeParams(),
     tip="Stabilized bi-conjugate gradient method for iteratively solving non-symmetric matrices.",
     discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/bicgstab.xml')
 )
@@ -176,9 +253,12 @@ registeredclass.Registration(
 ## Preserve this method for backward compitability, which actually
 ## inherts BiCGStab.
 class BiConjugateGradient(StabilizedBiConjugateGradient):
-    def __init__(self, preconditioner, tolerance, max_iterations):
+    def __init__(self, preconditioner, tolerance, max_iterations,
+                 initial_guess=InitialGuess('Zero'),
+                 reuse_preconditioner=False, reuse_tolerance=0.01):
         StabilizedBiConjugateGradient.__init__(
-            self, preconditioner, tolerance, max_iterations)
+            self, preconditioner, tolerance, max_iterations,
+            initial_guess, reuse_preconditioner, reuse_tolerance)
 
 registeredclass.Registration(
     "BiCG",
@@ -196,7 +276,8 @@ registeredclass.Registration(
             tip="Largest acceptable relative error in the matrix solution."),
         parameter.IntParameter(
             "max_iterations", 1000,
-            tip="Maximum number of iterations to perform.")],
+            tip="Maximum number of iterations to perform.")
+        ] + _iterativeParams(),
     tip="Bi-conjugate gradient method for iteratively solving non-symmetric matrices.",
     discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/bicg.xml')
 )
@@ -205,6 +286,12 @@ registeredclass.Registration(
 
 # Direct linear solvers 
 
+# The C++ direct solvers keep the factorization of the last matrix
+# they solved.  If the next matrix has the same sparsity pattern, the
+# symbolic analysis is reused, and if it has the same values as well,
+# only the back substitution is done.  So each of these MatrixMethod
+# objects should be used for a single sequence of similar matrices.
+
 ## Preserve this method for backward compitability, which actually
 ## calls SparseLU. 
 class DirectMatrixSolver(MatrixMethod):
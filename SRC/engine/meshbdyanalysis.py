@@ -25,11 +25,10 @@ class MeshBdyAnalyzer(registeredclass.RegisteredClass):
         edgeset = femesh.getBoundary(boundary).edgeset
         result = self.do_analysis(femesh, edgeset) # defined in subclasses
 
+        values = list(result.valuePtr().value_list())
         if formatchars.showTime():
-            print >> destination, time,
-        for x in result.valuePtr().value_list():
-            print >> destination, x,
-        print >> destination
+            values = [time] + values
+        destination.writeRow(values)
 
         destination.flush()
 
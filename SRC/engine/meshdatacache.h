@@ -99,4 +99,54 @@ public:
 
 void cleanUpDDcaches();
 
+// MappedDataCache stores all time steps in a single memory-mapped
+// temp file, indexed by time.  If compress is true, each time step is
+// stored as the difference from the previous one, except for every
+// keyInterval'th step, which is stored in full.  See the comments in
+// meshdatacache.C for the format.
+
+class MappedDataCache : public MeshDataCache {
+private:
+  struct Entry {
+    size_t offset;		// position in the file
+    size_t nbytes;		// length in the file
+    unsigned int n;		// number of dofs
+    bool key;			// stored in full, not as a difference
+  };
+  std::vector<Entry> entries;	// in time order
+  std::map<double, int> index;	// time -> position in entries
+  const bool compress;
+  const int keyInterval;
+  int fd;
+  unsigned char *map;
+  size_t capacity;		// size of the file and the mapping
+  size_t used;			// bytes used by entries
+  DVec previous;		// last recorded step, if compressing
+  std::vector<unsigned char> encoded;
+  // Two decoded steps are kept, so that interpolate() can fetch the
+  // steps on either side of a time, and so that stepping through
+  // time can apply a single difference.
+  DVec decoded[2];
+  int decodedPos[2];		// position in entries, or -1
+  int nextSlot;
+  void reserve(size_t);
+  void append(const Entry&, const unsigned char*);
+  void decode(int, DVec&);
+  void applyDelta(const Entry&, DVec&) const;
+  int position(double) const;
+  virtual DVec &fetchOne(double);
+  virtual bool checkTime(double) const;
+  virtual DVec *allTimes() const;
+public:
+  MappedDataCache(FEMesh *mesh, bool compress, int keyInterval=16);
+  ~MappedDataCache();
+  virtual void restore_(double);
+  virtual void record();
+  virtual void clear();
+  bool compressed() const { return compress; }
+  // Bytes used in the file.  This is less than size()*ndofs*8 if the
+  // data is compressed.
+  unsigned long fileSize() const { return used; }
+};
+
 #endif // MESHDATACACHE_H
@@ -127,3 +127,69 @@ registeredclass.Registration(
     )
 
 
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+class ModifiedNewton(nonlinearsolvercore.ModifiedNewton, NonlinearSolver):
+    def __init__(self, *args, **kwargs):
+        nonlinearsolvercore.ModifiedNewton.__init__(self, *args, **kwargs)
+    def solve(self, *args, **kwargs):
+        niters, residual = nonlinearsolvercore.ModifiedNewton.solve(
+            self, *args, **kwargs)
+        self.subproblem.solverStats.nonlinearSolution(niters, residual)
+    def recordIteration(self, ratio, jacobianBuilt, linearIters):
+        self.subproblem.solverStats.nonlinearIteration(
+            ratio, jacobianBuilt, linearIters)
+    def __repr__(self):
+        return registeredclass.RegisteredClass.__repr__(self)
+
+registeredclass.Registration(
+    'Modified Newton',
+    NonlinearSolverBase,
+    ModifiedNewton,
+    ordering = 3,
+    params   = nonlin_params + [
+        parameter.IntParameter(
+            'jacobian_reuse', 5,
+            tip="Maximum number of iterations that use the same Jacobian."),
+        parameter.FloatParameter(
+            'stall_ratio', 0.5,
+            tip="Recompute the Jacobian when an iteration reduces the residual by less than this factor.")
+        ],
+    tip      = "Solve nonlinear equations with Newton's method, recomputing the Jacobian only occasionally.",
+    discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/modifiednewton.xml')
+    )
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+class NewtonKrylov(nonlinearsolvercore.NewtonKrylov, NonlinearSolver):
+    def __init__(self, *args, **kwargs):
+        nonlinearsolvercore.NewtonKrylov.__init__(self, *args, **kwargs)
+    def solve(self, *args, **kwargs):
+        niters, residual = nonlinearsolvercore.NewtonKrylov.solve(
+            self, *args, **kwargs)
+        self.subproblem.solverStats.nonlinearSolution(niters, residual)
+    def recordIteration(self, ratio, jacobianBuilt, linearIters):
+        self.subproblem.solverStats.nonlinearIteration(
+            ratio, jacobianBuilt, linearIters)
+    def __repr__(self):
+        return registeredclass.RegisteredClass.__repr__(self)
+
+registeredclass.Registration(
+    'Jacobian-Free Newton-Krylov',
+    NonlinearSolverBase,
+    NewtonKrylov,
+    ordering = 4,
+    params   = nonlin_params + [
+        parameter.FloatParameter(
+            'krylov_tolerance', 1.e-4,
+            tip="Relative tolerance for the linear solution in each Newton iteration."),
+        parameter.IntParameter(
+            'krylov_dimension', 30,
+            tip="Number of Krylov vectors to keep before restarting GMRES."),
+        parameter.IntParameter(
+            'krylov_max_iterations', 200,
+            tip="Maximum number of Krylov iterations in each Newton iteration.")
+        ],
+    tip      = "Solve nonlinear equations with Newton's method, without computing the Jacobian.",
+    discussion=xmlmenudump.loadFile('DISCUSSIONS/engine/reg/newtonkrylov.xml')
+    )
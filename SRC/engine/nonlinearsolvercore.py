@@ -207,6 +207,17 @@ class NLSolver(cnonlinearsolver.CNonlinearSolver):
         return self.step_from_parabolic_model_with_Armijo(
             data, values, update, res_norm0, precompute, compute_residual)
 
+    # recordIteration is called at the end of each iteration by the
+    # solvers that keep per-iteration statistics.  'ratio' is the
+    # ratio of the new residual norm to the previous one,
+    # 'jacobianBuilt' indicates whether a new Jacobian was computed
+    # for the iteration (None if the solver doesn't use one), and
+    # 'linearIters' is the number of Krylov iterations used, or None.
+    # Derived classes that know where to put the statistics should
+    # redefine this.
+    def recordIteration(self, ratio, jacobianBuilt, linearIters):
+        pass
+
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
@@ -423,6 +434,293 @@ class Picard(NLSolver):
                  self.maximum_iterations)
         return i, res_norm
 
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# ModifiedNewton is Newton's method with a Jacobian that is only
+# recomputed every jacobian_reuse iterations, or sooner if an
+# iteration fails to reduce the residual norm by at least the factor
+# stall_ratio.  When the Jacobian is reused the same matrix is passed
+# to matrix_method, so the direct solvers can reuse its factorization
+# (see the comment about DirectSolver in matrixmethod.py) and the
+# iterative solvers can reuse their preconditioners.  The residual
+# computed by the line search at the new solution is reused as well,
+# so an iteration with an old Jacobian doesn't call make_linear_system
+# any more than necessary.
+
+class ModifiedNewton(NLSolver):
+    def __init__(self, relative_tolerance, absolute_tolerance,
+                 maximum_iterations, jacobian_reuse, stall_ratio):
+        NLSolver.__init__(self, relative_tolerance, absolute_tolerance,
+                          maximum_iterations)
+        self.jacobian_reuse = jacobian_reuse
+        self.stall_ratio = stall_ratio
+        self.requireJacobian(True)
+        self.requireResidual(True)
+    def shortrepr(self):
+        return "ModifiedNewton"
+    def solve(self, matrix_method, precompute, compute_residual,
+              compute_jacobian, compute_linear_coef_mtx, data, values):
+        # The arguments are the same as the arguments of Newton.solve.
+        n = values.size()
+        update = doublevec.DoubleVec(n)
+
+        self.requireResidual(True)
+        self.requireJacobian(True)
+        precompute(data, values, self)
+        residual = compute_residual(data, values, self)
+
+        res_norm0 = residual.norm()
+        res_norm = res_norm0
+
+        prog = progress.getProgress("Modified Newton Solver",
+                                    progress.LOGDEFINITE)
+        target_res = self.relative_tolerance*res_norm0 + self.absolute_tolerance
+        if res_norm0 > target_res:
+            prog.setRange(res_norm0, target_res)
+        try:
+            J = None                # the current Jacobian
+            age = 0                 # number of times J has been used
+            s = 1.
+            i = 0
+            while (res_norm > target_res and i < self.maximum_iterations
+                   and not prog.stopped()):
+                # The linear system is up to date, and includes the
+                # Jacobian if J is None.
+                jacobianBuilt = J is None
+                if jacobianBuilt:
+                    J = compute_jacobian(data, self)
+                    age = 0
+                update.zero()
+                residual *= -1.0
+                matrix_method.solve(J, residual, update)
+                age += 1
+
+                try:
+                    s, residual = self.choose_step_size(
+                        data, values, update, res_norm,
+                        precompute, compute_residual)
+                except ooferror2.ErrConvergenceFailure:
+                    # An old Jacobian may not give a descent
+                    # direction.  Try again with a new one.  The line
+                    # search has changed the linear system, so it has
+                    # to be recomputed at the current solution.
+                    if jacobianBuilt:
+                        raise
+                    J = None
+                    self.requireJacobian(True)
+                    self.requireResidual(True)
+                    precompute(data, values, self)
+                    residual = compute_residual(data, values, self)
+                    i += 1
+                    continue
+                values += s * update
+
+                prev_norm = res_norm
+                res_norm = residual.norm()
+                self.recordIteration(res_norm/prev_norm, jacobianBuilt, None)
+                if res_norm <= target_res:
+                    break
+
+                if (age >= self.jacobian_reuse or
+                    res_norm > self.stall_ratio*prev_norm):
+                    # Update the linear system, including the Jacobian.
+                    J = None
+                    self.requireJacobian(True)
+                    self.requireResidual(True)
+                    precompute(data, values, self)
+                    residual = compute_residual(data, values, self)
+                    res_norm = residual.norm()
+                # Otherwise the last step of the line search has
+                # already computed the residual at the new solution.
+
+                prog.setMessage("%g/%g" % (res_norm, target_res))
+                prog.setFraction(res_norm)
+
+                i += 1
+
+            if prog.stopped():
+                prog.setMessage("Modified Newton solver interrupted")
+                raise ooferror2.ErrInterrupted();
+        finally:
+            prog.finish()
+        if i >= self.maximum_iterations and res_norm > target_res:
+            raise ooferror2.ErrConvergenceFailure(
+                'Nonlinear solver - Modified Newton iterations',
+                self.maximum_iterations)
+        return i, res_norm
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# NewtonKrylov is a Jacobian-free Newton-Krylov solver.  The Newton
+# equation J*update = -residual is solved approximately by restarted
+# GMRES, and the products of J with the Krylov vectors are computed
+# from finite differences of the residual,
+#
+#    J*v = (F(u + h*v) - F(u))/h
+#
+# so the Jacobian is never assembled, and matrix_method isn't used.
+# Each Krylov iteration costs one residual evaluation.  GMRES stops
+# when the norm of the linear residual has been reduced by the factor
+# krylov_tolerance, or after krylov_max_iterations iterations.  An
+# inexact solution is still used as the Newton update, and the line
+# search guards against poor updates.
+
+class NewtonKrylov(NLSolver):
+    def __init__(self, relative_tolerance, absolute_tolerance,
+                 maximum_iterations, krylov_tolerance, krylov_dimension,
+                 krylov_max_iterations):
+        NLSolver.__init__(self, relative_tolerance, absolute_tolerance,
+                          maximum_iterations)
+        self.krylov_tolerance = krylov_tolerance
+        self.krylov_dimension = krylov_dimension
+        self.krylov_max_iterations = krylov_max_iterations
+        self.requireJacobian(False)
+        self.requireResidual(True)
+    def shortrepr(self):
+        return "NewtonKrylov"
+
+    # Square root of the machine precision, used to choose the finite
+    # difference step.
+    sqrt_eps = math.sqrt(2.2204460492503131e-16)
+
+    def jacobian_product(self, data, values, residual, v, precompute,
+                         compute_residual):
+        # Return an approximation to J*v, where J is the Jacobian at
+        # 'values' and 'residual' is the residual there.
+        v_norm = v.norm()
+        if v_norm == 0.0:
+            return doublevec.DoubleVec(v.size())
+        h = self.sqrt_eps*(1.0 + values.norm())/v_norm
+        tempSoln = values + h * v
+        self.requireResidual(True)
+        self.requireJacobian(False)
+        precompute(data, tempSoln, self)
+        Jv = compute_residual(data, tempSoln, self)
+        Jv -= residual
+        Jv *= 1.0/h
+        return Jv
+
+    def gmres(self, matvec, rhs, solution):
+        # Restarted GMRES with modified Gram-Schmidt orthogonalization
+        # and Givens rotations, starting from solution=0.  matvec(v)
+        # returns the product of the matrix with v.  Returns the
+        # number of iterations.
+        target = self.krylov_tolerance*rhs.norm()
+        r = rhs.clone()
+        beta = r.norm()
+        niters = 0
+        while beta > target and niters < self.krylov_max_iterations:
+            V = [r * (1.0/beta)]    # orthonormal basis of the Krylov space
+            H = []                  # columns of the triangularized Hessenberg
+            cs = []                 # Givens rotations
+            sn = []
+            g = [beta]              # rotated rhs of the least squares problem
+            k = 0
+            while (k < self.krylov_dimension and
+                   niters < self.krylov_max_iterations):
+                w = matvec(V[k])
+                h = []
+                for j in range(k+1):
+                    hj = w.dot(V[j])
+                    w.axpy(-hj, V[j])
+                    h.append(hj)
+                h_next = w.norm()
+                for j in range(k):
+                    hj = cs[j]*h[j] + sn[j]*h[j+1]
+                    h[j+1] = -sn[j]*h[j] + cs[j]*h[j+1]
+                    h[j] = hj
+                d = math.sqrt(h[k]*h[k] + h_next*h_next)
+                niters += 1
+                if d == 0.0:
+                    break           # breakdown
+                cs.append(h[k]/d)
+                sn.append(h_next/d)
+                h[k] = d
+                g.append(-sn[k]*g[k])
+                g[k] = cs[k]*g[k]
+                H.append(h)
+                k += 1
+                if abs(g[k]) <= target or h_next == 0.0:
+                    break
+                V.append(w * (1.0/h_next))
+            if k == 0:
+                break
+            # Solve the triangular system H*y = g and add V*y to the
+            # solution.
+            y = [0.0]*k
+            for i in range(k-1, -1, -1):
+                yi = g[i]
+                for j in range(i+1, k):
+                    yi -= H[j][i]*y[j]
+                y[i] = yi/H[i][i]
+            for j in range(k):
+                solution.axpy(y[j], V[j])
+            if abs(g[k]) <= target:
+                break
+            # Restart with the true residual.
+            r = rhs - matvec(solution)
+            beta = r.norm()
+        return niters
+
+    def solve(self, matrix_method, precompute, compute_residual,
+              compute_jacobian, compute_linear_coef_mtx, data, values):
+        # The arguments are the same as the arguments of Newton.solve,
+        # but matrix_method, compute_jacobian, and
+        # compute_linear_coef_mtx aren't used.
+        n = values.size()
+        update = doublevec.DoubleVec(n)
+
+        self.requireResidual(True)
+        self.requireJacobian(False)
+        precompute(data, values, self)
+        residual = compute_residual(data, values, self)
+
+        res_norm0 = residual.norm()
+        res_norm = res_norm0
+
+        prog = progress.getProgress("Newton-Krylov Solver",
+                                    progress.LOGDEFINITE)
+        target_res = self.relative_tolerance*res_norm0 + self.absolute_tolerance
+        if res_norm0 > target_res:
+            prog.setRange(res_norm0, target_res)
+        try:
+            s = 1.
+            i = 0
+            while (res_norm > target_res and i < self.maximum_iterations
+                   and not prog.stopped()):
+                update.zero()
+                matvec = lambda v: self.jacobian_product(
+                    data, values, residual, v, precompute, compute_residual)
+                nkrylov = self.gmres(matvec, -residual, update)
+
+                s, residual = self.choose_step_size(
+                    data, values, update, res_norm,
+                    precompute, compute_residual)
+                values += s * update
+
+                # The line search has computed the residual at the new
+                # solution, so it doesn't have to be recomputed here.
+                prev_norm = res_norm
+                res_norm = residual.norm()
+                self.recordIteration(res_norm/prev_norm, None, nkrylov)
+                if res_norm <= target_res:
+                    break
+                prog.setMessage("%g/%g" % (res_norm, target_res))
+                prog.setFraction(res_norm)
+
+                i += 1
+
+            if prog.stopped():
+                prog.setMessage("Newton-Krylov solver interrupted")
+                raise ooferror2.ErrInterrupted();
+        finally:
+            prog.finish()
+        if i >= self.maximum_iterations and res_norm > target_res:
+            raise ooferror2.ErrConvergenceFailure(
+                'Nonlinear solver - Newton-Krylov iterations',
+                self.maximum_iterations)
+        return i, res_norm
+
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
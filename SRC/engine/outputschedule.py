@@ -420,11 +420,13 @@ class OutputSchedule(object):
             for output in self.nextoutputs:
                 # No need to check output.active here.  Only active
                 # outputs are in nextoutputs.
+                output.destination.setTime(time)
                 output.perform(self.meshcontext, time)
 
         for output in self.conditionalOutputs:
             if output.schedule.condition(self.meshcontext, time):
                 if output.active:
+                    output.destination.setTime(time)
                     output.perform(self.meshcontext, time)
 
     def finish(self):
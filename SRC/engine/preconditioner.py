@@ -21,6 +21,9 @@ class PreconditionerBase(registeredclass.RegisteredClass):
     registry = []
     tip = "Preconditioners for efficient solution of matrix equations."
     discussion = xmlmenudump.loadFile('DISCUSSIONS/engine/reg/preconditioner.xml')
+    # Only the multigrid preconditioner needs to know the near
+    # nullspace of the matrix.  See MatrixMethod.setNearNullspace.
+    usesNearNullspace = False
     def shortrepr(self):
         return self.__class__.__name__
 
@@ -33,6 +36,10 @@ class JacobiPreconditioner(PreconditionerBase):
 class ILUTPreconditioner(PreconditionerBase):
     name = "ILUT"
 
+class AMGPreconditioner(PreconditionerBase):
+    name = "AMG"
+    usesNearNullspace = True
+
 # ILU preconditioner actually points to ILUT preconditioner
 class ILUPreconditioner(PreconditionerBase):
     name = "ILU"
@@ -68,3 +75,27 @@ registeredclass.Registration(
     ordering=101,
     params=[],
     tip="ILU is not supported. It points to IncompleteLUT instead.") 
+
+registeredclass.Registration(
+    "AlgebraicMultigrid",
+    PreconditionerBase,
+    AMGPreconditioner,
+    ordering=50,
+    params=[],
+    tip="Smoothed aggregation algebraic multigrid.  Expensive to build, but the number of iterations hardly grows with the size of the mesh.",
+    discussion="""<para>
+    Builds a hierarchy of coarser matrices by aggregating strongly
+    connected nodes, keeping the components of each field together.
+    The coarse levels can represent the rigid body motions of the
+    displacement and a constant value of every other field
+    exactly.  The preconditioner applies one V-cycle with
+    damped Jacobi smoothing each time the preconditioner is used.
+    The coarsest matrix is factored directly.  The cycle is
+    symmetric, so it can be used with <xref
+    linkend='RegisteredClass-CG'/> as well as <xref
+    linkend='RegisteredClass-BiCGStab'/>.  It is most effective on
+    large meshes, where the other preconditioners need many
+    iterations.  Combine it with the
+    <varname>reuse_preconditioner</varname> option to avoid
+    rebuilding the hierarchy at every time step.
+    </para>""")
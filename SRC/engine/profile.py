@@ -80,6 +80,11 @@ class Profile(registeredclass.RegisteredClass):
     def timeDerivative2(self, location):
         return 0.0
 
+    # Evaluate the profile at a list of Locations.  Subclasses can
+    # redefine this to avoid calling __call__ once per Location.
+    def values(self, locations):
+        return [self(location) for location in locations]
+
     def addCondition(self, condition):
         self.conditions.append(condition)
 
@@ -116,6 +121,13 @@ class ProfileXTd(object):
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+def _positions(locations, i):
+    return [location.position[i] for location in locations]
+
+def _normals(locations, i):
+    return [location.normal[i] if location.normal is not None else None
+            for location in locations]
+
 class _ContinuumProfileX(Profile):
     def __init__(self, function):
         self.function = function
@@ -134,8 +146,23 @@ class _ContinuumProfileX(Profile):
                 location.distance,
                 location.fraction)
 
+    # Convert a list of Location objects into a tuple of argument
+    # lists for StrFunction.map.
+    def funcarglists(self, locations):
+        return (_positions(locations, 0),
+                _positions(locations, 1),
+                _normals(locations, 0),
+                _normals(locations, 1),
+                [location.index for location in locations],
+                [location.distance for location in locations],
+                [location.fraction for location in locations])
+
     def __call__(self, location):
         return self.function(*self.funcargs(location))
+    def values(self, locations):
+        if not locations:
+            return []
+        return self.function.map(*self.funcarglists(locations))
     # Output.
     def description(self):
         return `self.function`
@@ -166,6 +193,15 @@ class _ContinuumProfileXT(_ContinuumProfileX):
                 location.distance,
                 location.fraction)
 
+    def funcarglists(self, locations):
+        return (_positions(locations, 0),
+                _positions(locations, 1),
+                [location.time for location in locations],
+                _normals(locations, 0),
+                _normals(locations, 1),
+                [location.index for location in locations],
+                [location.distance for location in locations],
+                [location.fraction for location in locations])
 
     def isTimeDependent(self):
         return self._timeDependent
@@ -181,6 +217,16 @@ class _ContinuumProfileXTd(_ContinuumProfileXT):
 
     def evalTimeDerivative2(self, location):
         return self.timeDerivative2(*self.funcargs(location))
+
+    def evalTimeDerivativeValues(self, locations):
+        if not locations:
+            return []
+        return self.timeDerivative.map(*self.funcarglists(locations))
+
+    def evalTimeDerivative2Values(self, locations):
+        if not locations:
+            return []
+        return self.timeDerivative2.map(*self.funcarglists(locations))
     
     def equiv(self,other):
         return (other.__class__==self.__class__ and
@@ -272,6 +318,9 @@ class ConstantProfile(Profile, ProfileX, ProfileXT, ProfileXTd):
     def __call__(self, location):
         return self.value
 
+    def values(self, locations):
+        return [self.value]*len(locations)
+
     def equiv(self,other):
         if self.__class__==other.__class__:
             if self.value==other.value:
@@ -308,6 +357,10 @@ class LinearProfile(Profile, ProfileX, ProfileXT, ProfileXTd):
     def __call__(self, location):
         return location.fraction*(self.end-self.start)+self.start
 
+    def values(self, locations):
+        diff = self.end - self.start
+        return [location.fraction*diff + self.start for location in locations]
+
     def equiv(self, other):
         if self.__class__==other.__class__:
             if self.start==other.start and self.end==other.end:
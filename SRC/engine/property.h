@@ -37,6 +37,7 @@ class FEMesh;
 class Field;
 class Flux;
 class Equation;
+class GaussPointBatch;
 class LinearizedSystem;
 class MasterPosition;
 class Material;
@@ -286,6 +287,20 @@ public:
 			       const CNonlinearSolver*, SmallSystem*)
     const;
 
+  // Compute the contributions at all of the gauss points in the
+  // batch, using flux_matrix_batch() instead of calling
+  // flux_matrix() for each node at each point.  The vector of
+  // SmallSystems contains one SmallSystem per point.  Returns false
+  // without computing anything if flux_matrix_batch() isn't defined,
+  // in which case the caller must call begin_point(), the unbatched
+  // make_flux_contributions(), and end_point() at each point.
+  bool make_flux_contributions(const FEMesh*, const Element*,
+			       const Flux*,
+			       const GaussPointBatch&, double time,
+			       const CNonlinearSolver*,
+			       std::vector<SmallSystem*>&)
+    const;
+
   // Redefining each of the following functions is optional in derived
   // classes, but at least one of them must be redefined.
 
@@ -298,6 +313,20 @@ public:
 			   double time, SmallSystem*)
     const;
 
+  // Batched version of flux_matrix(), computing the contributions of
+  // all nodes at all points in the GaussPointBatch at once.  It
+  // should return false if it's not implemented, which is what the
+  // default version does.  Properties that redefine it must not rely
+  // on begin_point() and end_point(), which aren't called when the
+  // batched version is used.  Subclasses that redefine flux_matrix()
+  // must redefine flux_matrix_batch() too, if a base class has
+  // defined it.
+  virtual bool flux_matrix_batch(const FEMesh*, const Element*,
+				 const Flux*, const GaussPointBatch&,
+				 double time, std::vector<SmallSystem*>&)
+    const
+  { return false; }
+
   // The actual value of the flux at the given element and given point.
   virtual void flux_value(const FEMesh *mesh, const Element *element,
 			  const Flux *flux, const MasterPosition &pt,
@@ -24,6 +24,7 @@ class Element;
 class ElementNodeIterator;
 class FEMesh;
 class Flux;
+class GaussPointBatch;
 class Material;
 class OutputVal;
 class Position;
@@ -46,6 +47,10 @@ public:
 			   const MasterPosition &x,
 			   double time,
 			   SmallSystem *fluxmtx) const;
+  virtual bool flux_matrix_batch(const FEMesh*, const Element*,
+				 const Flux*, const GaussPointBatch&,
+				 double time, std::vector<SmallSystem*>&)
+    const;
   virtual void static_flux_value(const FEMesh*, const Element*,
 				 const Flux*,
 				 const MasterPosition&,
@@ -32,6 +32,12 @@ public:
 			   const MasterPosition &x,
 			   double time,
 			   SmallSystem *fluxmtx) const;
+  // Elasticity's batched flux matrix doesn't apply here.
+  virtual bool flux_matrix_batch(const FEMesh*, const Element*,
+				 const Flux*, const GaussPointBatch&,
+				 double, std::vector<SmallSystem*>&)
+    const
+  { return false; }
   virtual void geometricStrain(const FEMesh*, const Element*, 
 			       const MasterPosition&, SymmMatrix3*) const;
   virtual bool is_symmetric_K(const CSubProblem*) const;
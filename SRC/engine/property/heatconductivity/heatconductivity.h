@@ -23,6 +23,7 @@
 class Element;
 class Material;
 class FEMesh;
+class GaussPointBatch;
 class OrientationPropBase;
 class SmallSystem;
 class ScalarField;
@@ -38,6 +39,10 @@ public:
 			   const MasterPosition&,
 			   double time,
 			   SmallSystem *) const;
+  virtual bool flux_matrix_batch(const FEMesh*, const Element*,
+				 const Flux*, const GaussPointBatch&,
+				 double time, std::vector<SmallSystem*>&)
+    const;
   virtual void static_flux_value(const FEMesh*, const Element*,
 				 const Flux*,
 				 const MasterPosition&,
@@ -24,6 +24,7 @@ class Elasticity;
 class Element;
 class FEMesh;
 class Flux;
+class GaussPointBatch;
 class Material;
 class Position;
 class OrientationPropBase;
@@ -54,6 +55,10 @@ public:
 			   const ElementFuncNodeIterator&,
 			   const Flux*, const MasterPosition&,
 			   double time, SmallSystem*) const;
+  virtual bool flux_matrix_batch(const FEMesh*, const Element*,
+				 const Flux*, const GaussPointBatch&,
+				 double time, std::vector<SmallSystem*>&)
+    const;
   virtual void flux_offset(const FEMesh*, const Element*,
 			   const Flux*, const MasterPosition&,
 			   double time, SmallSystem*) const;
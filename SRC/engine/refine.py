@@ -32,6 +32,9 @@ from ooflib.engine import skeletonmodifier
 from ooflib.engine import skeletonsegment
 from ooflib.engine import skeletonnode
 
+if config.dimension() == 2:
+    from ooflib.SWIG.engine import crefine
+
 import random
 
 SkeletonSegment = skeletonsegment.SkeletonSegment
@@ -40,6 +43,10 @@ arbitrary_factor = 128          # used by findSignature().  Must be
 				# larger than the largest number of
 				# refinements of an edge.
 
+# In 2D, the candidate refinements of this many old elements are
+# evaluated at once.  See DeferredRefinement in refinemethod.py.
+deferredBatchSize = 2000
+
 ################################
 
 # The RefinementDegree classes specify how many times edges are
@@ -109,6 +116,10 @@ class EdgeMarkings:
     # performed on an edge.  Edges are defined by a pair of nodes.
     def __init__(self):
         self.markings = {}
+        # self.partners[key] is (n0, n1, p0, p1), where key is the
+        # canonical order of n0 and n1, and p0 and p1 are their
+        # periodic partners.
+        self.partners = {}
         
     def mark(self, node0, node1, ndivs):
         # arguments are the nodes defining the edge, and the number of
@@ -126,6 +137,9 @@ class EdgeMarkings:
         partners = node0.getPartnerPair(node1)
         if partners is not None:
             partnerKey = skeletonnode.canonical_order(partners[0], partners[1])
+            self.partners[key] = (node0, node1, partners[0], partners[1])
+            self.partners[partnerKey] = (partners[0], partners[1],
+                                         node0, node1)
             try:
                 # Only mark an edge if it's not already marked for more
                 # divisions.
@@ -146,6 +160,17 @@ class EdgeMarkings:
         return [self.getMark(nodes[0], nodes[1]) 
                 for nodes in element.segment_node_iterator()]
 
+    # edgeLists and partnerLists return the markings in the form
+    # used by crefine.CRefinement.
+    def edgeLists(self):
+        keys = self.markings.keys()
+        return ([key[0] for key in keys], [key[1] for key in keys],
+                [self.markings[key] for key in keys])
+
+    def partnerLists(self):
+        partners = self.partners.values()
+        return tuple([p[i] for p in partners] for i in range(4))
+
     def getNMarkedEdges(self, element):
         marks = self.getMarks(element)
         nmarks = 0
@@ -282,13 +307,14 @@ class Refine(skeletonmodifier.SkeletonModifier):
             self.degree.markExtras(skeleton, markedEdges)
 
         # Refine elements and segments
-        segmentdict = {}                # which segments have been handled
-        n = len(skeleton.elements)
         if config.dimension() == 2:
-            elements = skeleton.elements
-        # for 3d, we reorder the elements so that those with
-        # edgemarkings that can lead to deadlocks are treated first.
-        if config.dimension() == 3:
+            if not self.refine2D(skeleton, newSkeleton, markedEdges, prog):
+                return None
+        elif config.dimension() == 3:
+            segmentdict = {}            # which segments have been handled
+            n = len(skeleton.elements)
+            # Reorder the elements so that those with edgemarkings
+            # that can lead to deadlocks are treated first.
             elements = []
             nondeadlockable = []
             for ii in range(n):
@@ -302,65 +328,29 @@ class Refine(skeletonmodifier.SkeletonModifier):
             random.shuffle(elements)
             elements.extend(nondeadlockable)
 
-        for ii in range(n):
-            oldElement = elements[ii]
-            oldnnodes = oldElement.nnodes()
-            # For 2D: Find the canonical order for the marks. (The
-            # order is ambiguous due to the arbitrary choice of the
-            # starting edge.  Finding the canonical order allows the
-            # refinement rule to be found in the rule table.)
-            # rotation (the first member of signature_info) is the
-            # offset into the elements node list required to match the
-            # refinement rule to the element's marked edges.
-            # signature is the canonical ordering of the marks.  For
-            # 3D: The signature info is simply a tuple listing the
-            # marked edges in order.  We can no longer use a canonical
-            # order and rotation since the ordering of the edges is no
-            # longer arbitrary.
-
-            # Get list of number of subdivisions on each edge ("marks")
-            marks = markedEdges.getMarks(oldElement)
-            signature_info = findSignature(marks)
-            # Create new nodes along the subdivided element edges
-            edgenodes = [
-                self.getNewEdgeNodes(nodes[0], nodes[1], 
-                                     marks[i], newSkeleton, skeleton)
-                for nodes, i in zip(oldElement.segment_node_iterator(),
-                                    range(oldElement.getNumberOfEdges()))
-                ]
-
-            # Create new elements
-            if config.dimension() == 2: signature = signature_info[1]
-            elif config.dimension() == 3: signature = signature_info
-            newElements = self.rules[signature].apply(
-                oldElement, signature_info, edgenodes, newSkeleton, self.alpha)
-
-            # If the old element's homogeneity is "1", it's safe to say that
-            # new elements' homogeneities are "1".
-            if oldElement.homogeneity(skeleton.MS, False) == 1.0:
-                for el in newElements:
-                    el.copyHomogeneity(oldElement)
-
-            # The calls to Skeleton.newElement() made by the
-            # refinement rules have created new SkeletonSegments in
-            # newSkeleton, but have not set the parentage of those
-            # segments.  We have to fix that here.
-            for newElement in newElements:
-                for segment in newElement.getSegments(newSkeleton):
-                    # Only look at each segment once.
-                    if segment not in segmentdict:
-                        segmentdict[segment] = 1
-                        pseg = findParentSegment(skeleton, newElement,
-                                                 segment,
-                                                 edgenodes)
-                        if pseg:
-                            pseg.add_child(segment)
-                            segment.add_parent(pseg)
-            if prog.stopped():
-                return None
-            else:
-                prog.setFraction(1.0*(ii+1)/n)
-                prog.setMessage("%d/%d" % (ii+1, n))
+            for ii in range(n):
+                oldElement = elements[ii]
+                # The signature info is simply a tuple listing the
+                # marked edges in order.
+                marks = markedEdges.getMarks(oldElement)
+                signature_info = findSignature(marks)
+                # Create new nodes along the subdivided element edges
+                edgenodes = [
+                    self.getNewEdgeNodes(nodes[0], nodes[1],
+                                         marks[i], newSkeleton, skeleton)
+                    for nodes, i in zip(oldElement.segment_node_iterator(),
+                                        range(oldElement.getNumberOfEdges()))
+                    ]
+                newElements = self.rules[signature_info].apply(
+                    oldElement, signature_info, edgenodes, newSkeleton,
+                    self.alpha)
+                self.adoptNewElements(skeleton, newSkeleton, oldElement,
+                                      newElements, edgenodes, segmentdict)
+                if prog.stopped():
+                    return None
+                else:
+                    prog.setFraction(1.0*(ii+1)/n)
+                    prog.setMessage("%d/%d" % (ii+1, n))
             
         newSkeleton.cleanUp()
 
@@ -372,6 +362,120 @@ class Refine(skeletonmodifier.SkeletonModifier):
 
         return newSkeleton
 
+    def refine2D(self, skeleton, newSkeleton, markedEdges, prog):
+        # In 2D, the parts of the refinement that don't depend on the
+        # rules are done for all elements at once by
+        # crefine.CRefinement.  It finds the signature of each
+        # element, computes the positions of the new nodes on the
+        # marked edges, and, after the new elements have been
+        # created, finds the parents of the new segments.  The rules
+        # are applied here to a DeferredRefinement, and the new
+        # elements aren't actually created until a batch of old
+        # elements has been refined.  See refinemethod.py.  Returns
+        # False if the refinement was interrupted.
+        elements = skeleton.elements
+        n = len(elements)
+        core = crefine.CRefinement(elements, skeleton.nodes)
+        core.markEdges(*markedEdges.edgeLists())
+        core.setPartners(*markedEdges.partnerLists())
+        core.refineEdges(arbitrary_factor)
+        rotations = core.rotations()
+        sigIndices = core.signatureIndices()
+        signatures = [tuple(core.signature(i))
+                      for i in range(core.nsignatures())]
+        xs = core.newNodeX()
+        ys = core.newNodeY()
+        nodeOffsets = core.newNodeOffsets()
+        nodePartners = core.newNodePartners()
+        edgeNodes = core.edgeNodes()
+        edgeOffsets = core.edgeNodeOffsets()
+
+        edgeNodeList = []       # new nodes on old edges, in order
+        newElements = []
+        parentIndices = []      # index of each new element's parent
+        deferred = refinemethod.DeferredRefinement(newSkeleton, self.alpha)
+        pending = []            # (index, oldElement)
+        iedge = 0
+        for ii in range(n):
+            oldElement = elements[ii]
+            for k in range(nodeOffsets[ii], nodeOffsets[ii+1]):
+                node = newSkeleton.newNode(xs[k], ys[k])
+                if nodePartners[k] >= 0:
+                    edgeNodeList[nodePartners[k]].addPartner(node)
+                edgeNodeList.append(node)
+            nedges = oldElement.getNumberOfEdges()
+            edgenodes = [[edgeNodeList[k]
+                          for k in edgeNodes[edgeOffsets[j]:edgeOffsets[j+1]]]
+                         for j in range(iedge, iedge+nedges)]
+            iedge += nedges
+            # rotation is the offset into the element's node list
+            # required to match the refinement rule to the element's
+            # marked edges.  signature is the canonical ordering of
+            # the marks.  See findSignature().
+            signature = signatures[sigIndices[ii]]
+            deferred.startElement()
+            self.rules[signature].apply(
+                oldElement, (rotations[ii], signature), edgenodes, deferred,
+                self.alpha)
+            pending.append((ii, oldElement))
+            if len(pending) == deferredBatchSize or ii == n-1:
+                for (i, oldEl), els in zip(pending, deferred.resolve()):
+                    self.copyHomogeneity(skeleton, oldEl, els)
+                    newElements.extend(els)
+                    parentIndices.extend([i]*len(els))
+                pending = []
+            if prog.stopped():
+                return False
+            prog.setFraction(1.0*(ii+1)/n)
+            prog.setMessage("%d/%d" % (ii+1, n))
+
+        # The calls to Skeleton.newElement() have created new
+        # SkeletonSegments in newSkeleton, but have not set the
+        # parentage of those segments.
+        oldnodes = skeleton.nodes
+        links = core.parentSegments(
+            newElements, parentIndices,
+            newSkeleton.nodes[:len(oldnodes)] + edgeNodeList)
+        for k in range(0, len(links), 4):
+            el = newElements[links[k]]
+            i = links[k+1]
+            segment = newSkeleton.findSegment(el.nodes[i-1], el.nodes[i])
+            pseg = skeleton.findSegment(oldnodes[links[k+2]],
+                                        oldnodes[links[k+3]])
+            pseg.add_child(segment)
+            segment.add_parent(pseg)
+        return True
+
+    def copyHomogeneity(self, skeleton, oldElement, newElements):
+        # If the old element's homogeneity is "1", it's safe to say that
+        # new elements' homogeneities are "1".
+        if oldElement.homogeneity(skeleton.MS, False) == 1.0:
+            for el in newElements:
+                el.copyHomogeneity(oldElement)
+
+    def adoptNewElements(self, skeleton, newSkeleton, oldElement,
+                         newElements, edgenodes, segmentdict):
+        self.copyHomogeneity(skeleton, oldElement, newElements)
+
+        # The calls to Skeleton.newElement() made by the refinement
+        # rules have created new SkeletonSegments in newSkeleton, but
+        # have not set the parentage of those segments.  We have to
+        # fix that here.  findParentSegment only checks whether nodes
+        # are in the edgenodes lists, and not their order, so it
+        # doesn't matter if getNewEdgeNodes has reversed the lists
+        # since the elements were refined.
+        for newElement in newElements:
+            for segment in newElement.getSegments(newSkeleton):
+                # Only look at each segment once.
+                if segment not in segmentdict:
+                    segmentdict[segment] = 1
+                    pseg = findParentSegment(skeleton, newElement,
+                                             segment,
+                                             edgenodes)
+                    if pseg:
+                        pseg.add_child(segment)
+                        segment.add_parent(pseg)
+
     ################
     
     def getNewEdgeNodes(self, node0, node1, ndivs, newSkeleton, oldSkeleton):
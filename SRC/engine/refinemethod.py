@@ -18,6 +18,7 @@ from ooflib.common import enum
 from ooflib.common.IO import xmlmenudump
 
 if config.dimension() == 2:
+    from ooflib.SWIG.engine import crefine
     from ooflib.engine import skeletonelement
     ProvisionalQuad = skeletonelement.ProvisionalQuad
     ProvisionalTriangle = skeletonelement.ProvisionalTriangle
@@ -136,11 +137,24 @@ class ProvisionalRefinement:
     def accept(self, skeleton):
         return [element.accept(skeleton) for element in self.newbies]
 
-def theBetter(skeleton, candidates, alpha):
+# In 2D, the rules are applied to a DeferredRefinement (see below)
+# instead of to the new Skeleton, and the choice between candidates is
+# made later.  In 3D, the choice is made immediately.
+
+if config.dimension() == 2:
+    def theBetter(refinement, candidates, alpha):
+        # alpha is the DeferredRefinement's alpha.
+        return refinement.choose(candidates)
+elif config.dimension() == 3:
+    def theBetter(skeleton, candidates, alpha):
+        return chooseRefinement(skeleton, candidates,
+                                [candi.energy(skeleton, alpha)
+                                 for candi in candidates])
+
+def chooseRefinement(skeleton, candidates, energies):
     energy_min = 100000.                # much larger than any possible energy
     theone = None
-    for candi in candidates:
-        energy = candi.energy(skeleton, alpha)
+    for candi, energy in zip(candidates, energies):
         if energy < energy_min:
             energy_min = energy
             theone = candi
@@ -159,6 +173,81 @@ def theBetter(skeleton, candidates, alpha):
 
 ##########################################
 
+# In 2D, Refine.refine2D() doesn't give the rules the new Skeleton
+# directly.  It gives them a DeferredRefinement, which creates new
+# nodes in the Skeleton immediately, but only records the calls to
+# newElement() and theBetter().  When resolve() is called, the
+# energies of all of the recorded candidate refinements are computed
+# at once in C++, and then the new elements are created in the order
+# in which they would have been created if they hadn't been deferred.
+# This works because the 2D rules don't look at the new elements or
+# segments after creating them.  newNode() and newElement() are the
+# only Skeleton methods that the 2D rules use, so they're the only
+# ones that DeferredRefinement provides, along with choose(), which
+# is called by theBetter().  A rule that needs anything else will
+# fail immediately instead of bypassing the deferral.
+
+if config.dimension() == 2:
+    class _DeferredElement:
+        def __init__(self, nodes, parents):
+            self.nodes = nodes
+            self.parents = parents
+        def create(self, skeleton):
+            return [skeleton.newElement(nodes=self.nodes,
+                                        parents=self.parents)]
+
+    class _DeferredChoice:
+        def __init__(self, candidates):
+            self.candidates = candidates
+            self.energies = None
+        def create(self, skeleton):
+            return chooseRefinement(skeleton, self.candidates, self.energies)
+
+    class DeferredRefinement:
+        def __init__(self, skeleton, alpha):
+            self.skeleton = skeleton
+            self.alpha = alpha
+            self.pending = []   # list of lists of deferred actions
+        def newNode(self, x, y):
+            return self.skeleton.newNode(x, y)
+        def startElement(self):
+            # Called before applying a rule to each old element.
+            self.pending.append([])
+        def newElement(self, nodes, parents=[]):
+            self.pending[-1].append(_DeferredElement(nodes, parents))
+        def choose(self, candidates):
+            self.pending[-1].append(_DeferredChoice(candidates))
+        def resolve(self):
+            # Returns a list containing a list of new elements for
+            # each old element refined since the last call to
+            # resolve().
+            choices = [action for actions in self.pending
+                       for action in actions
+                       if isinstance(action, _DeferredChoice)]
+            candidates = [candi for choice in choices
+                          for candi in choice.candidates]
+            if candidates:
+                energies = crefine.candidateEnergies(
+                    self.skeleton.MS,
+                    [el for candi in candidates for el in candi.newbies],
+                    [len(candi.newbies) for candi in candidates],
+                    self.alpha)
+                i = 0
+                for choice in choices:
+                    n = len(choice.candidates)
+                    choice.energies = energies[i:i+n]
+                    i += n
+            newElements = []
+            for actions in self.pending:
+                els = []
+                for action in actions:
+                    els.extend(action.create(self.skeleton))
+                newElements.append(els)
+            self.pending = []
+            return newElements
+
+##########################################
+
 # A missing function in the liberal rule set will be found in
 # conservative ruleset. 
 conservativeRuleSet = RefinementRuleSet(
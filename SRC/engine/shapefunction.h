@@ -94,6 +94,16 @@ public:
 protected:
   void precompute(const MasterElement&);
 private:
+  // Return the ShapeFunctionCache for the current thread and the
+  // given gauss point, filling it from the Element's
+  // ShapeFunctionStore if possible.
+  ShapeFunctionCache *getCache(const Element*, const GaussPoint&) const;
+  // Compute the determinant of the jacobian and the real derivatives
+  // of all shape functions at all gauss points in a set.  Returns
+  // false if it can't.
+  bool computeAll(const Element*, int order, std::vector<double>&,
+		  std::vector<double>&) const;
+  double compute_det_jacobian(const Element*, const GaussPoint&) const;
   // precomputed values for different integration orders
   std::vector<ShapeFunctionTable*> sftable;
   // cached Element-dependent values
@@ -24,6 +24,7 @@
 
 class Element;
 class GaussPoint;
+#include "common/timestamp.h"
 #include "engine/indextypes.h"
 
 #include <vector>
@@ -53,9 +54,14 @@ private:
   std::vector<std::vector<std::vector<SFCValue> > > *df; // derivs at gauss pts
   void reset(const Element*);
   bool current(const Element*) const;
+  // Copy values for all gauss points from a ShapeFunctionStore.
+  void load(const Element*, const std::vector<double>&,
+	    const std::vector<double>&);
   const Element *cached_element; // element for which this was last computed
+  TimeStamp computed;		// when cached_element was set
 
   friend class ShapeFunction;
+  friend class ShapeFunctionStore;
 };
 
 #endif
@@ -0,0 +1,114 @@
+// -*- C++ -*-
+
+/* This software was produced by NIST, an agency of the U.S. government,
+ * and by statute is not subject to copyright in the United States.
+ * Recipients of this software assume all responsibilities associated
+ * with its operation, modification and maintenance. However, to
+ * facilitate maintenance we ask that before distributing modified
+ * versions of this software, you first contact the authors at
+ * oof_manager@nist.gov.
+ */
+
+// A mesh-wide store for the Element-dependent shape function data,
+// the determinant of the jacobian and the real space derivatives of
+// the shape functions at the gauss points.  ShapeFunctionCache only
+// holds the values for one Element at a time, so every pass over a
+// Mesh (matrix construction, flux recovery, output evaluation)
+// recomputes them.  The ShapeFunctionStore keeps them for all
+// Elements, subject to a memory budget.
+//
+// The store is consulted by ShapeFunction when its
+// ShapeFunctionCache is about to be reset for a new Element.  The
+// values for all gauss points of the Element are then computed at
+// once (if they're not already in the store) and copied into the
+// cache.  So the store is used once per Element visit, not once per
+// shape function evaluation.
+//
+// Elements are grouped into blocks of consecutive Element indices.
+// When the memory budget is exceeded, the least recently used
+// blocks are discarded.  Blocks computed before the Mesh's
+// geometry TimeStamp (see FEMesh::move_node()) are out of date
+// and are recomputed.
+//
+// The store is disabled if the budget is zero, which is the default.
+
+#ifndef SHAPEFUNCTIONSTORE_H
+#define SHAPEFUNCTIONSTORE_H
+
+#include <oofconfig.h>
+#include "common/timestamp.h"
+#include <list>
+#include <map>
+#include <vector>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+class Element;
+class ShapeFunction;
+class ShapeFunctionCache;
+
+// Memory budget for each Mesh's ShapeFunctionStore, in megabytes.
+extern double shapefunction_store_budget;
+
+class ShapeFunctionStore {
+private:
+  struct Entry {
+    const Element *element;
+    const ShapeFunction *sf;
+    int order;
+    std::vector<double> detjac;	// detjac[g]
+    std::vector<double> dsf;	// dsf[(g*nsf + n)*DIM + i]
+  };
+  // Each Element may have entries for more than one ShapeFunction or
+  // set of gauss points.
+  typedef std::vector<Entry> EntryList;
+  struct Block {
+    std::vector<EntryList> entries; // indexed by position in block
+    std::size_t bytes;
+    TimeStamp computed;
+    std::list<int>::iterator lru;
+  };
+  typedef std::map<int, Block> BlockMap;
+  BlockMap blocks;
+  std::list<int> lru;		// block ids, most recently used first
+  std::size_t bytes_;
+  const int blocksize;
+  const TimeStamp &geometry;	// when the Mesh's nodes last moved
+  int hits_, misses_, evictions_;
+#ifdef _OPENMP
+  omp_lock_t lock;
+#endif
+  void acquire();
+  void release();
+  Block *getBlock(int, bool);
+  void discard(BlockMap::iterator);
+  void evict(int);
+  ShapeFunctionStore(const ShapeFunctionStore&); // prohibited
+public:
+  ShapeFunctionStore(const TimeStamp &geometry, int blocksize=256);
+  ~ShapeFunctionStore();
+
+  static bool enabled() { return shapefunction_store_budget > 0; }
+
+  // Copy the stored values for the given Element, ShapeFunction, and
+  // gauss point set into the ShapeFunctionCache.  Returns false if
+  // they're not in the store.
+  bool fetch(const Element*, const ShapeFunction*, int order,
+	     ShapeFunctionCache&);
+  // Add values to the store.  The vectors are swapped into the store,
+  // so their contents are lost.
+  void store(const Element*, const ShapeFunction*, int order,
+	     std::vector<double> &detjac, std::vector<double> &dsf);
+
+  void clear();
+  const TimeStamp &geometryChanged() const { return geometry; }
+  std::size_t bytes() const { return bytes_; }
+  int nblocks() const { return blocks.size(); }
+  int hits() const { return hits_; }
+  int misses() const { return misses_; }
+  int evictions() const { return evictions_; }
+};
+
+#endif // SHAPEFUNCTIONSTORE_H
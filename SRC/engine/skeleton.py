@@ -36,6 +36,7 @@ from ooflib.engine import skeletoncontext
 from ooflib.engine import skeletondiff
 from ooflib.engine import skeletonelement
 from ooflib.engine import skeletongroups
+from ooflib.engine import skeletonindex
 from ooflib.engine import skeletonnode
 from ooflib.engine import skeletonsegment
 from ooflib.engine import skeletonselectable
@@ -690,6 +691,22 @@ class SkeletonBase:
         if point.y > self.MS.size()[1]:
             point[1] = self.MS.size()[1]
 
+        # The last element found is often still the right one.
+        if el is not None and not el.illegal() and el.interior(point):
+            return el
+
+        # Otherwise, look in the spatial index.  If the index has
+        # the answer, there's no need to walk.  If it doesn't, it can
+        # at least provide a starting point near the target.
+        index = self.elementIndex()
+        found = index.enclosingElement(point)
+        if found is not None:
+            self._found_element = weakref.ref(found)
+            return found
+        nearby = index.nearbyElement(point)
+        if nearby is not None:
+            el = nearby
+
         # If we don't have a good starting point, we look for one.
         if el is None or el.illegal():
             for ell in self.elements:
@@ -712,7 +729,43 @@ class SkeletonBase:
         self._found_element = weakref.ref(last_el)
         return last_el
 
-        
+    def enclosingElements(self, points):
+        # Find the elements containing each of the given points.  The
+        # spatial index is fetched only once, and the last element
+        # found in each of its tiles is tried first for the other
+        # points in the tile, so most points need only one interior()
+        # test.  Points that the index can't place are passed to
+        # enclosingElement, which walks to them.
+        index = self.elementIndex()
+        xmax, ymax = self.MS.size()
+        lasthit = {}                    # tile index -> element
+        result = []
+        for point in points:
+            # Move points outside of the skeleton to its edge, as
+            # enclosingElement does.
+            if point.x < 0.0:
+                point[0] = 0.0
+            if point.x > xmax:
+                point[0] = xmax
+            if point.y < 0.0:
+                point[1] = 0.0
+            if point.y > ymax:
+                point[1] = ymax
+            tile = index.tile(point)
+            el = lasthit.get(tile)
+            if el is None or not el.interior(point):
+                el = index.enclosingElement(point)
+                if el is None:
+                    el = self.enclosingElement(point)
+                # As in enclosingElement, don't start from illegal
+                # elements, whose interiors aren't well defined.
+                if not el.illegal():
+                    lasthit[tile] = el
+            result.append(el)
+        if result:
+            self._found_element = weakref.ref(result[-1])
+        return result
+
 
     def nearestSgmt(self, point):
         # Local function to compute the distance between a point pt
@@ -760,10 +813,11 @@ class SkeletonBase:
                     mindist = d
                     nearseg = seg
         else:
-            # Not inside any element.  Search all boundary segments.
+            # Not inside any element.  Search the nearby boundary
+            # segments.
             mindist = None
             nearseg = None
-            for seg in self.segments.values():
+            for seg in self.elementIndex().boundarySegments(point):
                 if seg.nElements() == 1: # it's a boundary segment
                     d = distance(point, seg)
                     if mindist is None or d < mindist:
@@ -832,9 +886,14 @@ class Skeleton(SkeletonBase):
         self.washMe = 0
         
         self.hashedNodes = None
+        self._elementIndex = None       # see elementIndex()
+        self.nodesMoved = timestamp.TimeStamp()
 
         self.deputy = None              # currently active DeputySkeleton
         self.deputylist = []            # all deputies
+        # Positions in this Skeleton of nodes that have been moved by
+        # any deputy.  See deputy.py.
+        self.originalPositions = {}
         self._deferreddestruction = 0
         self._destroyed = 0
 
@@ -919,7 +978,9 @@ class Skeleton(SkeletonBase):
                 el.destroy(self)
             self.elements = []
             self.nodes = []
+            self.originalPositions = {}
             self.hashedNodes = None
+            self._elementIndex = None
             
             for ebdy in skelcontext.edgeboundaries.values():
                 ebdy.remove(self)
@@ -972,6 +1033,19 @@ class Skeleton(SkeletonBase):
 
     def needsHash(self):
         self.hashedNodes = None
+        self._elementIndex = None
+
+    def elementIndex(self):
+        # Return the spatial index used by enclosingElement and
+        # nearestSgmt, rebuilding it if the Skeleton has changed.
+        # Moving a node only updates nodesMoved, so that trial moves
+        # that are undone don't rebuild the index unless it's used.
+        self.cleanUp()
+        if (self._elementIndex is None or
+            self._elementIndex.timestamp < self.timestamp or
+            self._elementIndex.timestamp < self.nodesMoved):
+            self._elementIndex = skeletonindex.ElementIndex(self)
+        return self._elementIndex
 
     def nnodes(self):
         self.cleanUp()
@@ -1057,6 +1131,7 @@ class Skeleton(SkeletonBase):
             raise ooferror.ErrPyProgrammingError(
                 "Unable to construct %d-noded element." % nnodes)
         self.elements.append(el)
+        self._elementIndex = None
         for parent in parents:
             el.add_parent(parent)
             parent.add_child(el)
@@ -1091,6 +1166,7 @@ class Skeleton(SkeletonBase):
 
     def removeElements(self, *elements):
         self.washMe = 1
+        self._elementIndex = None
         for el in elements:
             el.defunct = 1
             el.destroy(self)
@@ -1395,8 +1471,8 @@ class Skeleton(SkeletonBase):
         return self
 
     def deputize(self, deputy):         # install a new deputy
-        if self.deputy:
-            self.deputy.deactivate()
+        from ooflib.engine import deputy as deputymodule
+        deputymodule.switchPositions(self, self.deputy, deputy)
         self.deputy = deputy
 
     def addDeputy(self, dep):
@@ -1414,33 +1490,40 @@ class Skeleton(SkeletonBase):
 
     def activate(self):
         if self.deputy:
-            self.deputy.deactivate()
+            from ooflib.engine import deputy as deputymodule
+            deputymodule.switchPositions(self, self.deputy, None)
             self.deputy = None
 
     def moveNodeTo(self, node, position):
         node.moveTo(position)
         for partner in node.getPartners():
             partner.moveTo(position)
+        self.nodesMoved.increment()
 
     def moveNodeBy(self, node, delta):
         node.moveBy(delta)
         for partner in node.getPartners():
             partner.moveBy(delta)
+        self.nodesMoved.increment()
 
     def moveNodeBack(self, node):
         node.moveBack()
         for partner in node.getPartners():
             partner.moveBack()
+        self.nodesMoved.increment()
         
-    def getMovedNodes(self):
-        return {}
+    def saveOriginalPosition(self, node):
+        # Called by a deputy before it moves a node.
+        if node not in self.originalPositions:
+            self.originalPositions[node] = node.position()
 
     def nodePosition(self, node):
         # Gets the position of the node in this skeleton even if a
         # deputy is active.
-        if self.deputy:
-            return self.deputy.originalPosition(node)
-        return node.position()
+        try:
+            return self.originalPositions[node]
+        except KeyError:
+            return node.position()
             
     def newSelectionTracker(self, selectionset):
         return skeletonselectable.SelectionTracker()
@@ -1985,69 +2068,127 @@ class Skeleton(SkeletonBase):
             nmapnodes += nels[n]*masterelem.ninteriormapnodes_only()
         realmesh.reserveMapNodes(nmapnodes)
 
-        # Make the real nodes at the corners of the elements.  These
-        # nodes are always both mapping and function nodes.
-        mnodecount = self.nnodes()
-        for i in xrange(mnodecount):
+        # The real nodes and elements are all created by one call to
+        # FEMesh.buildElements().  Here we just compute the arrays
+        # that describe them.  See the comments in femesh.h.
+
+        # Find the positions of the real nodes at the corners of the
+        # elements.  These nodes are always both mapping and function
+        # nodes.  The values in fe_node and fe_splitnode are indices
+        # into cornerpts.
+        cornerpts = []
+        nskelnodes = self.nnodes()
+        for i in xrange(nskelnodes):
             cur = self.nodes[i]
             if split_interface:
                 splitcount=self.countInterfaceZonesAtNode(cur,
                                                           interface_seg_dict)
-                if splitcount>0:
-                    fe_splitnode[cur]=[None]*splitcount
-                    for j in range(splitcount):
-                        realnode = realmesh.newFuncNode(
-                            coord.Coord(cur.position().x, cur.position().y))
-                        fe_splitnode[cur][j]=realnode
-                else:
-                    #Do the usual
-                    realnode = realmesh.newFuncNode(
-                        coord.Coord(cur.position().x, cur.position().y)) 
-                    fe_node[cur] = realnode
             else:
-                realnode = realmesh.newFuncNode(
-                    coord.Coord(cur.position().x, cur.position().y)) 
-                fe_node[cur] = realnode
+                splitcount = 0
+            if splitcount > 0:
+                fe_splitnode[cur] = range(len(cornerpts),
+                                          len(cornerpts)+splitcount)
+                cornerpts.extend([cur.position()]*splitcount)
+            else:
+                fe_node[cur] = len(cornerpts)
+                cornerpts.append(cur.position())
 
             if prog.stopped():
                 prog.setMessage("Interrupted")
                 return
             else:
-                prog.setFraction(1.0*(i+1)/mnodecount)
-                prog.setMessage("Allocated %d/%d nodes"%(i+1, mnodecount))
+                prog.setFraction(1.0*(i+1)/nskelnodes)
+                prog.setMessage("Examined %d/%d nodes"%(i+1, nskelnodes))
 
-        # Loop over elements.
+        # Loop over elements.  Index correspondence happens here --
+        # the skeleton elements are assigned indices in the order
+        # that their corresponding real elements are created.
         numelements = self.nelements()
-        realmesh.reserveElements(numelements)
+        corners = []                    # corner node indices
+        edges = []                      # ids of edges that share nodes
+        edgeids = {}                    # edge id, keyed by node pair
+        materials = []
+        matindex = []                   # index into materials
+        matids = {}                     # index into materials, keyed by id
+        exterior = []                   # (element, edge) pairs
         for mesh_idx in xrange(numelements):
             el = self.elements[mesh_idx]
-            local_fe_node={}
-            if split_interface:
-                for nd in el.nodes:
+            if el.meshindex is None: # Zero is nontrivial index.
+                el.meshindex = mesh_idx
+            elif el.meshindex != mesh_idx:
+                raise ooferror.ErrPyProgrammingError(
+                    "Index mismatch in element construction.")
+            ncn = len(el.nodes)
+            for i in range(ncn):
+                nd = el.nodes[i]
+                if split_interface:
                     zonenumber=self.getInterfaceZoneNumberAtElem(
                         nd, el, interface_seg_dict)
-                    if zonenumber==-1:
-                        local_fe_node[nd]=fe_node[nd]
-                    else:
-                        local_fe_node[nd]=fe_splitnode[nd][zonenumber]
-            else:               # not splitting nodes at interfaces
-                for nd in el.nodes:
-                    local_fe_node[nd]=fe_node[nd]
-            # Index correspondence happens here -- the skeleton
-            # elements are assigned indices in the order that their
-            # corresponding real elements are created/assigned.
-            # (SkeletonElement.realelement sets self.meshindex when it
-            # creates the real element.)
-            mnodecount += el.realelement(skelctxt, realmesh, mesh_idx,
-                                         local_fe_node, interface_seg_dict,
-                                         edict, set_materials)
+                else:
+                    zonenumber = -1
+                if zonenumber==-1:
+                    corners.append(fe_node[nd])
+                else:
+                    corners.append(fe_splitnode[nd][zonenumber])
+                # Nodes on a segment that's part of an interface
+                # aren't shared with the element on the other side.
+                cset = skeletonnode.canonical_order(nd, el.nodes[(i+1)%ncn])
+                if cset in interface_seg_dict:
+                    edges.append(-1)
+                else:
+                    edges.append(edgeids.setdefault(cset, len(edgeids)))
+            # set_materials returns the element's material.  In normal
+            # operation, set_materials is SkeletonElement.realmaterial.
+            matl = set_materials(el, skelctxt)
+            if matl is None:
+                matindex.append(-1)
+            else:
+                try:
+                    matindex.append(matids[id(matl)])
+                except KeyError:
+                    matids[id(matl)] = len(materials)
+                    matindex.append(len(materials))
+                    materials.append(matl)
+            # Tell the element about its exterior edges.
+            for n0, n1 in el.exterior_edges:
+                i0 = el.nodes.index(n0)
+                i1 = el.nodes.index(n1)
+                if (i0+1)%ncn == i1:
+                    exterior.extend((mesh_idx, i0))
+                else:
+                    exterior.extend((mesh_idx, i1))
             if prog.stopped():
                 prog.setMessage("Interrupted")
                 return
             prog.setFraction(1.0*(mesh_idx+1)/numelements)
-            prog.setMessage("Allocated %d/%d elements"
+            prog.setMessage("Examined %d/%d elements"
                             % (mesh_idx+1, numelements))
 
+        if not realmesh.buildElements(cornerpts, self.elements,
+                                      edict.values(), corners, edges,
+                                      materials, matindex, exterior):
+            prog.setMessage("Interrupted")
+            return
+
+        # Record the nodes that buildElements created on the shared
+        # edges, keyed by the edges' skeleton nodes, and in the
+        # element interiors, keyed by skeleton element.  SCPatch uses
+        # the interior nodes.
+        edgenodes = realmesh.builtEdgeNodes()
+        if edgenodes:
+            offsets = realmesh.builtEdgeNodeOffsets()
+            for cset, edgeid in edgeids.iteritems():
+                realmesh.addEdgeNodes(
+                    cset, edgenodes[offsets[edgeid]:offsets[edgeid+1]])
+        internalnodes = realmesh.builtInteriorNodes()
+        if internalnodes:
+            offsets = realmesh.builtInteriorNodeOffsets()
+            for el in self.elements:
+                nodes = internalnodes[offsets[el.meshindex]:
+                                      offsets[el.meshindex+1]]
+                if nodes:
+                    realmesh.internal_nodes[el] = nodes
+
         # Then do boundaries.
         # Note that edgeboundaries and pointboundaries are in separate lists
         # in the skeleton, but in a single list in the real mesh.
@@ -2742,7 +2883,7 @@ class Skeleton(SkeletonBase):
             # Index correspondence happens here -- the skeleton
             # elements are assigned indices in the order that their
             # corresponding real elements are created/assigned.
-            # (SkeletonElement.realelement sets self.meshindex when it
+            # (SkeletonElement.realelement_shares sets self.meshindex when it
             # creates the real element.)
             mnodecount += el.realelement_shares(
                 self, realmesh, mesh_idx, fe_node, mnodecount,
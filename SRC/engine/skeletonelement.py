@@ -353,104 +353,6 @@ class SkeletonElement(SkeletonElementBase,
 
     #########################
 
-    #Interface branch
-    def realelement(self, skeletoncontext, mesh, index,
-                    fe_node, seg_dict,
-                    elemdict, materialfunc):
-        # Create a real element corresponding to this skeleton
-        # element. The elemdict argument is a dictionary (keyed by the
-        # number of sides of the element) of MasterElement objects,
-        # which contain the information needed to construct the real
-        # elements.  "index" is the SkeletonElement's position in the
-        # Skeleton's list, and "fe_node" is a dictionary of real nodes
-        # in the FEMesh, indexed by their corresponding SkeletonNode
-        # objects.  The lists give the nodes in the order in which
-        # they were added to the element.
-        
-        # Be safe with indices.
-        if self.meshindex is None: # Zero is nontrivial index.
-            self.meshindex = index
-        else:
-            if index != self.meshindex:
-                raise ooferror2.ErrPyProgrammingError(
-                    "Index mismatch in element construction.")
-                
-        nnewnodes = 0
-        ncn = len(self.nodes) # Corner nodes.
-
-        # elemdict is a dictionary of MasterElements, keyed by number
-        # of sides.
-        elementtype = elemdict[self.nnodes()]
-        nodes = []                      # real nodes for this element
-
-        for i in range(len(self.nodes)):  # i.e. for each edge...
-            c0 = self.nodes[i]
-            nodes.append(fe_node[c0])     # Corner nodes already exist.
-            c1 = self.nodes[(i+1)%ncn]
-            cset = skeletonnode.canonical_order(c0, c1)
-
-
-            # Look up this edge in the dictionary.  If it's there,
-            # then nodes have been created on the edge already, and we
-            # should reuse them.
-
-            try:
-                xtranodes = mesh.getEdgeNodes(cset)
-                # The nodes were created by the neighboring element.
-                # Since elements traverse their edges counterclockwise
-                # when creating nodes, the preexisting nodes are in
-                # the wrong order for the current element.
-                xtranodes.reverse()
-            except KeyError:
-                # The edge wasn't in the dictionary.  It's a new edge.
-                xtranodes  = []
-                # Loop over all protonodes on the current
-                # edge of the new element
-                for newproto in elementtype.protodic[i]:
-                    masterxy = primitives.Point(newproto.mastercoord()[0],
-                                           newproto.mastercoord()[1])
-                    realxy = self.frommaster(masterxy, 0)
-                    newnode = _makenewnode(mesh, newproto,
-                                           coord.Coord(realxy.x, realxy.y))
-                    nnewnodes = nnewnodes + 1
-                    xtranodes.append(newnode)
-                #Interface branch
-                try:
-                    #If the segment represented by cset is a member of an
-                    #interface, then new edge nodes (xtranodes) will
-                    #not be shared by another element.
-                    test=seg_dict[cset]
-                except KeyError:
-                    mesh.addEdgeNodes(cset, xtranodes)
-            nodes = nodes + xtranodes
-
-        # Interior nodes at the end.
-        for newproto in elementtype.protodic['interior']:
-            masterxy = primitives.Point(newproto.mastercoord()[0],
-                                        newproto.mastercoord()[1])
-            realxy = self.frommaster(masterxy, 0)
-            newnode = _makenewnode(mesh, newproto,
-                                   coord.Coord(realxy.x, realxy.y))
-            nnewnodes = nnewnodes + 1
-            nodes.append(newnode)
-            mesh.addInternalNodes(self, newnode)
-
-        # Having constructed the list of nodes, call the real
-        # element's constructor.  materialfunc returns the element's
-        # material.  In normal operation, materialfunc is
-        # SkeletonElement.realmaterial.
-        realel = elementtype.build(self, materialfunc(self, skeletoncontext),
-                                   nodes)
-        
-        mesh.addElement(realel)               # Add to mesh.
-        # Tell the element about its exterior edges.
-        for edge in self.exterior_edges:
-            realel.set_exterior(fe_node[edge[0]], fe_node[edge[1]])
-
-        return nnewnodes
-
-    #########################
-
     # For parallel mesh construction. Non-corner nodes are given
     # sharing information based on the corner nodes that bound the
     # segment where the non-corner nodes are found.  Called in
@@ -0,0 +1,135 @@
+# -*- python -*-
+
+# This software was produced by NIST, an agency of the U.S. government,
+# and by statute is not subject to copyright in the United States.
+# Recipients of this software assume all responsibilities associated
+# with its operation, modification and maintenance. However, to
+# facilitate maintenance we ask that before distributing modified
+# versions of this software, you first contact the authors at
+# oof_manager@nist.gov.
+
+# A uniform grid of tiles covering a Skeleton, used to find the
+# elements near a point without walking across the Skeleton.  Each
+# element is stored in every tile that its bounding box overlaps.
+# Boundary segments are stored in the same way, but only when they're
+# first needed.
+
+# The index is built by Skeleton.elementIndex(), and is discarded by
+# Skeleton.needsHash() or when elements are added or removed.  It's
+# also rebuilt if the Skeleton's timestamp or nodesMoved timestamp is
+# newer than the index's.  Since element containment is always checked
+# with the current node positions, a stale index can only make a
+# search slower, not wrong.
+
+from ooflib.SWIG.common import timestamp
+import math
+
+class ElementIndex:
+    def __init__(self, skeleton, elementsPerTile=2):
+        self.timestamp = timestamp.TimeStamp()
+        self.skelsize = skeleton.size()
+        nel = max(len(skeleton.elements), 1)
+        ntiles = max(nel/elementsPerTile, 1)
+        ratio = (1.0*self.skelsize[0])/self.skelsize[1]
+        nx = max(int(math.sqrt(ntiles*ratio)), 1)
+        ny = max(int(ntiles/nx), 1)
+        self.size = (nx, ny)
+        self.scale = (1.0*nx/self.skelsize[0], 1.0*ny/self.skelsize[1])
+        self.elements = [[] for i in xrange(nx*ny)]
+        self.segments = None
+        for el in skeleton.elements:
+            if not hasattr(el, 'defunct'):
+                self._insert(self.elements, el, el.nodes)
+        self.skeleton = skeleton
+
+    def _tileRange(self, nodes):
+        xs = []
+        ys = []
+        for node in nodes:
+            pos = node.position()
+            xs.append(pos.x)
+            ys.append(pos.y)
+        ix0, iy0 = self._clamp(min(xs), min(ys))
+        ix1, iy1 = self._clamp(max(xs), max(ys))
+        return (ix0, ix1, iy0, iy1)
+
+    def _clamp(self, x, y):
+        ix = min(max(int(x*self.scale[0]), 0), self.size[0]-1)
+        iy = min(max(int(y*self.scale[1]), 0), self.size[1]-1)
+        return ix, iy
+
+    def _insert(self, tiles, obj, nodes):
+        ix0, ix1, iy0, iy1 = self._tileRange(nodes)
+        nx = self.size[0]
+        for iy in range(iy0, iy1+1):
+            for ix in range(ix0, ix1+1):
+                tiles[nx*iy + ix].append(obj)
+
+    def tile(self, point):
+        # Return the index of the tile containing the point.
+        ix, iy = self._clamp(point.x, point.y)
+        return self.size[0]*iy + ix
+
+    def enclosingElement(self, point):
+        # Return the element containing the point, or None if none of
+        # the elements in the point's tile contain it.
+        for el in self.elements[self.tile(point)]:
+            if not hasattr(el, 'defunct') and el.interior(point):
+                return el
+
+    def nearbyElement(self, point):
+        # Return a legal element in the point's tile, or in the
+        # nearest band of tiles around it that contains one.  This is
+        # a good starting point for Skeleton.enclosingElement's walk.
+        ix, iy = self._clamp(point.x, point.y)
+        for band in range(max(self.size)):
+            for el in self._band(self.elements, ix, iy, band):
+                if not hasattr(el, 'defunct') and not el.illegal():
+                    return el
+
+    def boundarySegments(self, point):
+        # Return the boundary segments (segments with only one
+        # element) in the first band of tiles around the point that
+        # contains any, and in the band after that.  As in
+        # HashedNodes.nearestNode, the closest segment is assumed to
+        # be among them.
+        if self.segments is None:
+            self.segments = [[] for i in xrange(len(self.elements))]
+            for seg in self.skeleton.segments.values():
+                if seg.nElements() == 1:
+                    self._insert(self.segments, seg, seg.nodes())
+        ix, iy = self._clamp(point.x, point.y)
+        result = []
+        found = 0
+        for band in range(max(self.size)):
+            segs = self._band(self.segments, ix, iy, band)
+            if segs:
+                result.extend(segs)
+                found += 1
+            elif found:
+                found += 1
+            if found == 2:
+                break
+        return result
+
+    def _band(self, tiles, ix, iy, band):
+        # Return the contents of the tiles that are exactly 'band'
+        # tiles away from tile (ix, iy).
+        nx, ny = self.size
+        if band == 0:
+            return tiles[nx*iy + ix]
+        result = []
+        x0 = ix - band
+        x1 = ix + band
+        y0 = iy - band
+        y1 = iy + band
+        for j in range(max(y0, 0), min(y1, ny-1)+1):
+            if j == y0 or j == y1:
+                for i in range(max(x0, 0), min(x1, nx-1)+1):
+                    result.extend(tiles[nx*j + i])
+            else:
+                if x0 >= 0:
+                    result.extend(tiles[nx*j + x0])
+                if x1 < nx:
+                    result.extend(tiles[nx*j + x1])
+        return result
@@ -207,6 +207,22 @@ class SkelModCriterion(registeredclass.RegisteredClass):
         pass    
     def hopeless(self):
         return 0
+
+    # chooseNodeMove and nodeMoveLimits are used by the FiddleNodes
+    # modifiers (fiddlenodesbase.py), which evaluate node moves in C++
+    # instead of creating DeputyProvisionalChanges.  moves is a list
+    # of (illegal, deltaE, withinLimits) tuples, one for each possible
+    # new position of a single node.  chooseNodeMove must return the
+    # index of the move that __call__ would choose from the equivalent
+    # changes, or None.
+    def chooseNodeMove(self, moves):
+        raise ooferror.ErrPyProgrammingError(
+            "%s can't be used to move nodes" % self.__class__.__name__)
+    def nodeMoveLimits(self):
+        # The minimum homogeneity and maximum shape energy that
+        # determine withinLimits, or negative numbers if there are
+        # no limits.
+        return (-1.0, -1.0)
     
     tip = "Acceptance criteria for skeleton modifications."
     discussion = xmlmenudump.loadFile(
@@ -268,6 +284,9 @@ class LimitedSkelModCriterion(SkelModCriterion):
     
     def hopeless(self):
         return self._hopeless
+
+    def nodeMoveLimits(self):
+        return (self.homogeneity, self.shape_energy)
     
 
 class AverageEnergy(SkelModCriterion):
@@ -289,6 +308,14 @@ class AverageEnergy(SkelModCriterion):
             if change is not None and change is not bestchange:
                 change.removeAddedNodes(skel)
         return bestchange
+    def chooseNodeMove(self, moves):
+        bestE = 0.0
+        best = None
+        for i, (illegal, diff, withinLimits) in enumerate(moves):
+            if not illegal and diff <= bestE:
+                best = i
+                bestE = diff
+        return best
 
 registeredclass.Registration(
     'Average Energy',
@@ -362,6 +389,14 @@ class Unconditional(SkelModCriterion):
             if change is not None:
                 change.removeAddedNodes(skel)
         return bestchange
+    def chooseNodeMove(self, moves):
+        bestE = None
+        best = None
+        for i, (illegal, diff, withinLimits) in enumerate(moves):
+            if not illegal and (best is None or diff <= bestE):
+                best = i
+                bestE = diff
+        return best
 
 registeredclass.Registration(
     'Unconditional', SkelModCriterion,
@@ -391,6 +426,17 @@ class LimitedAverageEnergy(LimitedSkelModCriterion):
             if change is not bestchange:
                 change.removeAddedNodes(skel)
         return bestchange
+    def chooseNodeMove(self, moves):
+        bestE = 0.0
+        best = None
+        for i, (illegal, diff, withinLimits) in enumerate(moves):
+            if not illegal:
+                if not withinLimits:
+                    self._hopeless = 1
+                elif diff <= bestE:
+                    best = i
+                    bestE = diff
+        return best
 
 registeredclass.Registration(
     'Limited Average Energy',
@@ -437,6 +483,17 @@ class LimitedUnconditional(LimitedSkelModCriterion):
             if change is not bestchange:
                 change.removeAddedNodes(skel)
         return bestchange
+    def chooseNodeMove(self, moves):
+        bestE = None
+        best = None
+        for i, (illegal, diff, withinLimits) in enumerate(moves):
+            if not illegal:
+                if not withinLimits:
+                    self._hopeless = 1
+                elif best is None or diff <= bestE:
+                    best = i
+                    bestE = diff
+        return best
     
 registeredclass.Registration(
     'Limited Unconditional', SkelModCriterion,
@@ -225,40 +225,48 @@ class SnapNodes(skeletonmodifier.SkeletonModifier):
         # self.targets.cleanSelection() gets called if something goes
         # wrong.
         try:
-            stored_tps = {}  # keyed by node pair
+            # Find the elements to examine, and the segments whose
+            # transition points they need.  Common segments are
+            # looked at only once, in the direction in which they're
+            # first encountered.
+            segindex = {}          # segment number, keyed by node pair
+            endpoints = []         # two points per segment
+            candidates = []        # (element, list of segment numbers)
             nel = len(elements)
             for i, element in enumerate(elements):
                 if element.homogeneity(skel.MS, False) == 1.0:
                     continue  # no need to even look at it!
                 if element.active(oldskeleton):
-                    #nnodes = element.nnodes()
-                    # Common segments will be looked at only once.
-                    # With a small Skeleton, this takes more time due to
-                    # additional book-keeping stuff.
-                    transitionpts = []
-                    for n, nodes in zip(range(element.getNumberOfEdges()), 
-                                              element.segment_node_iterator()):
-                        #for n in range(nnodes):
-                        #key = skeletonnode.canonical_order(
-                        #    element.nodes[n], element.nodes[(n+1)%nnodes])
+                    segs = []
+                    for nodes in element.segment_node_iterator():
                         key = skeletonnode.canonical_order(nodes[0], nodes[1])
                         try:
-                            transitionpts.append(stored_tps[key])
+                            segs.append(segindex[key])
                         except KeyError:
-                            tp = element.transitionPoint(skel, n)
-                            stored_tps[key] = tp
-                            transitionpts.append(tp)
-                    nodemotion = getNodeSnapper(element, transitionpts)
-                    if nodemotion is not None:
-                        movedict[element] = nodemotion
-                        try:
-                            movelists[nodemotion.priority].append(nodemotion)
-                        except KeyError:
-                            movelists[nodemotion.priority] = [nodemotion]
+                            segindex[key] = len(segindex)
+                            segs.append(segindex[key])
+                            endpoints.append(nodes[0].position())
+                            endpoints.append(nodes[1].position())
+                    candidates.append((element, segs))
                 if prog.stopped() :
                     return None
                 prog.setFraction(1.0*(i+1)/nel)
                 prog.setMessage("examined %d/%d elements" % (i+1, nel))
+
+            # Compute all of the transition points at once, in C++.
+            prog.setMessage("finding transition points on %d segments"
+                            % len(segindex))
+            tps = skel.MS.transitionPoints(endpoints)
+
+            for element, segs in candidates:
+                transitionpts = [tps[k] for k in segs]
+                nodemotion = getNodeSnapper(element, transitionpts)
+                if nodemotion is not None:
+                    movedict[element] = nodemotion
+                    try:
+                        movelists[nodemotion.priority].append(nodemotion)
+                    except KeyError:
+                        movelists[nodemotion.priority] = [nodemotion]
             # end loop over elements
             
             # Perform node motions in random order within their
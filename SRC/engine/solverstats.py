@@ -15,7 +15,9 @@ class SolverStats(object):
     def __init__(self):
         self.matrixStats = {}
         self.nonlinearStats = NonlinearStats()
+        self.nonlinearIterationStats = NonlinearIterationStats()
         self.stepperStats = StepperStats()
+        self.assemblyStats = AssemblyStats()
     def matrixSolution(self, size, niters, residual):
         try:
             stats = self.matrixStats[size]
@@ -24,8 +26,12 @@ class SolverStats(object):
         stats.add(niters, residual)
     def nonlinearSolution(self, niters, residual):
         self.nonlinearStats.add(niters, residual)
+    def nonlinearIteration(self, ratio, jacobianBuilt, linearIters):
+        self.nonlinearIterationStats.add(ratio, jacobianBuilt, linearIters)
     def stepTaken(self, timestep, truncated):
         self.stepperStats.add(timestep, truncated)
+    def matrixAssembly(self, patternReused):
+        self.assemblyStats.add(patternReused)
     def report(self, title, out):
         print >> out, title
         mstats = self.matrixStats.values()
@@ -33,11 +39,15 @@ class SolverStats(object):
         for ms in mstats:
             ms.report(out)
         self.nonlinearStats.report(out)
+        self.nonlinearIterationStats.report(out)
         self.stepperStats.report(out)
+        self.assemblyStats.report(out)
     def reset(self):
         self.matrixStats = {}
         self.nonlinearStats.reset()
+        self.nonlinearIterationStats.reset()
         self.stepperStats.reset()
+        self.assemblyStats.reset()
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
@@ -75,6 +85,44 @@ class NonlinearStats(IterationStats):
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+# NonlinearIterationStats is filled in by the nonlinear solvers that
+# record each iteration (see NLSolver.recordIteration in
+# nonlinearsolvercore.py).  It keeps track of how often the Jacobian
+# was recomputed or reused, how much each iteration reduced the
+# residual, and how many Krylov iterations were used.
+
+class NonlinearIterationStats(object):
+    def __init__(self):
+        self.reset()
+    def reset(self):
+        self.niters = 0
+        self.nbuilt = 0
+        self.nreused = 0
+        self.ratios = StatKeeper()
+        self.linearIters = StatKeeper()
+    def add(self, ratio, jacobianBuilt, linearIters):
+        self.niters += 1
+        # jacobianBuilt is None if the solver doesn't use a Jacobian.
+        if jacobianBuilt is True:
+            self.nbuilt += 1
+        elif jacobianBuilt is False:
+            self.nreused += 1
+        self.ratios.add(ratio)
+        if linearIters is not None:
+            self.linearIters.add(linearIters)
+    def report(self, out):
+        if self.niters > 0:
+            print >> out, "Nonlinear iteration statistics"
+            print >> out, "            # of iterations:", self.niters
+            if self.nbuilt + self.nreused > 0:
+                print >> out, "       Jacobians recomputed:", self.nbuilt
+                print >> out, "           Jacobians reused:", self.nreused
+            print >> out, "   residual reduction ratio:", self.ratios
+            if self.linearIters.n > 0:
+                print >> out, "          Krylov iterations:", self.linearIters
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 class StepperStats(object):
     def __init__(self):
         self.reset()
@@ -104,6 +152,29 @@ class StepperStats(object):
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+# AssemblyStats counts how often the matrices were refilled using
+# their existing sparsity patterns, and how often they had to be
+# built from scratch.
+
+class AssemblyStats(object):
+    def __init__(self):
+        self.reset()
+    def reset(self):
+        self.nreused = 0
+        self.nrebuilt = 0
+    def add(self, patternReused):
+        if patternReused:
+            self.nreused += 1
+        else:
+            self.nrebuilt += 1
+    def report(self, out):
+        if self.nreused + self.nrebuilt > 0:
+            print >> out, "Matrix assembly statistics"
+            print >> out, "    sparsity pattern reused:", self.nreused
+            print >> out, "   sparsity pattern rebuilt:", self.nrebuilt
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 class StatKeeper(object):
     def __init__(self, val=None):
         self.reset()
@@ -60,10 +60,20 @@ public:
   double coeff(int ir, int ic) { return data.coeff(ir, ic); }
   double& coeff_ref(int ir, int ic) { return data.coeffRef(ir, ic); }
   void make_compressed() { data.makeCompressed(); }
-  bool is_compressed() { return data.isCompressed(); }
+  bool is_compressed() const { return data.isCompressed(); }
   bool is_nonempty_row(int) const;
   bool is_nonempty_col(int) const;
 
+  // Routines for refilling a compressed matrix without changing its
+  // sparsity pattern.  find_entry() returns the position of (ir, ic)
+  // in the values array, or -1 if it's not part of the pattern.
+  // extract_triplets() appends the entries whose mask value is
+  // nonzero to the given list of triplets.
+  int find_entry(int ir, int ic) const;
+  double& value_at(int k) { return data.valuePtr()[k]; }
+  void zero_values();
+  void extract_triplets(const std::vector<char>&, std::vector<Triplet>&) const;
+
   SparseMat lower() const;
   SparseMat unit_lower() const;
   SparseMat upper() const;
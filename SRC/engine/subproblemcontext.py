@@ -73,6 +73,9 @@ class SubProblemContext(whoville.Who):
         self.solutiontimestamp.backdate()
 
         self.solverStats = solverstats.SolverStats()
+        # The near nullspace of the K_MCK matrix, for multigrid
+        # preconditioners.  It's recomputed when the MCK maps change.
+        self.nearNullspace = None
         self.newMatrixCount = 0 # no. of time matrices have been rebuilt.
 
         self.requestCallback(("preremove who", "SubProblem"),
@@ -737,6 +740,11 @@ class SubProblemContext(whoville.Who):
             femesh.fix_float_bcs(subpobj, linsys, time)
 
         if rebuildMatrices:
+            # Reuse the sparsity patterns of the matrices, unless
+            # we're recomputing everything.  This must precede
+            # clearMatrices() and clearJacobian(), which decide
+            # whether to keep the old patterns.
+            linsys.set_reuse_pattern(not always)
             # Assemble vectors and matrices of the linearized system.
             linsys.clearMatrices()
             linsys.clearBodyRhs()
@@ -747,6 +755,7 @@ class SubProblemContext(whoville.Who):
             # **** This is the cpu intensive step: ****
             self.getObject().make_linear_system(linsys, self.nonlinear_solver)
             self.newMatrixCount += 1
+            self.solverStats.matrixAssembly(linsys.patternReused())
 
         if bcsReset or rebuildMatrices or newFieldValues:
             linsys.build_submatrix_maps()
@@ -755,6 +764,7 @@ class SubProblemContext(whoville.Who):
             # build_submatrix_maps() and precede build_MCK_maps().
             femesh.invoke_float_bcs(subpobj, linsys, time)
             linsys.build_MCK_maps()
+            self.nearNullspace = linsys.near_nullspace_MCK()
             # Construct vectors of first and second time derivatives
             # of the time-dependent Dirichlet boundary conditions.
             linsys.initDirichletDerivatives()
@@ -1153,17 +1163,19 @@ consistencyTolerance = 1.e-6
 
 # MatrixSolverWrapper wraps a MatrixMethod's "solve" method,
 # intercepting its return values and using them to accumulate
-# statistics.  Doing it this way simplifies the calling sequence for
-# the MatrixMethod, because we don't have to make sure that the
-# SubProblemContext is available whenever the solver is used, and we
-# can use the MatrixMethod classes independently of the
-# SubProblemContext if necessary.
+# statistics.  It also gives the MatrixMethod the near nullspace of the
+# matrix, which multigrid preconditioners need.  Doing it this way
+# simplifies the calling sequence for the MatrixMethod, because we
+# don't have to make sure that the SubProblemContext is available
+# whenever the solver is used, and we can use the MatrixMethod classes
+# independently of the SubProblemContext if necessary.
 
 class MatrixSolverWrapper(object):
     def __init__(self, subproblemcontext, solver):
         self.subprobctxt = subproblemcontext
         self.solver = solver
     def solve(self, matrix, rhs, solution):
+        self.solver.setNearNullspace(self.subprobctxt.nearNullspace)
         niters, residual = self.solver.solve(matrix, rhs, solution)
         self.subprobctxt.solverStats.matrixSolution(
             matrix.nrows(), niters, residual)
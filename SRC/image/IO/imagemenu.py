@@ -362,6 +362,10 @@ def createPixelGroups(menuitem, image, name_template):
     mscontext.begin_writing()
     try:
         newgrpname = autogroupMP.autogroup(ms, immidge, name_template)
+        if not prog.stopped():
+            # autogroup leaves the time taken by each phase in the
+            # progress message.
+            reporter.report(prog.message())
     finally:
         prog.finish()
         mscontext.end_writing()
@@ -22,7 +22,7 @@ swigfiles = [
     'pixelselectioncouriero.swg', 'pixeldifferentiator.swg']
 
 pyfiles = [
-    'hkl.py', 'tsl.py', 'genericreader.py',
+    'columnreader.py', 'hkl.py', 'tsl.py', 'genericreader.py',
     'initialize.py', 'orientmapdisplay.py', 'pixelselectionmod.py',
     'orientmapmenu.py', 'orientmapIO.py', 'pixelinfoplugin.py']
 
@@ -0,0 +1,104 @@
+# -*- python -*-
+
+# This software was produced by NIST, an agency of the U.S. government,
+# and by statute is not subject to copyright in the United States.
+# Recipients of this software assume all responsibilities associated
+# with its operation, modification and maintenance. However, to
+# facilitate maintenance we ask that before distributing modified
+# versions of this software, you first contact the authors at
+# oof_manager@nist.gov.
+
+# Tools for OrientMapReaders that read files containing one data
+# point per line, in columns.  The file is read in fixed size chunks,
+# and the data is stored in arrays of numbers, so that there's never
+# more than one chunk of text or any per-point Python objects in
+# memory.  OrientMapGrid (in orientmapdata.C) finds the pixel for
+# each point, and COrientMapReader.set_angles and addPixelsToGroups
+# use the arrays directly.
+
+from ooflib.SWIG.common import ooferror
+from ooflib.SWIG.orientationmap import orientmapdata
+from ooflib.common.IO import reporter
+import array
+import os
+
+CHUNKSIZE = 1 << 22             # approximate bytes of text per chunk
+
+class GroupColumn(object):
+    # Pixel group assignments from one column of the file.  Each point
+    # is given an integer code, which is the index of its group's name
+    # in self.names.
+    def __init__(self):
+        self.clear()
+    def clear(self):
+        self.names = []
+        self.codes = array.array('i')
+        self.lookup = {}
+    def append(self, name):
+        try:
+            code = self.lookup[name]
+        except KeyError:
+            code = self.lookup[name] = len(self.names)
+            self.names.append(name)
+        self.codes.append(code)
+
+class ColumnData(object):
+    def __init__(self, ngroupcolumns):
+        self.xy = array.array('d')      # x0, y0, x1, y1, ...
+        self.angles = array.array('d')  # all angle components, in order
+        self.groups = [GroupColumn() for i in range(ngroupcolumns)]
+    def __len__(self):
+        return len(self.xy)/2
+    def append(self, x, y, angles, groupnames):
+        self.xy.append(x)
+        self.xy.append(y)
+        self.angles.extend(angles)
+        for column, name in zip(self.groups, groupnames):
+            column.append(name)
+    def clear(self):
+        del self.xy[:]
+        del self.angles[:]
+        for column in self.groups:
+            column.clear()
+
+def readChunks(datafile, prog):
+    # Generate lists of lines from the file, updating the progress
+    # bar after each list.
+    filesize = max(os.fstat(datafile.fileno()).st_size, 1)
+    nlines = 0
+    while not prog.stopped():
+        lines = datafile.readlines(CHUNKSIZE)
+        if not lines:
+            return
+        yield lines
+        nlines += len(lines)
+        prog.setMessage("read %d lines" % nlines)
+        prog.setFraction(float(datafile.tell())/filesize)
+
+def buildOrientMap(reader, data, prog, hexgrid, flip_x, flip_y,
+                   scale_factor, angleformat, degrees, angle_offset):
+    # Create an OrientMap from the ColumnData.  hexgrid is None if it
+    # should be detected from the data.  angleformat is the name of an
+    # Orientation subclass, and angle_offset is an xy-plane rotation,
+    # in degrees, as in Orientation.rotateXY.  Returns the OrientMap
+    # and the pixel buffer that will be needed by addGroupColumn.
+    if len(data) == 0:
+        raise ooferror.ErrUserError("No orientation data was found.")
+    prog.setMessage("locating %d pixels" % len(data))
+    grid = orientmapdata.OrientMapGrid(data.xy)
+    if hexgrid is None:
+        # The grid is hexagonal if the first two rows don't start at
+        # the same x.
+        hexgrid = grid.staggered()
+    if hexgrid:
+        reporter.warn(
+            "Converting hexagonal lattice to rectangular"
+            " by discarding alternate rows.")
+    grid.setup(hexgrid, flip_x, flip_y)
+    pixels = grid.pixels(data.xy)
+    od = orientmapdata.OrientMap(grid.sizeInPixels(),
+                                 grid.size()*scale_factor)
+    prog.setMessage("setting %d orientations" % len(data))
+    reader.set_angles(od, pixels, data.angles, angleformat, degrees,
+                      angle_offset)
+    return od, pixels
@@ -21,6 +21,8 @@ class COrientMapReader;
 #include "common/array.h"
 #include "engine/corientation.h"
 #include "image/oofimage.h"
+#include <Python.h>
+#include <map>
 #include <string>
 #include <vector>
 
@@ -31,9 +33,63 @@ class COrientMapReader {
 public:
   virtual ~COrientMapReader() {}
   void set_angle(OrientMap &data, const ICoord*, const COrientation*) const;
+  // set_angles sets many angles at once.  The pixels are given by a
+  // buffer of pairs of ints, as returned by OrientMapGrid::pixels().
+  // The angles are a buffer of doubles, containing the arguments of
+  // the named Orientation subclass for each pixel.  The rotation is
+  // in degrees, and is applied as in Orientation.rotateXY().
+  void set_angles(OrientMap &data, PyObject *pixels, PyObject *angles,
+		  const std::string &format, bool degrees, double rotation)
+    const;
   friend class OrientMap;
 };
 
+// OrientMapGrid finds the pixel for each point in an orientation map
+// file.  The points must lie on a rectangular or hexagonal grid, but
+// can be given in any order.  Points with the same y coordinate form
+// a row.  All of the points are passed to the constructor in a buffer
+// of doubles (x0, y0, x1, y1, ...), which is scanned once to find the
+// rows, without creating any per-point objects.
+
+class OrientMapGrid {
+private:
+  struct Row {
+    int index;			// position of the row in y order
+    int npts;
+    double x0, x1;		// smallest and second smallest x
+    double xmax;
+  };
+  typedef std::map<double, Row> RowMap;
+  RowMap rows;
+  int step;			// 2 if alternate rows are discarded
+  bool flip_x, flip_y;
+  double xmin, xmax, ymin, ymax, dx, dy;
+  ICoord npixels;
+  bool ready;
+public:
+  OrientMapGrid(PyObject *xy);
+  int nrows() const { return rows.size(); }
+  // staggered() is true if the first two rows don't start at the
+  // same x, which means that the grid is hexagonal.
+  bool staggered() const;
+  // setup() must be called before the other methods.
+  void setup(bool hexagonal, bool flip_x, bool flip_y);
+  const ICoord &sizeInPixels() const { return npixels; }
+  // Physical size, assuming that the points are at pixel centers.
+  Coord size() const;
+  // Return a buffer containing the pixel coordinates of each point,
+  // or (-1, -1) for points in discarded rows.
+  PyObject *pixels(PyObject *xy) const;
+};
+
+// Put the points into pixel groups.  codes is a buffer of ints giving
+// the index in names of the group for each point, and pixels is the
+// buffer returned by OrientMapGrid::pixels().  The names of the
+// groups that had to be created are returned.
+std::vector<std::string> *addPixelsToGroups(CMicrostructure*,
+					    const std::vector<std::string>*,
+					    PyObject *pixels, PyObject *codes);
+
 // TODO: It might make sense to for OrientMap to be derived from
 // Array<COrientABG>.
 
@@ -10,48 +10,12 @@
 
 from ooflib.SWIG.common import ooferror
 from ooflib.SWIG.common import progress
-from ooflib.SWIG.engine import corientation
 from ooflib.SWIG.orientationmap import orientmapdata
 from ooflib.common import debug
-from ooflib.common import primitives
-from ooflib.common import utils
 from ooflib.common.IO import parameter
-from ooflib.common.IO import reporter
-import math
+from ooflib.orientationmap import columnreader
 import os.path
 
-class DataPoint:
-    def __init__(self, position, angletuple, phasename):
-        self.position = position
-        self.angle = corientation.COrientBunge(*angletuple)
-        self.phasename = phasename
-    def euler(self):
-        return self.angle.abg()
-    def __repr__(self):
-        return "(%s, %s)" % (self.position[0], self.position[1])
-    def __cmp__(self, other):
-        sy = self.position[1]
-        oy = other.position[1]
-        if sy < oy:
-            return -1
-        if sy > oy:
-            return 1
-        return cmp(self.position[0], other.position[0])
-
-## getrows() splits a list of DataPoints into lists in which x is
-## monotonically increasing.
-
-def getrows(datapts):
-    datapts.sort()
-    row = [datapts[0]]
-    for pt in datapts[1:]:
-        if pt.position[0] > row[-1].position[0]:
-            row.append(pt)
-        else:
-            yield row
-            row = [pt]
-    yield row
-
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
 class TSLreaderBase(orientmapdata.OrientMapReader):
@@ -59,7 +23,8 @@ class TSLreaderBase(orientmapdata.OrientMapReader):
         self.flip_x = flip_x
         self.flip_y = flip_y
         self.angle_offset = angle_offset
-        self.phaselists = {}
+        self.pixels = None      # pixel coordinates for each data point
+        self.phases = None      # columnreader.GroupColumn
         orientmapdata.OrientMapReader.__init__(self)
     def read(self, filename):
         tslfile = file(filename, "r")
@@ -73,94 +38,28 @@ class TSLreaderBase(orientmapdata.OrientMapReader):
 
 
     def _read(self, tslfile, prog):
-        data, hexgrid = self.readData(tslfile, prog)
-        npts = len(data)
-        rows = list(getrows(data)) # sorts data
-        if hexgrid is None:
-            # readData didn't set hexgrid.  The grid is hexagonal if
-            # the first two rows don't start at the same x.
-            hexgrid = rows[0][0].position[0] != rows[1][0].position[0]
-
-        if hexgrid:
-            # Throw out every other row.
-            reporter.warn(
-                "Converting hexagonal lattice to rectangular"
-                " by discarding alternate rows.")
-            rows = rows[::2]            # discard odd numbered rows
-
-        nx = len(rows[0])
-        ny = len(rows)
-        count = 0
-        for row in rows:
-            count += 1
-            if len(row) != nx:
-                raise ooferror.ErrUserError(
-                    "Orientation map data appears to be incomplete.\n"
-                    "len(row 0)=%d len(row %d)=%d" % (nx, count, len(row)))
+        data, hexgrid, degrees = self.readData(tslfile, prog)
+        if prog.stopped():
+            return None
+        # If hexgrid is None, readData didn't detect the grid type,
+        # and buildOrientMap will.
 
         # TSL puts the origin at the top left, so it's using a left
-        # handed coordinate system!  If flip_y==True, fix that.  Also,
-        # make sure there are no negative x or y values.
-        ymax = rows[-1][0].position[1]
-        ymin = rows[0][0].position[1]
-        xmax = rows[0][-1].position[0]
-        xmin = rows[0][0].position[0]
-        for row in rows:
-            for point in row:
-                if self.flip_x:
-                    point.position[0] = xmax - point.position[0]
-                else:
-                    point.position[0] = point.position[0] - xmin
-                if self.flip_y:
-                    point.position[1] = ymax - point.position[1]
-                else:
-                    point.position[1] = point.position[1] - ymin
-    
-        # If flipped, the rows are still ordered top to bottom, but
-        # the coordinates increase bottom to top.
-
-        # pixel size
-        dx = abs(rows[0][1].position[0] - rows[0][0].position[0])
-        dy = abs(rows[0][0].position[1] - rows[1][0].position[1])
-        pxlsize = primitives.Point(dx, dy)
-        
-        width = abs(rows[0][0].position[0] - rows[0][-1].position[0])
-        height = abs(rows[0][0].position[1] - rows[-1][0].position[1])
-        # If we assume that the points are in the centers of the
-        # pixels, then the actual physical size is one pixel bigger
-        # than the range of the xy values.
-        size = primitives.Point(width, height) + pxlsize
-
-        od = orientmapdata.OrientMap(primitives.iPoint(nx, ny), size)
-        prog.setMessage("%d/%d orientations" % (0, npts))
-        count = 0
-        for row in rows:
-            for datum in row:
-                ij = primitives.iPoint(
-                    int(round(datum.position[0]/pxlsize[0])),
-                    int(round(datum.position[1]/pxlsize[1])))
-                try:
-                    self.phaselists[datum.phasename].append(ij)
-                except KeyError:
-                    self.phaselists[datum.phasename] = [ij]
-                self.set_angle(od, ij, datum.euler())
-                prog.setMessage("%d/%d orientations" % (count,npts))
-                prog.setFraction(float(count)/npts)
-                count += 1
-                if prog.stopped():
-
-                    return None
-        prog.finish()
+        # handed coordinate system!  If flip_y==True, fix that.  The
+        # angle offset is subtracted from phi1 in the Bunge angles.
+        od, self.pixels = columnreader.buildOrientMap(
+            self, data, prog, hexgrid, self.flip_x, self.flip_y, 1.0,
+            "Bunge", degrees, self.angle_offset)
+        self.phases = data.groups[0]
         return od
 
     ## postProcess is called after the orientation data has been
     ## assigned to a Microstructure.
     def postProcess(self, microstructure):
-        phasenames = self.phaselists.keys()
-        phasenames.sort()
-        for phasename in phasenames:
-            orientmapdata.addPixelsToGroup(microstructure, phasename,
-                                           self.phaselists[phasename])
+        orientmapdata.addGroupColumn(microstructure, self.phases.names,
+                                     self.pixels, self.phases.codes)
+        self.pixels = None
+        self.phases = None
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
@@ -169,43 +68,33 @@ class TSLreaderBase(orientmapdata.OrientMapReader):
 class TSLreader(TSLreaderBase):
     def readData(self, tslfile, prog):
         count = 1                       # line counter
-        lines = tslfile.readlines()
-        nlines = len(lines)
-        data = utils.ReservableList(nlines)
+        data = columnreader.ColumnData(1)
         angletype = None
-        for line in lines:
-            if line[0] == '#':
-                if line.startswith("Column 1-3", 2):
-                    if "radians" in line:
-                        angletype = "radians"
-                    else:
-                        angletype = "degrees"
-            else:                       # line[0] != '#'
-                substrings = line.split()
-                if len(substrings) < 5:
-                    raise ooferror.ErrUserError(
-                        "Too few numbers in line %d of %s" 
-                        % (count, tslfile.name))
-                values = map(float, substrings[:5])
-                if angletype == "radians":
-                    angles = values[:3]
-                    angles[0] = angles[0] - math.radians(self.angle_offset)
-                elif angletype == "degrees":
-                    angles[0] = angles[0] - self.angle_offset
-                    angles = map(math.radians, values[:3])
-                else:
-                    raise ooferror.ErrDataFileError(
-                        "Angle type not specified in TSL data file")
-                data.append(DataPoint(
-                    primitives.Point(values[3], values[4]), # position
-                    angles,
-                    ' '.join(substrings[10:])))    # phase name
-            count += 1      # count actual file lines, comments and all
-            prog.setMessage("read %d/%d lines" % (count, nlines))
-            prog.setFraction(float(count)/nlines)
-        npts = len(data)
-        debug.fmsg("read %d lines, %d data points" % (count, npts))
-        return data, None       # None ==> hexgrid not detected yet
+        for lines in columnreader.readChunks(tslfile, prog):
+            for line in lines:
+                if line[0] == '#':
+                    if line.startswith("Column 1-3", 2):
+                        if "radians" in line:
+                            angletype = "radians"
+                        else:
+                            angletype = "degrees"
+                else:                       # line[0] != '#'
+                    substrings = line.split()
+                    if len(substrings) < 5:
+                        raise ooferror.ErrUserError(
+                            "Too few numbers in line %d of %s" 
+                            % (count, tslfile.name))
+                    if angletype is None:
+                        raise ooferror.ErrDataFileError(
+                            "Angle type not specified in TSL data file")
+                    values = map(float, substrings[:5])
+                    data.append(values[3], values[4], # position
+                                values[:3],           # angles
+                                [' '.join(substrings[10:])]) # phase name
+                count += 1      # count actual file lines, comments and all
+        debug.fmsg("read %d lines, %d data points" % (count, len(data)))
+        # None ==> hexgrid not detected yet
+        return data, None, angletype == "degrees"
 
 orientmapdata.OrientMapRegistration(
     'TSL', TSLreader,
@@ -227,34 +116,29 @@ orientmapdata.OrientMapRegistration(
 class TSLreader2(TSLreaderBase):
     def readData(self, tslfile, prog):
         count = 1
-        lines = tslfile.readlines()
-        nlines = len(lines)
-        data = utils.ReservableList(nlines)
+        data = columnreader.ColumnData(1)
         hexgrid = False
-        for line in lines:
-            if line[0] == '#':  # line is in the header
-                if line.startswith('# GRID: HexGrid'):
-                    hexgrid = True
-            else:               # line is not a header line
-                substrings = line.split()
-                if len(substrings) < 5:
-                    raise ooferror.ErrUserError(
-                        "Not enough columns in line %d of %s"
-                        % (count, tslfile.name))
-                if len(substrings) >= 8:
-                    phase = substrings[7]
-                else:
-                    phase = 'phase0'
-                values = map(float, substrings[:5])
-                position = primitives.Point(values[3], values[4])
-                angles = values[:3]
-                angles[0] = angles[0] - math.radians(self.angle_offset)
-                data.append(DataPoint(position, angles, 'phase'+phase))
-            count += 1
-            prog.setMessage("read %d/%d lines" % (count, nlines))
-            prog.setFraction(float(count)/nlines)
+        for lines in columnreader.readChunks(tslfile, prog):
+            for line in lines:
+                if line[0] == '#':  # line is in the header
+                    if line.startswith('# GRID: HexGrid'):
+                        hexgrid = True
+                else:               # line is not a header line
+                    substrings = line.split()
+                    if len(substrings) < 5:
+                        raise ooferror.ErrUserError(
+                            "Not enough columns in line %d of %s"
+                            % (count, tslfile.name))
+                    if len(substrings) >= 8:
+                        phase = substrings[7]
+                    else:
+                        phase = '0'
+                    values = map(float, substrings[:5])
+                    data.append(values[3], values[4], values[:3],
+                                ['phase'+phase])
+                count += 1
         debug.fmsg("read %d lines, %d data points" % (count, len(data)))
-        return data, hexgrid
+        return data, hexgrid, False
 
 
 orientmapdata.OrientMapRegistration(
@@ -415,6 +415,60 @@ class OOF_SimpleInterfaceTest(unittest.TestCase):
                 self.assertAlmostEqual(delta.y, 0.0, 6)
         self.assert_(numup==37)
 
+    # Check that the stiffness matrix and rhs are the same whether
+    # the elements and interface elements are assembled by color or
+    # with a copy of the matrices for each thread.
+    def ColoredAssembly(self):
+        from ooflib.common import config
+        from ooflib.engine import mesh
+        if not config.enable_openmp():
+            return
+        OOF.Microstructure.Interface.New(
+            microstructure='cyallow.png',
+            name='interface',
+            interface_type=MaterialInterface(left='material',
+                                             right='material<2>'))
+        OOF.Microstructure.Interface.New(
+            microstructure='cyallow.png',
+            name='interface<2>',
+            interface_type=PixelGroupInterface(
+                left='RGBColor(red=1.00000,green=1.00000,blue=0.00000)',
+                right='RGBColor(red=0.00000,green=1.00000,blue=1.00000)'))
+        OOF.Material.Interface.Assign(microstructure='cyallow.png',
+                                      material='interfacematerial',
+                                      interfaces=['interface', 'interface<2>'])
+        OOF.Mesh.New(name='mesh', skeleton='cyallow.png:skeleton',
+                     element_types=['D2_2', 'T3_3', 'Q4_4'])
+        meshctxt = mesh.meshes["cyallow.png:skeleton:mesh"]
+        self.assert_(meshctxt.nedgements()==20)
+        OOF.Subproblem.Field.Define(
+            subproblem='cyallow.png:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Subproblem.Field.Activate(
+            subproblem='cyallow.png:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Mesh.Field.In_Plane(mesh='cyallow.png:skeleton:mesh',
+                                field=Displacement)
+        OOF.Subproblem.Equation.Activate(
+            subproblem='cyallow.png:skeleton:mesh:default',
+            equation=Force_Balance)
+        subpctxt = meshctxt.get_default_subproblem()
+        meshctxt.solver_precompute(solving=True)
+        results = []
+        try:
+            for colored in (False, True):
+                OOF.Settings.Parallel_Assembly(colored=colored)
+                linsys = subpctxt.make_linear_system(0.0, None)
+                results.append((linsys.K_MCK().clone(), linsys.rhs_MCK()))
+        finally:
+            OOF.Settings.Parallel_Assembly(colored=False)
+        (Kref, rhsref), (K, rhs) = results
+        K.add(-1.0, Kref)
+        self.assert_(K.norm() < 1.e-12*Kref.norm())
+        # The surface tension contributes to the rhs.
+        self.assert_(rhsref.norm() > 0.0)
+        self.assert_((rhs - rhsref).norm() < 1.e-12*rhsref.norm())
+
     #Mr. Gorbachev...
     def tearDown(self):
         OOF.Microstructure.Delete(microstructure="cyallow.png")
@@ -1031,6 +1085,7 @@ def run_tests():
     test_set = [
         OOF_SimpleInterfaceTest("InterfaceTension"),
         OOF_SimpleInterfaceTest("DetachedMesh"),
+        OOF_SimpleInterfaceTest("ColoredAssembly"),
         OOF_InterfaceTest2("DisconnectedBoundaryJump"),
         OOF_InterfaceTest3("Stretch"),
         OOF_InterfaceTest3("Heat")
@@ -72,6 +72,13 @@ class IterativeMethods(unittest.TestCase):
         solver.solveMatrix(self.matrix, self.rhs, solution)
         self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
     
+    def CG_AMG(self):
+        solution = doublevec.DoubleVec(0)
+        pc = preconditioner.AMGPreconditioner()
+        solver = matrixmethod.ConjugateGradient(pc, self.tolerance, self.max_iterations)
+        solver.solveMatrix(self.matrix, self.rhs, solution)
+        self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
+    
     def BiCGStab(self):
         solution = doublevec.DoubleVec(0)
         pc = preconditioner.UnPreconditioner()
@@ -100,6 +107,13 @@ class IterativeMethods(unittest.TestCase):
         solver.solveMatrix(self.matrix, self.rhs, solution)
         self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
 
+    def BiCGStab_AMG(self):
+        solution = doublevec.DoubleVec(0)
+        pc = preconditioner.AMGPreconditioner()
+        solver = matrixmethod.StabilizedBiConjugateGradient(pc, self.tolerance, self.max_iterations)
+        solver.solveMatrix(self.matrix, self.rhs, solution)
+        self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
+
     def BiCG(self):
         solution = doublevec.DoubleVec(0)
         pc = preconditioner.UnPreconditioner()
@@ -128,6 +142,24 @@ class IterativeMethods(unittest.TestCase):
         solver.solveMatrix(self.matrix, self.rhs, solution)
         self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
     
+    def CG_Reuse(self):
+        # With a warm start and a reused preconditioner, solving the
+        # same system again shouldn't build a new preconditioner or
+        # take as many iterations.
+        pc = preconditioner.ILUTPreconditioner()
+        solver = matrixmethod.ConjugateGradient(
+            pc, self.tolerance, self.max_iterations,
+            initial_guess=matrixmethod.InitialGuess('Previous'),
+            reuse_preconditioner=True, reuse_tolerance=0.01)
+        solution = doublevec.DoubleVec(0)
+        niters0, resid = solver.solveMatrix(self.matrix, self.rhs, solution)
+        self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
+        solution = doublevec.DoubleVec(0)
+        niters1, resid = solver.solveMatrix(self.matrix, self.rhs, solution)
+        self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
+        self.assertEqual(solver.solver.preconditioners_built(), 1)
+        self.assert_(niters1 <= niters0)
+
 class DirectMethods(unittest.TestCase):
     def setUp(self):
         global sparsemat
@@ -166,6 +198,24 @@ class DirectMethods(unittest.TestCase):
         succ = solver.solveMatrix(self.matrix, self.rhs, solution)
         self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
 
+    def Refactorize(self):
+        # Solving the same matrix twice should reuse the
+        # factorization.  Solving a rescaled matrix should reuse the
+        # symbolic analysis but not the numeric factorization.
+        for solver in (matrixmethod.SimplicialLDLT(), matrixmethod.SparseLU(),
+                       matrixmethod.SparseQR()):
+            solution = doublevec.DoubleVec(0)
+            solver.solveMatrix(self.matrix, self.rhs, solution)
+            solver.solveMatrix(self.matrix, self.rhs, solution)
+            self.assertEqual(solver.solver.analyses(), 1)
+            self.assertEqual(solver.solver.factorizations(), 1)
+            self.assertAlmostEqual(self.ref.norm(), solution.norm(), 9)
+            matrix2 = self.matrix * 2.0
+            solver.solveMatrix(matrix2, self.rhs, solution)
+            self.assertEqual(solver.solver.analyses(), 1)
+            self.assertEqual(solver.solver.factorizations(), 2)
+            self.assertAlmostEqual(0.5*self.ref.norm(), solution.norm(), 9)
+
 def run_tests():
 
     iter_set = [
@@ -173,6 +223,7 @@ def run_tests():
         IterativeMethods("CG_ILU"),
         IterativeMethods("CG_ILUT"),
         IterativeMethods("CG_Jacobi"),
+        IterativeMethods("CG_AMG"),
         IterativeMethods("BiCG"),
         IterativeMethods("BiCG_ILU"),
         IterativeMethods("BiCG_ILUT"),
@@ -181,12 +232,15 @@ def run_tests():
         IterativeMethods("BiCGStab_ILU"),
         IterativeMethods("BiCGStab_ILUT"),
         IterativeMethods("BiCGStab_Jacobi"),
+        IterativeMethods("BiCGStab_AMG"),
+        IterativeMethods("CG_Reuse"),
     ]
     direct_set = [
         DirectMethods("SimplicialLLT"),
         DirectMethods("SimplicialLDLT"),
         DirectMethods("SparseLU"),
         DirectMethods("SparseQR"),
+        DirectMethods("Refactorize"),
     ]
     test_set = iter_set + direct_set
 
@@ -56,6 +56,80 @@ class OOF_Mesh(OOF_Mesh_Base):
         self.assertNotEqual(msh, None)
         self.assertEqual(mesh.meshes.nActual(), 1)
 
+    # Neighboring elements must share the nodes on their common
+    # edges.  An 8x8 skeleton of Q8 elements has 9*9 corner nodes and
+    # 2*8*9 edge nodes.
+    @memorycheck.check("meshtest")
+    def QuadraticNodes(self):
+        OOF.Mesh.New(name="test", skeleton="meshtest:skeleton",
+                     element_types=['T6_6', 'Q8_8'])
+        femsh = mesh.meshes["meshtest:skeleton:test"].getObject()
+        self.assertEqual(femsh.nelements(), 64)
+        self.assertEqual(femsh.nnodes(), 9*9 + 2*8*9)
+        skel = mesh.meshes["meshtest:skeleton:test"].getSkeleton()
+        for skelel in skel.elements:
+            realel = femsh.getElement(skelel.meshindex)
+            for i in range(4):
+                pos = realel.getCornerNode(i).position()
+                skelpos = skelel.nodes[i].position()
+                self.assertEqual((pos.x, pos.y), (skelpos.x, skelpos.y))
+        OOF.Mesh.Delete(mesh="meshtest:skeleton:test")
+
+    # Interior nodes must be recorded in FEMesh.internal_nodes, or
+    # flux recovery will leave them out of the patches.  Edge nodes
+    # are recorded in FEMesh.edge_nodes.
+    @memorycheck.check("meshtest")
+    def InteriorNodesSCPR(self):
+        from ooflib.engine import scpatch
+        from ooflib.engine import skeletonnode
+        OOF.Material.New(name='material', material_type='bulk')
+        OOF.Material.Assign(
+            material='material', microstructure='meshtest', pixels=all)
+        OOF.Mesh.New(name="test", skeleton="meshtest:skeleton",
+                     element_types=['T6_6', 'Q9_9'])
+        meshctxt = mesh.meshes["meshtest:skeleton:test"]
+        femsh = meshctxt.getObject()
+        skel = meshctxt.getSkeleton()
+        self.assertEqual(femsh.nnodes(), 9*9 + 2*8*9 + 64)
+        self.assertEqual(len(femsh.internal_nodes), 64)
+        for skelel in skel.elements:
+            nodes = femsh.getInternalNodes(skelel)
+            self.assertEqual(len(nodes), 1)
+            x = sum([n.position().x for n in skelel.nodes])/4.
+            y = sum([n.position().y for n in skelel.nodes])/4.
+            self.assertAlmostEqual(nodes[0].position().x, x, 10)
+            self.assertAlmostEqual(nodes[0].position().y, y, 10)
+        # Each segment's edge node is at its midpoint.
+        self.assertEqual(len(femsh.edge_nodes), 2*8*9)
+        for seg in skel.segments.values():
+            n0, n1 = seg.nodes()
+            nodes = femsh.getEdgeNodes(skeletonnode.canonical_order(n0, n1))
+            self.assertEqual(len(nodes), 1)
+            self.assertAlmostEqual(nodes[0].position().x,
+                                   0.5*(n0.position().x + n1.position().x), 10)
+            self.assertAlmostEqual(nodes[0].position().y,
+                                   0.5*(n0.position().y + n1.position().y), 10)
+        # Build the patches as CSubProblem.create_scpatch does, but
+        # keep them so that their recovery nodes can be checked.
+        subp = meshctxt.get_default_subproblem().getObject()
+        indices = set()
+        for skelel in skel.elements:
+            realel = femsh.getElement(skelel.meshindex)
+            for i in range(len(skelel.nodes)):
+                indices.add(realel.getCornerNode(i).index())
+        subp.init_scpatches(list(indices))
+        patches = scpatch.SCPatchCollection(subp)
+        patches.buildPatches(skel)
+        recovered = set()
+        for patch in patches.patches.values():
+            recovered.update(patch.recovery_nodes.keys())
+        for skelel in skel.elements:
+            for node in femsh.getInternalNodes(skelel):
+                self.assert_(node.index() in recovered)
+        del patches
+        OOF.Mesh.Delete(mesh="meshtest:skeleton:test")
+        OOF.Material.Delete(name="material")
+
     @memorycheck.check("meshtest")
     def Delete(self):
         OOF.Mesh.New(name="test", skeleton="meshtest:skeleton",
@@ -286,6 +360,87 @@ class OOF_Mesh_Extra(OOF_Mesh_FieldEquation):
                              lab_coord[0]*lab_coord[1])
         OOF.Mesh.Delete(mesh="meshtest:skeleton:mesh<2>")
 
+    @memcheck
+    def InitializeVector(self):
+        # The initializer's functions are evaluated at all nodes at
+        # once.  Check that each node gets its own value.
+        import math
+        OOF.Mesh.Field.Define(mesh="meshtest:skeleton:fe_test",
+                              field=Displacement)
+        OOF.Mesh.Set_Field_Initializer(
+            mesh="meshtest:skeleton:fe_test",
+            field=Displacement,
+            initializer=FuncTwoVectorFieldInit(fx="x+2*y+t",
+                                               fy="sin(x)*y"))
+        OOF.Mesh.Apply_Field_Initializers_at_Time(
+            mesh="meshtest:skeleton:fe_test", time=0.5)
+        n = 0
+        for node in self.msh_obj.funcnode_iterator():
+            pos = node.position()
+            self.assertAlmostEqual(Displacement.value(self.msh_obj, node, 0),
+                                   pos[0] + 2*pos[1] + 0.5)
+            self.assertAlmostEqual(Displacement.value(self.msh_obj, node, 1),
+                                   math.sin(pos[0])*pos[1])
+            n += 1
+        self.assert_(n > 0)
+
+    @memcheck
+    def DataCache(self):
+        # Record a series of time steps in each type of cache, and
+        # check that restoring and interpolating reproduce the
+        # values.  The sign changes in the initializer make the
+        # differences in the Compressed cache use all eight bytes,
+        # and the zeros on the left and bottom edges make some of
+        # them use none.
+        OOF.Mesh.Field.Define(mesh="meshtest:skeleton:fe_test",
+                              field=Temperature)
+        OOF.Mesh.Set_Field_Initializer(
+            mesh="meshtest:skeleton:fe_test",
+            field=Temperature,
+            initializer=FuncScalarFieldInit(function="x*y*cos(2*t)"))
+        def fieldvalues():
+            return [Temperature.value(self.msh_obj, node, 0)
+                    for node in self.msh_obj.funcnode_iterator()]
+        # More steps than the Compressed cache's key interval.
+        times = [0.25*i for i in range(20)]
+        for cachetype in ('Memory', 'Mapped', 'Compressed'):
+            OOF.Mesh.Modify(
+                mesh="meshtest:skeleton:fe_test",
+                modifier=SetMeshDataCacheType(cachetype=cachetype))
+            # Apply_Field_Initializers_at_Time clears the cache.
+            OOF.Mesh.Apply_Field_Initializers_at_Time(
+                mesh="meshtest:skeleton:fe_test", time=times[0])
+            expected = []
+            for t in times:
+                self.msh.setCurrentTime(t)
+                for fld, init in self.msh.initializers.items():
+                    init.apply(self.msh_obj, fld, time=t)
+                expected.append(fieldvalues())
+                self.msh.cacheCurrentData()
+            self.assertEqual(list(self.msh.cachedTimes()), times)
+            # Restore in an order that isn't sequential.
+            for i in range(0, len(times), 3) + range(len(times)-1, 0, -4):
+                self.msh.restoreCachedData(times[i])
+                try:
+                    self.assertEqual(fieldvalues(), expected[i])
+                finally:
+                    self.msh.releaseCachedData()
+            for i in range(len(times)-1):
+                self.msh.restoreCachedData(0.5*(times[i] + times[i+1]))
+                try:
+                    for v, v0, v1 in zip(fieldvalues(), expected[i],
+                                         expected[i+1]):
+                        self.assertAlmostEqual(v, 0.5*(v0 + v1), 12)
+                finally:
+                    self.msh.releaseCachedData()
+            self.msh.restoreLatestData()
+            try:
+                self.assertEqual(fieldvalues(), expected[-1])
+            finally:
+                self.msh.releaseCachedData()
+        OOF.Mesh.Modify(mesh="meshtest:skeleton:fe_test",
+                        modifier=SetMeshDataCacheType(cachetype='Memory'))
+
 
 
 # There is a toolbox for mesh cross-section operations, but it doesn't
@@ -672,6 +827,42 @@ class OOF_Mesh_SaveLoad(OOF_Mesh_FieldEquation):
         self.assertEqual(bc1.initializer, None)
         self.assertEqual(bc2.initializer, None)
 
+    @memcheck
+    def BinarySaveLoad(self):
+        # Binary files store the Field values as one array for each
+        # set of Nodes.  Check that they survive a round trip.
+        OOF.Mesh.Field.Define(mesh="meshtest:skeleton:fe_test",
+                              field=Temperature)
+        OOF.Mesh.Field.Define(mesh="meshtest:skeleton:fe_test",
+                              field=Displacement)
+        OOF.Mesh.Set_Field_Initializer(
+            mesh="meshtest:skeleton:fe_test",
+            field=Temperature,
+            initializer=FuncScalarFieldInit(function="x*y"))
+        OOF.Mesh.Set_Field_Initializer(
+            mesh="meshtest:skeleton:fe_test",
+            field=Displacement,
+            initializer=FuncTwoVectorFieldInit(fx="x+1", fy="2*y"))
+        OOF.Mesh.Apply_Field_Initializers(mesh="meshtest:skeleton:fe_test")
+        def fieldvalues(femesh):
+            return [(node.index(),
+                     Temperature.value(femesh, node, 0),
+                     Displacement.value(femesh, node, 0),
+                     Displacement.value(femesh, node, 1))
+                    for node in femesh.funcnode_iterator()]
+        before = fieldvalues(self.msh_obj)
+        OOF.File.Save.Mesh(filename="mesh_save_test",
+                           mode="w", format="binary",
+                           mesh="meshtest:skeleton:fe_test")
+        OOF.Microstructure.Delete(microstructure="meshtest")
+        OOF.File.Load.Data(filename="mesh_save_test")
+        femesh = mesh.meshes["meshtest:skeleton:fe_test"].getObject()
+        after = fieldvalues(femesh)
+        self.assertEqual(len(before), len(after))
+        for b, a in zip(before, after):
+            self.assertEqual(b, a)
+        os.remove("mesh_save_test")
+
 # Extra test, to make sure the NeumannBC Edit/New bug does not recur.
 # The pathology was, if you create Neumann BCs, then edit the
 # most-recently-created one, the "New" command would fail with an
@@ -921,6 +1112,8 @@ def countMaterials(meshctxt):
 def run_tests():
     basic_set = [
         OOF_Mesh("New"),
+        OOF_Mesh("QuadraticNodes"),
+        OOF_Mesh("InteriorNodesSCPR"),
         OOF_Mesh("Delete"),
         OOF_Mesh("Copy"),
         OOF_Mesh("Rename")
@@ -941,7 +1134,9 @@ def run_tests():
     extra_set = [
         OOF_Mesh_Extra("Copy_Field_State"),
         OOF_Mesh_Extra("Copy_Equation_State"),
-        OOF_Mesh_Extra("Initialize")
+        OOF_Mesh_Extra("Initialize"),
+        OOF_Mesh_Extra("InitializeVector"),
+        OOF_Mesh_Extra("DataCache")
         ]
 
     crosssection_set = [
@@ -972,7 +1167,8 @@ def run_tests():
 #         OOF_Mesh_SaveLoad("ProfileSave"),
 #         OOF_Mesh_SaveLoad("ProfileLoad"),
         OOF_Mesh_SaveLoad("Save"),
-        OOF_Mesh_SaveLoad("Load")
+        OOF_Mesh_SaveLoad("Load"),
+        OOF_Mesh_SaveLoad("BinarySaveLoad")
         ]
 
     bc_extra_set = [
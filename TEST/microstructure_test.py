@@ -204,6 +204,74 @@ class OOF_Microstructure(unittest.TestCase):
         self.assertEqual(ms_0.size(), primitives.Point(2.5, 3.5))
         self.assertEqual(ms_0.sizeOfPixels(), (2.5/10, 3.5/10 ))
 
+    # Skeleton elements find their category areas with an index of
+    # the categories in each 16x16 tile of pixels.  Check the areas
+    # against a pixel by pixel count after pixel group and material
+    # changes that cross tile boundaries.  The elements are 15x15
+    # pixels, so they cross tile boundaries too.
+    @memorycheck.check("small.ppm")
+    def CategoryAreas(self):
+        from ooflib.common import primitives
+        from ooflib.engine import skeletoncontext
+        OOF.Microstructure.Create_From_ImageFile(
+            filename=reference_file("ms_data","small.ppm"),
+            microstructure_name="small.ppm",
+            height=automatic, width=automatic)
+        OOF.Image.AutoGroup(image="small.ppm:small.ppm")
+        OOF.Skeleton.New(
+            name="skeleton", microstructure="small.ppm",
+            x_elements=10, y_elements=10,
+            skeleton_geometry=QuadSkeleton(left_right_periodicity=False,
+                                           top_bottom_periodicity=False))
+        ms = getMicrostructure("small.ppm")
+        skel = skeletoncontext.skeletonContexts[
+            "small.ppm:skeleton"].getObject()
+        def check():
+            ncat = ms.nCategories()
+            dx, dy = ms.sizeOfPixels()
+            isize = ms.sizeInPixels()
+            for el in skel.elements:
+                xs = [n.position().x for n in el.nodes]
+                ys = [n.position().y for n in el.nodes]
+                counts = [0]*ncat
+                for i in range(int(round(min(xs)/dx)),
+                               int(round(max(xs)/dx))):
+                    for j in range(int(round(min(ys)/dy)),
+                                   int(round(max(ys)/dy))):
+                        counts[ms.category(primitives.iPoint(i, j))] += 1
+                areas = el.categoryAreas(ms)
+                self.assertEqual(len(areas), ncat)
+                for count, area in zip(counts, areas):
+                    self.assertAlmostEqual(area, count*dx*dy, 8)
+        check()
+        ncat = ms.nCategories()
+
+        OOF.Windows.Graphics.New()
+        OOF.Graphics_1.Toolbox.Pixel_Select.Rectangle(
+            source="small.ppm:small.ppm",
+            points=[Point(10.5, 12.5), Point(50.5, 40.5)],
+            shift=0, ctrl=0)
+        OOF.PixelGroup.New(name="test", microstructure="small.ppm")
+        OOF.PixelGroup.AddSelection(microstructure="small.ppm", group="test")
+        self.assert_(ms.nCategories() > ncat)
+        check()
+
+        OOF.Graphics_1.Toolbox.Pixel_Select.Rectangle(
+            source="small.ppm:small.ppm",
+            points=[Point(30.5, 20.5), Point(100.5, 70.5)],
+            shift=0, ctrl=0)
+        OOF.Material.New(name="material", material_type="bulk")
+        OOF.Material.Assign(
+            material="material", microstructure="small.ppm",
+            pixels=selection)
+        check()
+
+        OOF.PixelGroup.RemoveSelection(microstructure="small.ppm",
+                                       group="test")
+        check()
+        OOF.Graphics_1.File.Close()
+        OOF.Material.Delete(name="material")
+
     def tearDown(self):
         pass
 
@@ -220,7 +288,8 @@ def run_tests():
         OOF_Microstructure("Copy"),
         OOF_Microstructure("Rename"),
         OOF_Microstructure("Save"),
-        OOF_Microstructure("Load")
+        OOF_Microstructure("Load"),
+        OOF_Microstructure("CategoryAreas")
         ]
 
     logan = unittest.TextTestRunner()
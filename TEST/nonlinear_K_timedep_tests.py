@@ -95,6 +95,23 @@ class NonlinearTimedependentTest(unittest.TestCase):
             absolute_tolerance=1.0e-13,
             maximum_iterations=20)
 
+    def modifiednewton(self):
+        self.nlsolver = ModifiedNewton(
+            relative_tolerance=1e-08,
+            absolute_tolerance=1.0e-13,
+            maximum_iterations=40,
+            jacobian_reuse=5,
+            stall_ratio=0.5)
+
+    def newtonkrylov(self):
+        self.nlsolver = NewtonKrylov(
+            relative_tolerance=1e-08,
+            absolute_tolerance=1.0e-13,
+            maximum_iterations=20,
+            krylov_tolerance=1.e-6,
+            krylov_dimension=30,
+            krylov_max_iterations=200)
+
     def linear(self):
         self.nlsolver = NoNonlinearSolver()
 
@@ -205,6 +222,11 @@ class NonlinearTimedependentTest(unittest.TestCase):
         print >> sys.stderr, "L2 error = %g" % L2_error
         self.assert_((L2_error < tolerance) == expected)
 
+    def solverStats(self):
+        from ooflib.engine import subproblemcontext
+        return subproblemcontext.subproblems[
+            "microstructure:skeleton:mesh:default"].solverStats
+
     def uniformTest(self, stepper, solver, time,
                     nsteps, tolerance,
                     test_no, source_no, soln_no):
@@ -342,6 +364,19 @@ class NonlinearTimedependentTest(unittest.TestCase):
             time=0.1, nsteps=10, tolerance=1.e-4,
             test_no=1, source_no=8, soln_no=9)
 
+    @memorycheck.check("microstructure")
+    def unif189BEnewtonPattern(self):
+        # The nonlinear problem is reassembled on every Newton
+        # iteration.  After the first assembly, the sparsity
+        # patterns should almost always be reused.
+        self.uniformTest(
+            BackwardEuler(), self.newton,
+            time=0.1, nsteps=10, tolerance=1.e-4,
+            test_no=1, source_no=8, soln_no=9)
+        stats = self.solverStats().assemblyStats
+        self.assert_(stats.nrebuilt > 0)
+        self.assert_(stats.nreused > stats.nrebuilt)
+
     @memorycheck.check("microstructure")
     def unif189BEnewtonQS(self):
         # Quasistatic version of the above.  The comparison is still
@@ -395,6 +430,52 @@ class NonlinearTimedependentTest(unittest.TestCase):
             time=0.1, nsteps=10, tolerance=1.e-4,
             test_no=1, source_no=8, soln_no=9)
 
+    @memorycheck.check("microstructure")
+    def unif189BEmodnewton(self):
+        self.uniformTest(
+            BackwardEuler(), self.modifiednewton,
+            time=0.1, nsteps=10, tolerance=1.e-4,
+            test_no=1, source_no=8, soln_no=9)
+        stats = self.solverStats().nonlinearIterationStats
+        self.assert_(stats.nbuilt > 0)
+        self.assert_(stats.nreused > 0)
+
+    @memorycheck.check("microstructure")
+    def unif189CNmodnewton(self):
+        self.uniformTest(
+            CrankNicolson(), self.modifiednewton,
+            time=0.1, nsteps=10, tolerance=1.e-4,
+            test_no=1, source_no=8, soln_no=9)
+        stats = self.solverStats().nonlinearIterationStats
+        self.assert_(stats.nbuilt > 0)
+        self.assert_(stats.nreused > 0)
+
+    @memorycheck.check("microstructure")
+    def unif189BEnewtonkrylov(self):
+        self.uniformTest(
+            BackwardEuler(), self.newtonkrylov,
+            time=0.1, nsteps=10, tolerance=1.e-4,
+            test_no=1, source_no=8, soln_no=9)
+        # The Jacobian is never computed, and every Newton iteration
+        # uses GMRES.
+        stats = self.solverStats().nonlinearIterationStats
+        self.assert_(stats.niters > 0)
+        self.assertEqual(stats.nbuilt + stats.nreused, 0)
+        self.assertEqual(stats.linearIters.n, stats.niters)
+
+    @memorycheck.check("microstructure")
+    def unif189CNnewtonkrylov(self):
+        self.uniformTest(
+            CrankNicolson(), self.newtonkrylov,
+            time=0.1, nsteps=10, tolerance=1.e-4,
+            test_no=1, source_no=8, soln_no=9)
+        # The Jacobian is never computed, and every Newton iteration
+        # uses GMRES.
+        stats = self.solverStats().nonlinearIterationStats
+        self.assert_(stats.niters > 0)
+        self.assertEqual(stats.nbuilt + stats.nreused, 0)
+        self.assertEqual(stats.linearIters.n, stats.niters)
+
     @memorycheck.check("microstructure")
     def unif189FEnewton(self):
         self.uniformTest(
@@ -527,6 +608,7 @@ class NonlinearTimedependentTest(unittest.TestCase):
 def run_tests():
     test_set = [
         NonlinearTimedependentTest("unif189BEnewton"),
+        NonlinearTimedependentTest("unif189BEnewtonPattern"),
         NonlinearTimedependentTest("unif189BEnewtonQS"),
         NonlinearTimedependentTest("unif189BEpicard"),
         NonlinearTimedependentTest("unif189CNnewton"),
@@ -534,6 +616,10 @@ def run_tests():
         NonlinearTimedependentTest("unif189CNpicard"),
         NonlinearTimedependentTest("unif189SSnewton"),
         NonlinearTimedependentTest("unif189SSpicard"),
+        NonlinearTimedependentTest("unif189BEmodnewton"),
+        NonlinearTimedependentTest("unif189CNmodnewton"),
+        NonlinearTimedependentTest("unif189BEnewtonkrylov"),
+        NonlinearTimedependentTest("unif189CNnewtonkrylov"),
 
         NonlinearTimedependentTest("unif189FEnewton"),
         NonlinearTimedependentTest("unif189FElinear"),
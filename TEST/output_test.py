@@ -134,6 +134,17 @@ class OOF_Output(unittest.TestCase):
                     elset.next()
                 for (r1,r2) in zip(reslist, results):
                     self.assert_( (r1-r2)**2 < tolerance )
+
+                # Evaluating a few elements at a time should give the
+                # same results.
+                elements = tuple(meshobj.element_iterator())
+                chunked = list(outputclone.iterate(
+                    meshobj, elements,
+                    [[mastercoord.MasterCoord(0.0,0.0)]]*len(elements),
+                    size=3))
+                self.assertEqual(len(chunked), len(reslist))
+                for (r1,r2) in zip(reslist, chunked):
+                    self.assert_( (r1-r2)**2 < tolerance )
         del meshobj
         OOF.Material.Delete(name='material')
                 
@@ -1085,6 +1096,103 @@ class OOF_PlaneFluxRHS(unittest.TestCase):
                      )
         file_utils.remove('plane_stress_rhs.out')
 
+    # The sample sets evaluate their samples output.chunksize at a
+    # time.  The results must not depend on the chunk size.
+    @memorycheck.check("microstructure")
+    def ChunkedSampling(self):
+        from ooflib.engine.IO import output
+        OOF.Mesh.Solve(mesh='microstructure:skeleton:mesh',
+                       endtime=0.0)
+        OOF.Mesh.Cross_Section.New(
+            name='cs', mesh='microstructure:skeleton:mesh',
+            cross_section=StraightCrossSection(
+                start=Point(0.05,0.1), end=Point(0.95,0.8)))
+        data = getOutput('Flux:Value', flux=Stress)
+        analyses = [
+            (OOF.Mesh.Analyze.Average, EntireMesh(),
+             ElementSampleSet(order=automatic)),
+            (OOF.Mesh.Analyze.Average, EntireMesh(),
+             StatPixelSampleSet()),
+            (OOF.Mesh.Analyze.Direct_Output, EntireMesh(),
+             PixelSampleSet(show_pixel=True, show_x=True, show_y=True)),
+            (OOF.Mesh.Analyze.Average, CrossSectionDomain(cross_section='cs'),
+             StatElementSegmentSampleSet(n_points=3)),
+            (OOF.Mesh.Analyze.Direct_Output,
+             CrossSectionDomain(cross_section='cs'),
+             ElementSegmentSampleSet(n_points=3, show_segment=True,
+                                     show_distance=True, show_fraction=True,
+                                     show_x=True, show_y=True))
+            ]
+        savedsize = output.Output.chunksize
+        try:
+            for filename, size in (('chunk_default.out', savedsize),
+                                   ('chunk_small.out', 3)):
+                output.Output.chunksize = size
+                for analysis, domain, sampling in analyses:
+                    analysis(mesh='microstructure:skeleton:mesh',
+                             time=latest,
+                             data=data,
+                             domain=domain,
+                             sampling=sampling,
+                             destination=OutputStream(filename=filename,
+                                                      mode='a'))
+        finally:
+            output.Output.chunksize = savedsize
+        outputdestination.forgetTextOutputStreams()
+        # fp_file_compare looks for its second argument in the
+        # reference directory unless it's an absolute path.
+        self.assert_(fp_file_compare('chunk_small.out',
+                                     os.path.abspath('chunk_default.out'),
+                                     1.e-12))
+        file_utils.remove('chunk_small.out')
+        file_utils.remove('chunk_default.out')
+
+    # Point samples are evaluated in batches, grouped by element.
+    # Check that the results are the same as evaluating each point by
+    # itself, and are in the original order.  The points are
+    # interleaved, so that grouping them changes their order, and
+    # some are outside of the mesh.
+    @memorycheck.check("microstructure")
+    def PointSamples(self):
+        from ooflib.common import primitives
+        from ooflib.engine import analysissample
+        from ooflib.engine.IO import output
+        OOF.Mesh.Solve(mesh='microstructure:skeleton:mesh',
+                       endtime=0.0)
+        coords = [(0.1, 0.1), (0.9, 0.9), (0.15, 0.12), (0.6, 0.3),
+                  (-0.2, 0.5), (0.88, 0.93), (0.3, 1.4), (0.12, 0.18),
+                  (1.3, -0.1), (0.62, 0.35), (0.4, 0.6), (0.1, 0.14)]
+        data = getOutput('Flux:Value', flux=Stress)
+        domain = EntireMesh()
+        domain.set_mesh('microstructure:skeleton:mesh')
+        femesh = domain.femesh
+        skeleton = domain.skeleton
+        expected = []
+        for x, y in coords:
+            pt = primitives.Point(x, y)
+            el = femesh.enclosingElement(skeleton, pt)
+            val = data.evaluate(femesh, [el], [[el.to_master(pt)]])[0]
+            expected.append(val.value_list())
+        sampling = DiscretePointSampleSet(show_x=True, show_y=True)
+        savedsize = output.Output.chunksize
+        try:
+            for size in (savedsize, 5):
+                output.Output.chunksize = size
+                sampling.sample_list = [
+                    analysissample.PointSample(primitives.Point(x, y))
+                    for x, y in coords]
+                samples = list(sampling.sample_list)
+                results = sampling.evaluate(domain, data)
+                self.assertEqual(len(results), len(coords))
+                for (sample, val), sample0, ref in zip(results, samples,
+                                                       expected):
+                    self.assert_(sample is sample0)
+                    for v, r in zip(val.value_list(), ref):
+                        self.assertAlmostEqual(v, r, 12)
+        finally:
+            output.Output.chunksize = savedsize
+        domain.set_mesh(None)
+
 # Check that the out-of-plane stresses are zero for plane stress.
 # This only checks the *average* stress, because the plane stress
 # condition is only enforced weakly.
@@ -1338,6 +1446,8 @@ def run_tests():
         OOF_Output("ScalarOutputs"),
         OOF_Output("AggregateOutputs"),
         OOF_PlaneFluxRHS("StrainCheck"),
+        OOF_PlaneFluxRHS("ChunkedSampling"),
+        OOF_PlaneFluxRHS("PointSamples"),
         OOF_AnisoPlaneStress("Avg"),
         OOF_BadMaterial("Analyze"),
         OOF_MiscOutput("Range"),
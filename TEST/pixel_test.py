@@ -339,6 +339,69 @@ class Pixel_Groups(unittest.TestCase):
         group = ms.findGroup("test")
         self.assertEqual(len(group), sel_large-sel_small)
 
+    # The group's list of members is rebuilt from its compact storage
+    # when it's asked for.  It should be sorted and identical to the
+    # selection's, and should reflect later changes.
+    @memorycheck.check("small.ppm")
+    def Members(self):
+        OOF.PixelGroup.New(name="test", microstructure="small.ppm")
+        ms = microstructure.getMicrostructure("small.ppm")
+        ps = pixelselection.pixelselectionWhoClass['small.ppm']
+        OOF.Graphics_1.Toolbox.Pixel_Select.Circle(
+            source="small.ppm:small.ppm",
+            points=[Point(66.0,55.0), Point(87.6,41.8)],
+            shift=0,ctrl=0)
+        OOF.PixelGroup.AddSelection(
+            microstructure="small.ppm", group="test")
+        group = ms.findGroup("test")
+        selpxls = [(p.x, p.y) for p in ps.getObject().members()]
+        grppxls = [(p.x, p.y) for p in group.members()]
+        self.assertEqual(grppxls, sorted(selpxls))
+        self.assertEqual(grppxls, [(p.x, p.y) for p in group])
+        OOF.PixelGroup.AddSelection(
+            microstructure="small.ppm", group="test")
+        self.assertEqual(len(group), len(selpxls))
+        OOF.PixelGroup.RemoveSelection(
+            microstructure="small.ppm", group="test")
+        self.assertEqual(len(group), 0)
+        self.assertEqual(len(group.members()), 0)
+        OOF.Graphics_1.Toolbox.Pixel_Select.Clear(
+            source="small.ppm:small.ppm")
+
+    # Adding pixels to and removing pixels from a group only
+    # recategorizes the changed pixels.  Check that the result is the
+    # same as recategorizing the whole Microstructure.
+    @memorycheck.check("small.ppm")
+    def Recategorize(self):
+        from ooflib.common import primitives
+        OOF.Image.AutoGroup(image="small.ppm:small.ppm")
+        OOF.PixelGroup.New(name="test", microstructure="small.ppm")
+        ms = microstructure.getMicrostructure("small.ppm")
+        size = ms.sizeInPixels()
+        def categories():
+            return (ms.nCategories(),
+                    [ms.category(primitives.iPoint(i, j))
+                     for i in range(size[0]) for j in range(size[1])])
+        ncats0 = ms.nCategories()
+        OOF.Graphics_1.Toolbox.Pixel_Select.Circle(
+            source="small.ppm:small.ppm",
+            points=[Point(66.0,55.0), Point(87.6,41.8)],
+            shift=0,ctrl=0)
+        OOF.PixelGroup.AddSelection(
+            microstructure="small.ppm", group="test")
+        OOF.Graphics_1.Toolbox.Pixel_Select.Circle(
+            source="small.ppm:small.ppm",
+            points=[Point(66.0,55.0), Point(80.0,41.5)],
+            shift=0,ctrl=0)
+        OOF.PixelGroup.RemoveSelection(
+            microstructure="small.ppm", group="test")
+        OOF.Graphics_1.Toolbox.Pixel_Select.Clear(
+            source="small.ppm:small.ppm")
+        incremental = categories()
+        self.assert_(incremental[0] > ncats0)
+        ms.recategorize()
+        self.assertEqual(incremental, categories())
+
     @memorycheck.check("small.ppm")
     def Copy(self):
         ms = microstructure.getMicrostructure("small.ppm")
@@ -413,6 +476,56 @@ class Pixel_Groups(unittest.TestCase):
                     key = c
                     diff = cdiff
             self.assertEqual(len(ms.findGroup(name)), expected_sizes[key])
+
+    # Image.AutoGroup and PixelGroup.AutoGroup create their groups in
+    # parallel when OpenMP is enabled.  Run them with one thread and
+    # with the default number of threads on two copies of the
+    # Microstructure, and check that the groups and their members are
+    # the same.  PixelGroup.AutoGroup shuffles the pixels, so the
+    # random seed is reset before each run.  minsize=0 skips the
+    # randomized removal of small groups.
+    @memorycheck.check("small.ppm", "parallel")
+    def ParallelAutoGroup(self):
+        from ooflib.SWIG.common import config
+        from ooflib.SWIG.common import threadstate
+        if not config.enable_openmp():
+            return
+        OOF.Microstructure.Create_From_ImageFile(
+            filename=reference_file("ms_data","small.ppm"),
+            microstructure_name="parallel",
+            height=automatic, width=automatic)
+        def groupMembers(msname, prefix):
+            ms = microstructure.getMicrostructure(msname)
+            return dict((name, [(p.x, p.y)
+                                for p in ms.findGroup(name).members()])
+                        for name in ms.groupNames()
+                        if name.startswith(prefix))
+        def autogroup(msname):
+            OOF.Image.AutoGroup(image=msname+":small.ppm",
+                                name_template="auto_%n")
+            return groupMembers(msname, "auto_")
+        def statgroup(msname):
+            OOF.Settings.Random_Seed(seed=17)
+            OOF.PixelGroup.AutoGroup(
+                grouper=ColorGrouper(image=msname+":small.ppm",
+                                     sigma0=0.002),
+                delta=2.0, gamma=2.0, minsize=0, contiguous=True,
+                name_template="stat_%n", clear=True)
+            return groupMembers(msname, "stat_")
+
+        threadstate.setOpenMPThreads(1)
+        try:
+            serialauto = autogroup("small.ppm")
+            serialstat = statgroup("small.ppm")
+        finally:
+            threadstate.setOpenMPThreads(0)
+        parallelauto = autogroup("parallel")
+        parallelstat = statgroup("parallel")
+
+        self.assertEqual(len(serialauto), 8)
+        self.assertEqual(serialauto, parallelauto)
+        self.assert_(len(serialstat) > 0)
+        self.assertEqual(serialstat, parallelstat)
         
                             
 
@@ -746,10 +859,13 @@ def run_tests():
         Direct_Pixel_Selection("Clear"),
         Direct_Pixel_Selection("Invert"),
         Pixel_Groups("AutoGroup"),
+        Pixel_Groups("ParallelAutoGroup"),
         Pixel_Groups("New"),
         Pixel_Groups("Delete"),
         Pixel_Groups("AddSelection"),
         Pixel_Groups("RemoveSelection"),
+        Pixel_Groups("Members"),
+        Pixel_Groups("Recategorize"),
         Pixel_Groups("Copy"),
         Pixel_Groups("Rename"),
         Selection_Modify("Undo"),
@@ -19,7 +19,11 @@ file_utils.generate = False
 class OOF_PoleFigureTest(unittest.TestCase):
     def setUp(self):
         global colormap
+        global microstructure
+        global primitives
         from ooflib.common.IO import colormap
+        from ooflib.common import microstructure
+        from ooflib.common import primitives
     def tearDown(self):
         OOF.Material.Delete(name='material')
 
@@ -149,12 +153,30 @@ class OOF_PoleFigureTest(unittest.TestCase):
         self.checkPoleFigures('orientmap2', nBins=60,
                               colorMap=colormap.SpectralMap())
 
+    @memorycheck.check("microstructure")
+    def TSLFromMap1(self):
+        # The TSL reader should produce the same map as the generic
+        # reader, and put all of the pixels in the phase group.
+        OOF.Microstructure.Create_From_OrientationMap_File(
+            filename=reference_file('polefigure_data', 'orientmap1.tsl'),
+            reader=TSLreader(flip_x=False, flip_y=True, angle_offset=0),
+            microstructure='microstructure')
+        ms = microstructure.getMicrostructure('microstructure')
+        self.assertEqual(ms.sizeInPixels(), primitives.iPoint(100, 100))
+        self.assertEqual(len(ms.findGroup('Simulinium')), 100*100)
+        OOF.Material.New(name='material', material_type='bulk')
+        OOF.Material.Add_property(name='material', property='OrientationMap')
+        OOF.Material.Assign(
+            material='material', microstructure='microstructure', pixels=every)
+        self.checkPoleFigures('orientmap1')
+
 def run_tests():
     test_set = [
         OOF_PoleFigureTest("FromMap0"),
         OOF_PoleFigureTest("FromProperty0"),
         OOF_PoleFigureTest("FromMap1"),
-        OOF_PoleFigureTest("FromMap2")
+        OOF_PoleFigureTest("FromMap2"),
+        OOF_PoleFigureTest("TSLFromMap1")
         ]
 
     logan = unittest.TextTestRunner()
@@ -281,13 +281,57 @@ class OOF_PyProperties(unittest.TestCase):
         file_utils.remove('pyprop.out')
 
 
+    #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+    # The C++ Isotropic elasticity Property computes its flux matrix
+    # at all of an element's gauss points at once.  The Python
+    # version is evaluated one point at a time.  The stiffness
+    # matrices must agree.
+    @memorycheck.check('microstructure')
+    def BatchedAssembly(self):
+        from ooflib.engine import mesh
+        OOF.Subproblem.Field.Define(
+            subproblem='microstructure:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Subproblem.Field.Activate(
+            subproblem='microstructure:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Mesh.Field.In_Plane(
+            mesh='microstructure:skeleton:mesh',
+            field=Displacement)
+        OOF.Subproblem.Equation.Activate(
+            subproblem='microstructure:skeleton:mesh:default',
+            equation=Force_Balance)
+        OOF.Property.Parametrize.Mechanical.Elasticity.Isotropic(
+            cijkl=IsotropicRank4TensorCij(c11=1.0,c12=0.5))
+        meshctxt = mesh.meshes['microstructure:skeleton:mesh']
+        subpctxt = meshctxt.get_default_subproblem()
+        def stiffness(prop):
+            OOF.Material.Add_property(name='material', property=prop)
+            meshctxt.solver_precompute(solving=True)
+            linsys = subpctxt.make_linear_system(0.0, None)
+            K = linsys.K_MCK().clone()
+            OOF.Material.Remove_property(name='material', property=prop)
+            return K
+        Kpy = stiffness('Mechanical:Elasticity:PyIsotropic')
+        Kcpp = stiffness('Mechanical:Elasticity:Isotropic')
+        self.assertEqual(Kpy.nrows(), Kcpp.nrows())
+        self.assertEqual(Kpy.ncols(), Kcpp.ncols())
+        self.assert_(Kpy.norm() > 0.0)
+        Kcpp.add(-1.0, Kpy)
+        self.assert_(Kcpp.norm() < 1.e-10*Kpy.norm())
+        del Kpy, Kcpp
+        OOF.Material.Delete(name="material")
+
+
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
 def run_tests():
     
     test_set = [OOF_PyProperties("HeatConductivity"),
                 OOF_PyProperties("Elasticity"),
-                OOF_PyProperties("StressFreeStrain")]
+                OOF_PyProperties("StressFreeStrain"),
+                OOF_PyProperties("BatchedAssembly")]
 
     logan = unittest.TextTestRunner()
     for t in test_set:
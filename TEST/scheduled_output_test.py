@@ -161,7 +161,8 @@ class OOF_ScheduledOutput(unittest.TestCase):
             mesh='microstructure:skeleton:mesh',
             endtime=1.0)
 
-    def setScheduleAndDestination(self, outputname, filename, interval=0.1):
+    def setScheduleAndDestination(self, outputname, filename, interval=0.1,
+                                  destclass=OutputStream):
         OOF.Mesh.Scheduled_Output.Schedule.Set(
             mesh='microstructure:skeleton:mesh',
             output=outputname, 
@@ -170,7 +171,7 @@ class OOF_ScheduledOutput(unittest.TestCase):
         OOF.Mesh.Scheduled_Output.Destination.Set(
             mesh='microstructure:skeleton:mesh',
             output=outputname, 
-            destination=OutputStream(filename=filename,mode='w'))
+            destination=destclass(filename=filename,mode='w'))
         
     def rewind(self):
         OOF.Mesh.Scheduled_Output.Destination.RewindAll(
@@ -427,6 +428,45 @@ class OOF_ScheduledOutput(unittest.TestCase):
                 1.e-8))
         self.rewind()
         file_utils.remove('test.dat')
+
+    @memorycheck.check('microstructure')
+    def ColumnFile(self):
+        # Send the same output to a text file and a column file, and
+        # check that the column file contains one chunk per time step
+        # with the same data.
+        from ooflib.engine.IO import columnfile
+        self.scheduleUnnamedVectorFluxNormal('test.dat', 0.1)
+        OOF.Mesh.Scheduled_Output.New(
+            mesh='microstructure:skeleton:mesh',
+            name='vfn-cols',
+            output=BoundaryAnalysis(
+                operation=IntegrateBdyFlux(flux=Heat_Flux),
+                boundary='top'))
+        self.setScheduleAndDestination('vfn-cols', 'test.cols', 0.1,
+                                       ColumnOutputStream)
+        self.solve()
+        self.assert_(file_utils.fp_file_compare(
+                'test.dat',
+                os.path.join('mesh_data', 'vectorfluxoutput.dat'),
+                1.e-8))
+        cfile = columnfile.ColumnFile('test.cols')
+        times = cfile.times()
+        self.assertEqual(len(times), 11)
+        textrows = [map(float, line.split(','))
+                    for line in open('test.dat') if line[0] != '#']
+        for t, row in zip(times, textrows):
+            chunks = cfile.chunks(t)
+            self.assertEqual(len(chunks), 1)
+            chunk = chunks[0]
+            self.assertEqual(chunk.names, ['time', 'normal(Heat_Flux)'])
+            self.assertEqual(chunk.nrows(), 1)
+            self.assertAlmostEqual(chunk.time, row[0], 8)
+            for x, y in zip(chunk.rows()[0], row):
+                self.assertAlmostEqual(x, y, 8)
+        cfile.close()
+        self.rewind()
+        file_utils.remove('test.dat')
+        file_utils.remove('test.cols')
         
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
@@ -452,7 +492,8 @@ def run_tests():
         OOF_ScheduledOutput("TwoSeparateNamed"),
         OOF_ScheduledOutput("TwoTogetherUnnamed"),
         OOF_ScheduledOutput("TwoTogetherNamed"),
-        OOF_ScheduledOutput("TwoTogetherAsync")
+        OOF_ScheduledOutput("TwoTogetherAsync"),
+        OOF_ScheduledOutput("ColumnFile")
         ]
 
     logan = unittest.TextTestRunner()
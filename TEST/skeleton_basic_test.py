@@ -461,6 +461,53 @@ class OOF_Skeleton_Special(unittest.TestCase):
                     "h=", h, "delta=", h-h0
                 self.assertAlmostEqual(h0, h, 2)
 
+
+    # Check that the spatial index used by enclosingElement finds the
+    # same elements as a brute force search, before and after a node
+    # is moved.
+    @memorycheck.check("skeltest")
+    def EnclosingElement(self):
+        from ooflib.common import primitives
+        OOF.Microstructure.New(name='skeltest',
+                               width=20.0, height=20.0,
+                               width_in_pixels=20, height_in_pixels=20)
+        OOF.Skeleton.New(
+            name="skeleton", microstructure="skeltest",
+            x_elements=8, y_elements=8,
+            skeleton_geometry=TriSkeleton(arrangement="moderate",
+                                          top_bottom_periodicity=False,
+                                          left_right_periodicity=False))
+        skelctxt = skeletoncontext.skeletonContexts["skeltest:skeleton"]
+        skel = skelctxt.getObject()
+        # Several points in each element, so that enclosingElements
+        # reuses its earlier results, and some that are far apart.
+        points = [primitives.Point((i+0.31)*0.625, (j+0.57)*0.625)
+                  for i in range(32) for j in range(32)]
+        points += [primitives.Point(((7*k)%32+0.43)*0.625,
+                                    ((11*k)%32+0.29)*0.625)
+                   for k in range(32)]
+        def check():
+            found = skel.enclosingElements(points)
+            self.assertEqual(len(found), len(points))
+            for pt, el in zip(points, found):
+                self.assert_(el.interior(pt))
+                inside = [e for e in skel.elements if e.interior(pt)]
+                self.assertEqual(inside, [el])
+                self.assert_(skel.enclosingElement(pt) is el)
+        check()
+        # Move an interior node and check again.  Moving the node
+        # keeps the node hash, and the element index isn't rebuilt
+        # until it's used.
+        node = skel.nearestNode(primitives.Point(10.0, 10.0))
+        hashed = skel.hashedNodes
+        index = skel.elementIndex()
+        skel.moveNodeTo(node, primitives.Point(10.6, 9.7))
+        self.assert_(skel.hashedNodes is hashed)
+        self.assert_(skel._elementIndex is index)
+        check()
+        self.assert_(skel.elementIndex() is not index)
+        skel.moveNodeBack(node)
+        check()
         
 # Data for the skeleton modifier tests.  This is a dictionary indexed by
 # skeleton modifier name, and for each modifier, there is a set of
@@ -694,6 +741,7 @@ def run_tests():
         OOF_Skeleton_Special("RoundOff"),
         OOF_Skeleton_Special("CheckerBoard"),
         OOF_Skeleton_Special("MessyHomogeneity"),
+        OOF_Skeleton_Special("EnclosingElement"),
         ]
 
     test_set = skel_set + special_set
@@ -96,6 +96,200 @@ class OOF_Skeleton_Extra(unittest.TestCase):
         os.remove("skeleton_pinned_test")
         OOF.Skeleton.Delete(skeleton="skeltest:skelextra")
 
+    # Node moving modifiers create DeputySkeletons, each of which
+    # stores only the nodes that it moved.  Check that undo and redo
+    # restore the node positions of each step.
+    @memorycheck.check("skeltest")
+    def DeputyHistory(self):
+        import random
+        from ooflib.SWIG.common import crandom
+        random.seed(17)
+        crandom.rndmseed(17)
+        def positions():
+            skel = self.sk_context.getObject()
+            return [(n.position().x, n.position().y) for n in skel.nodes]
+        history = [positions()]
+        for i in range(3):
+            OOF.Skeleton.Modify(
+                skeleton="skeltest:skelextra",
+                modifier=Anneal(targets=AllNodes(),
+                                criterion=AverageEnergy(alpha=0.5),
+                                T=0.0, delta=1.0,
+                                iteration=FixedIteration(iterations=2)))
+            history.append(positions())
+        deputy = self.sk_context.getObject()
+        self.assert_(deputy.isDeputy())
+        self.assert_(deputy.base.base.isDeputy())
+        self.assertEqual(deputy.base.base.base, None)
+        self.assertNotEqual(history[0], history[3])
+        for i in (2, 1, 0):
+            OOF.Skeleton.Undo(skeleton="skeltest:skelextra")
+            self.assertEqual(positions(), history[i])
+        OOF.Skeleton.Redo(skeleton="skeltest:skelextra")
+        OOF.Skeleton.Redo(skeleton="skeltest:skelextra")
+        self.assertEqual(positions(), history[2])
+        # The positions in an inactive deputy are still available.
+        skel = self.sk_context.getObject()
+        self.assertEqual(
+            [(p.x, p.y) for p in [deputy.nodePosition(n)
+                                  for n in skel.nodes]],
+            history[3])
+        OOF.Skeleton.Redo(skeleton="skeltest:skelextra")
+        self.assertEqual(positions(), history[3])
+        OOF.Skeleton.Delete(skeleton="skeltest:skelextra")
+
+    # SnapNodes finds all the transition points with one call to
+    # CMicrostructure.transitionPoints.  Check that it agrees with
+    # the single segment version.
+    @memorycheck.check("skeltest")
+    def TransitionPoints(self):
+        skel = self.sk_context.getObject()
+        endpoints = []
+        expected = []
+        for element in skel.elements:
+            for n, nodes in enumerate(element.segment_node_iterator()):
+                endpoints.extend([nodes[0].position(), nodes[1].position()])
+                expected.append(element.transitionPoint(skel, n))
+        tps = skel.MS.transitionPoints(endpoints)
+        self.assertEqual(len(tps), len(expected))
+        self.assertEqual(tps, expected)
+        self.assertNotEqual(tps.count(None), len(tps))
+        OOF.Skeleton.Delete(skeleton="skeltest:skelextra")
+
+    # Anneal and Smooth evaluate the moves of independent nodes at
+    # once, but the results must be the same as moving the nodes one
+    # at a time in the shuffled order, as was done originally.
+    # sequentialFiddle does that, using DeputyProvisionalChanges.
+    def sequentialFiddle(self, movedPosition, criterion, T):
+        import math, random
+        from ooflib.engine import deputy
+        skel = self.sk_context.getObject()
+        nodes = [n for n in skel.activeNodes() if n.movable()]
+        random.shuffle(nodes)
+        for node in nodes:
+            change = deputy.DeputyProvisionalChanges()
+            change.moveNode(node, movedPosition(skel, node), skel)
+            bestchange = criterion([change], skel)
+            if bestchange is not None:
+                bestchange.accept(skel)
+            elif (T > 0.0 and not change.illegal(skel) and
+                  not criterion.hopeless()):
+                diffE = change.deltaE(skel, criterion.alpha)
+                if math.exp(-diffE/T) > random.random():
+                    change.accept(skel)
+
+    def compareFiddle(self, modifier, movedPosition, criterion, T):
+        import random
+        from ooflib.SWIG.common import crandom
+        def positions():
+            skel = self.sk_context.getObject()
+            return [(n.position().x, n.position().y) for n in skel.nodes]
+        before = positions()
+        random.seed(17)
+        crandom.rndmseed(17)
+        OOF.Skeleton.Modify(skeleton="skeltest:skelextra",
+                            modifier=modifier)
+        batched = positions()
+        OOF.Skeleton.Undo(skeleton="skeltest:skelextra")
+        self.assertEqual(positions(), before)
+        random.seed(17)
+        crandom.rndmseed(17)
+        self.sequentialFiddle(movedPosition, criterion, T)
+        sequential = positions()
+        self.assertNotEqual(sequential, before)
+        for p0, p1 in zip(batched, sequential):
+            self.assertAlmostEqual(p0[0], p1[0], 10)
+            self.assertAlmostEqual(p0[1], p1[1], 10)
+        OOF.Skeleton.Delete(skeleton="skeltest:skelextra")
+
+    @memorycheck.check("skeltest")
+    def AnnealSequential(self):
+        from ooflib.engine import fiddlenodesmethods
+        self.compareFiddle(
+            Anneal(targets=AllNodes(), criterion=AverageEnergy(alpha=0.5),
+                   T=0.0, delta=1.0,
+                   iteration=FixedIteration(iterations=1)),
+            fiddlenodesmethods.AnnealMovePosition(1.0),
+            AverageEnergy(alpha=0.5), 0.0)
+
+    @memorycheck.check("skeltest")
+    def AnnealSequentialT(self):
+        from ooflib.engine import fiddlenodesmethods
+        self.compareFiddle(
+            Anneal(targets=AllNodes(), criterion=AverageEnergy(alpha=0.5),
+                   T=0.01, delta=1.0,
+                   iteration=FixedIteration(iterations=1)),
+            fiddlenodesmethods.AnnealMovePosition(1.0),
+            AverageEnergy(alpha=0.5), 0.01)
+
+    @memorycheck.check("skeltest")
+    def SmoothSequential(self):
+        from ooflib.engine import fiddlenodesmethods
+        self.compareFiddle(
+            Smooth(targets=AllNodes(), criterion=AverageEnergy(alpha=0.3),
+                   T=0.0, iteration=FixedIteration(iterations=1)),
+            fiddlenodesmethods.SmoothMovePosition(),
+            AverageEnergy(alpha=0.3), 0.0)
+
+    # In 2D the new nodes on the marked edges, their periodic
+    # partners, and the parents of the new segments are computed by
+    # crefine.CRefinement.  Check them on a periodic Skeleton.  The
+    # boundaries are mapped to the refined Skeleton through the
+    # segment parents.
+    @memorycheck.check("skeltest")
+    def RefinePeriodic(self):
+        OOF.Skeleton.New(
+            name="skelper",
+            microstructure="skeltest",
+            x_elements=4, y_elements=4,
+            skeleton_geometry=QuadSkeleton(left_right_periodicity=True,
+                                           top_bottom_periodicity=True))
+        context = skeletoncontext.skeletonContexts["skeltest:skelper"]
+        bdynames = ('top', 'bottom', 'left', 'right')
+        oldsizes = [context.edgeboundaries[name].current_size()
+                    for name in bdynames]
+        OOF.Skeleton.Modify(
+            skeleton="skeltest:skelper",
+            modifier=Refine(targets=CheckAllElements(),
+                            criterion=Unconditionally(),
+                            degree=Bisection(rule_set="conservative"),
+                            alpha=0.3))
+        skel = context.getObject()
+        self.assert_(skel.sanity_check())
+        self.assertEqual(skel.nelements(), 64)
+        for name, oldsize in zip(bdynames, oldsizes):
+            bdy = context.edgeboundaries[name].current_boundary()
+            self.assertEqual(bdy.size(), 2*oldsize)
+            edges = bdy.edges
+            for e0, e1 in zip(edges[:-1], edges[1:]):
+                self.assert_(e0.get_nodes()[1] is e1.get_nodes()[0])
+        # Every node on the left and bottom edges has a partner on the
+        # opposite edge, including the new ones.
+        for node in skel.nodes:
+            pos = node.position()
+            if pos.x == 0.0:
+                self.assert_([p for p in node.getPartners()
+                              if p.position().x == 20.0
+                              and p.position().y == pos.y])
+            if pos.y == 0.0:
+                self.assert_([p for p in node.getPartners()
+                              if p.position().y == 20.0
+                              and p.position().x == pos.x])
+        # Every segment on an old segment has that segment as its
+        # parent.
+        for segment in skel.segments.values():
+            n0, n1 = segment.nodes()
+            p0, p1 = n0.position(), n1.position()
+            if (p0.x == p1.x and p0.x % 5.0 == 0.0) or \
+               (p0.y == p1.y and p0.y % 5.0 == 0.0):
+                parents = segment.getParents()
+                self.assertEqual(len(parents), 1)
+                self.assert_(segment in parents[0].getChildren())
+            else:
+                self.assertEqual(segment.getParents(), [])
+        OOF.Skeleton.Delete(skeleton="skeltest:skelper")
+        OOF.Skeleton.Delete(skeleton="skeltest:skelextra")
+
     # Save with nontrivial groups and pinned nodes.  Since no node
     # movement occurs, and selections are made unambiguously, direct
     # file comparison should still be OK.
@@ -478,6 +672,13 @@ def run_tests():
 
     test_set = [
         OOF_Skeleton_Extra("PinnedModify"),
+        OOF_Skeleton_Extra("DeputyHistory"),
+        OOF_Skeleton_Extra("TransitionPoints"),
+        OOF_Skeleton_Extra("AnnealSequential"),
+        OOF_Skeleton_Extra("AnnealSequentialT"),
+        OOF_Skeleton_Extra("SmoothSequential"),
+        OOF_Skeleton_Extra("RefineBatches"),
+        OOF_Skeleton_Extra("RefinePeriodic"),
         OOF_Skeleton_Extra("RichSave"),
         OOF_Skeleton_Extra("RichLoad"),
         OOF_Skeleton_Extra("Commutativity"),
@@ -1866,6 +1866,271 @@ class OOF_ElasticPlaneStressPlaneStrainExact(SaveableMeshTest):
 
 #=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
 
+# Compare the AlgebraicMultigrid preconditioner to ILU on the
+# stiffness matrix of an elastic square that's fixed on the left and
+# displaced vertically on the right.  The matrices are solved
+# directly, instead of with Mesh.Solve, so that the iteration counts
+# can be compared.
+
+class OOF_AMGElastic(unittest.TestCase):
+    def setUp(self):
+        global mesh, preconditioner, matrixmethod, doublevec
+        from ooflib.engine import mesh
+        from ooflib.engine import preconditioner
+        from ooflib.engine import matrixmethod
+        from ooflib.SWIG.common import doublevec
+        OOF.Material.New(
+            name='material', material_type='bulk')
+        OOF.Property.Copy(
+            property='Mechanical:Elasticity:Isotropic',
+            new_name='amg')
+        OOF.Property.Parametrize.Mechanical.Elasticity.Isotropic.amg(
+            cijkl=IsotropicRank4TensorEnu(young=1.0, poisson=0.3))
+        OOF.Material.Add_property(
+            name='material', property='Mechanical:Elasticity:Isotropic:amg')
+
+    def tearDown(self):
+        OOF.Property.Delete(property='Mechanical:Elasticity:Isotropic:amg')
+        OOF.Material.Delete(name="material")
+
+    # Create an n x n Mesh with fields, equations, and boundary
+    # conditions, and return its MeshContext.
+    def buildMesh(self, n):
+        OOF.Microstructure.New(
+            name='amg',
+            width=1.0, height=1.0, width_in_pixels=n, height_in_pixels=n)
+        OOF.Material.Assign(
+            material='material', microstructure='amg', pixels=all)
+        OOF.Skeleton.New(
+            name='skeleton', microstructure='amg',
+            x_elements=n, y_elements=n,
+            skeleton_geometry=QuadSkeleton(left_right_periodicity=False,
+                                           top_bottom_periodicity=False))
+        OOF.Mesh.New(
+            name='mesh', skeleton='amg:skeleton',
+            element_types=['D2_2', 'T3_3', 'Q4_4'])
+        OOF.Subproblem.Field.Define(
+            subproblem='amg:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Subproblem.Field.Activate(
+            subproblem='amg:skeleton:mesh:default',
+            field=Displacement)
+        OOF.Mesh.Field.In_Plane(
+            mesh='amg:skeleton:mesh',
+            field=Displacement)
+        OOF.Subproblem.Equation.Activate(
+            subproblem='amg:skeleton:mesh:default',
+            equation=Force_Balance)
+        for name, comp, bdy, value in (('leftx', 'x', 'left', 0.0),
+                                       ('lefty', 'y', 'left', 0.0),
+                                       ('righty', 'y', 'right', 0.1)):
+            OOF.Mesh.Boundary_Conditions.New(
+                name=name,
+                mesh='amg:skeleton:mesh',
+                condition=DirichletBC(
+                    field=Displacement,field_component=comp,
+                    equation=Force_Balance,eqn_component=comp,
+                    profile=ConstantProfile(value=value),boundary=bdy))
+        return mesh.meshes['amg:skeleton:mesh']
+
+    # Return the stiffness matrix, rhs, and near nullspace for an n x
+    # n mesh.
+    def stiffness(self, n):
+        meshctxt = self.buildMesh(n)
+        subpctxt = meshctxt.get_default_subproblem()
+        meshctxt.solver_precompute(solving=True)
+        linsys = subpctxt.make_linear_system(0.0, None)
+        K = linsys.K_MCK().clone()
+        rhs = linsys.rhs_MCK()
+        nullspace = subpctxt.nearNullspace
+        self.assertEqual(nullspace.size(), K.nrows())
+        self.assertEqual(nullspace.nmodes(), 3)
+        del linsys, subpctxt, meshctxt
+        OOF.Microstructure.Delete(microstructure='amg')
+        return K, rhs, nullspace
+
+    def solve(self, K, rhs, pc, nullspace):
+        solver = matrixmethod.ConjugateGradient(pc, 1.e-10, 1000)
+        solver.setNearNullspace(nullspace)
+        solution = doublevec.DoubleVec(0)
+        niters, residual = solver.solveMatrix(K, rhs, solution)
+        return niters, solution
+
+    @memorycheck.check()
+    def Iterations(self):
+        amgIters = []
+        scalarIters = []
+        for n in (16, 32):
+            K, rhs, nullspace = self.stiffness(n)
+            iluIter, ilu = self.solve(
+                K, rhs, preconditioner.ILUPreconditioner(), None)
+            amgIter, amg = self.solve(
+                K, rhs, preconditioner.AMGPreconditioner(), nullspace)
+            scalarIter, scalar = self.solve(
+                K, rhs, preconditioner.AMGPreconditioner(), None)
+            print >> sys.stderr, "%dx%d mesh: ILU %d, AMG %d," \
+                " AMG without rigid body modes %d iterations" % (
+                    n, n, iluIter, amgIter, scalarIter)
+            # All three preconditioners lead to the same solution.
+            self.assert_((amg - ilu).norm() < 1.e-8*ilu.norm())
+            self.assert_((scalar - ilu).norm() < 1.e-8*ilu.norm())
+            amgIters.append(amgIter)
+            scalarIters.append(scalarIter)
+        # Aggregating nodes and using the rigid body modes is better
+        # than aggregating scalar unknowns, and the number of
+        # iterations hardly grows with the size of the mesh.
+        for amgIter, scalarIter in zip(amgIters, scalarIters):
+            self.assert_(amgIter < scalarIter)
+        self.assert_(amgIters[1] <= 1.5*amgIters[0])
+        self.assert_(amgIters[1] - amgIters[0] <
+                     scalarIters[1] - scalarIters[0])
+
+# Check that the stiffness matrix is the same whether or not the
+# Mesh's ShapeFunctionStore is used, and that the store is filled,
+# reused, trimmed to its memory budget, and invalidated when a node
+# moves.  With a budget of zero only the single element
+# ShapeFunctionCache is used.
+
+class OOF_ShapeFunctionStore(OOF_AMGElastic):
+    def tearDown(self):
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=0.0)
+        OOF_AMGElastic.tearDown(self)
+
+    def computeK(self, subpctxt):
+        linsys = subpctxt.make_linear_system(0.0, None)
+        return linsys.K_MCK().clone()
+
+    def assertSameMatrix(self, K, Kref):
+        diff = K.clone()
+        diff.add(-1.0, Kref)
+        self.assert_(diff.norm() < 1.e-12*Kref.norm())
+
+    @memorycheck.check("amg")
+    def Budget(self):
+        # A 32x32 Mesh has 1024 Elements, which is four blocks.
+        meshctxt = self.buildMesh(32)
+        subpctxt = meshctxt.get_default_subproblem()
+        meshctxt.solver_precompute(solving=True)
+        femesh = meshctxt.getObject()
+        store = femesh.shapefunction_store()
+
+        # Reference values, without the store.
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=0.0)
+        Kref = self.computeK(subpctxt)
+        self.assertEqual(store.nblocks(), 0)
+        self.assertEqual(store.misses(), 0)
+
+        # A large budget keeps everything.  The second pass doesn't
+        # recompute anything.
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=100.0)
+        self.assertSameMatrix(self.computeK(subpctxt), Kref)
+        self.assertEqual(store.nblocks(), 4)
+        self.assertEqual(store.evictions(), 0)
+        misses = store.misses()
+        hits = store.hits()
+        self.assert_(misses > 0)
+        self.assertSameMatrix(self.computeK(subpctxt), Kref)
+        self.assertEqual(store.misses(), misses)
+        self.assert_(store.hits() > hits)
+        self.assertEqual(store.evictions(), 0)
+
+        # A budget smaller than two blocks forces the store to discard
+        # blocks and recompute them.
+        budget = 0.4*store.bytes()/(1024.*1024.)
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=budget)
+        self.assertSameMatrix(self.computeK(subpctxt), Kref)
+        self.assert_(store.evictions() > 0)
+        self.assert_(store.nblocks() < 4)
+        self.assert_(store.bytes() <= budget*1024*1024)
+        self.assertSameMatrix(self.computeK(subpctxt), Kref)
+        self.assert_(store.misses() > misses)
+
+        # Moving a node invalidates the stored values.
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=100.0)
+        self.computeK(subpctxt)
+        self.assertEqual(store.nblocks(), 4)
+        node = femesh.closestNode(0.5, 0.5)
+        femesh.move_node(node, Point(0.51, 0.5))
+        misses = store.misses()
+        Kmoved = self.computeK(subpctxt)
+        self.assert_(store.misses() > misses)
+        OOF.Settings.Mesh_Defaults.Shape_Function_Storage(budget=0.0)
+        self.assertSameMatrix(self.computeK(subpctxt), Kmoved)
+        diff = Kmoved.clone()
+        diff.add(-1.0, Kref)
+        self.assert_(diff.norm() > 1.e-6*Kref.norm())
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
+# Check that the K, C, and M matrices and the rhs are the same whether
+# the elements are assembled by color or with a copy of the matrices
+# for each thread.  Colored assembly is only used when OpenMP is
+# enabled and there's more than one thread.  Interface elements are
+# checked in interface_test.py.
+
+class OOF_ColoredAssembly(OOF_AMGElastic):
+    def setUp(self):
+        OOF_AMGElastic.setUp(self)
+        for prop in ('Mechanical:MassDensity:ConstantMassDensity',
+                     'Mechanical:ForceDensity:ConstantForceDensity',
+                     'Thermal:Conductivity:Isotropic',
+                     'Thermal:HeatCapacity:ConstantHeatCapacity'):
+            OOF.Material.Add_property(name='material', property=prop)
+
+    def tearDown(self):
+        from ooflib.common import config
+        if config.enable_openmp():
+            OOF.Settings.Parallel_Assembly(colored=False)
+        OOF_AMGElastic.tearDown(self)
+
+    def assemble(self, subpctxt, colored):
+        OOF.Settings.Parallel_Assembly(colored=colored)
+        linsys = subpctxt.make_linear_system(0.0, None)
+        return (linsys.K_MCK().clone(), linsys.C_MCK().clone(),
+                linsys.M_MCK().clone(), linsys.rhs_MCK())
+
+    def assertSameMatrix(self, mat, ref):
+        self.assert_(ref.norm() > 0.0)
+        diff = mat.clone()
+        diff.add(-1.0, ref)
+        self.assert_(diff.norm() < 1.e-12*ref.norm())
+
+    @memorycheck.check("amg")
+    def Matrices(self):
+        from ooflib.common import config
+        if not config.enable_openmp():
+            return
+        meshctxt = self.buildMesh(12)
+        OOF.Subproblem.Field.Define(
+            subproblem='amg:skeleton:mesh:default', field=Temperature)
+        OOF.Subproblem.Field.Activate(
+            subproblem='amg:skeleton:mesh:default', field=Temperature)
+        OOF.Mesh.Field.In_Plane(mesh='amg:skeleton:mesh', field=Temperature)
+        OOF.Subproblem.Equation.Activate(
+            subproblem='amg:skeleton:mesh:default', equation=Heat_Eqn)
+        OOF.Mesh.Boundary_Conditions.New(
+            name='temp', mesh='amg:skeleton:mesh',
+            condition=DirichletBC(
+                field=Temperature,field_component='',
+                equation=Heat_Eqn,eqn_component='',
+                profile=ConstantProfile(value=1),boundary='top'))
+        subpctxt = meshctxt.get_default_subproblem()
+        meshctxt.solver_precompute(solving=True)
+        Kref, Cref, Mref, rhsref = self.assemble(subpctxt, False)
+        K, C, M, rhs = self.assemble(subpctxt, True)
+        self.assertSameMatrix(K, Kref)
+        self.assertSameMatrix(C, Cref)
+        self.assertSameMatrix(M, Mref)
+        self.assert_(rhsref.norm() > 0.0)
+        self.assert_((rhs - rhsref).norm() < 1.e-12*rhsref.norm())
+        # A second colored assembly reuses the coloring.
+        K, C, M, rhs = self.assemble(subpctxt, True)
+        self.assertSameMatrix(K, Kref)
+        self.assert_((rhs - rhsref).norm() < 1.e-12*rhsref.norm())
+        del subpctxt, meshctxt
+
+#=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=##=--=#
+
 # ElasticTimeSteppers is a dynamic version of
 # ElasticPlaneStressPlaneStrainExact.  We're not comparing to an exact
 # solution here, but are checking that different steppers give the
@@ -3050,7 +3315,10 @@ def run_tests():
         OOF_AnisoRotation("Solve"),
         OOF_1x1ElasticDynamic("Static"),
         OOF_ElasticPlaneStressPlaneStrainExact("StaticPlaneStrain"),
-        OOF_ElasticPlaneStressPlaneStrainExact("StaticPlaneStress")
+        OOF_ElasticPlaneStressPlaneStrainExact("StaticPlaneStress"),
+        OOF_AMGElastic("Iterations"),
+        OOF_ShapeFunctionStore("Budget"),
+        OOF_ColoredAssembly("Matrices")
         ]
 
     dynamic_set = [